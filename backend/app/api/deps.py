@@ -1,16 +1,21 @@
 """Dependencies for API endpoints."""
-from typing import AsyncGenerator, Optional, Annotated
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Optional, Annotated
 
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 import logging
 
 from app.models.user import User
 from app.models.admin import Admin
-from app.core.security import get_current_user, oauth2_scheme
+from app.core.redis import redis_client
+from app.core.security import decode_access_token, get_current_user, oauth2_scheme
 from app.core.config import Settings, get_settings
-from app.db.session import AsyncSessionLocal, get_db
+from app.db.metrics import bind_request_scope
+from app.db.session import AsyncSessionLocal, ReadSessionLocal, get_db, replica_router
 from app.db.query_monitor import QueryMonitor
 from app import crud
 
@@ -38,6 +43,84 @@ async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
         return
         
     logger.debug("Creating new session via AsyncSessionLocal")
+    bind_request_scope(request.scope)
+    async with AsyncSessionLocal() as session:
+        yield session
+        if session.info.get("wrote") and replica_router.engines:
+            await _note_recent_write(request)
+
+
+def _token_subject(request: Request) -> Optional[str]:
+    """User ID from the request's bearer token, without loading the user."""
+    claims = request.scope.get("state", {}).get("token_claims")
+    if claims is None:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            claims = decode_access_token(token, get_settings())
+        except JWTError:
+            return None
+    return claims.get("sub")
+
+
+async def _note_recent_write(request: Request) -> None:
+    """Keep the user's reads on the primary for the read-your-writes window."""
+    user_id = _token_subject(request)
+    if user_id is None:
+        return
+    try:
+        await redis_client.set(
+            f"read_your_writes:{user_id}", 1, ex=get_settings().read_your_writes_seconds
+        )
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not record write by user {user_id}: {e}")
+
+
+async def _wrote_recently(request: Request) -> bool:
+    """Whether the requesting user wrote within the read-your-writes window."""
+    user_id = _token_subject(request)
+    if user_id is None:
+        return False
+    try:
+        return bool(await redis_client.exists(f"read_your_writes:{user_id}"))
+    except Exception:
+        # Without the marker we cannot rule out a recent write
+        return True
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get a database session for read-only endpoints.
+
+    Queries run on a healthy read replica when replicas are configured. Users
+    who wrote within ``read_your_writes_seconds`` read from the primary, so
+    they see their own changes despite replication lag.
+    """
+    if hasattr(request.app.state, "_test_session") and request.app.state._test_session:
+        yield request.app.state._test_session
+        return
+
+    bind_request_scope(request.scope)
+    async with ReadSessionLocal() as session:
+        if replica_router.engines and await _wrote_recently(request):
+            session.info["use_primary"] = True
+        yield session
+
+
+@asynccontextmanager
+async def stream_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Open a session owned by a streaming response body.
+
+    Dependencies with yield are closed before a StreamingResponse body runs,
+    so streaming endpoints open their session inside the body generator.
+    """
+    if hasattr(request.app.state, "_test_session") and request.app.state._test_session:
+        yield request.app.state._test_session
+        return
+
+    bind_request_scope(request.scope, streaming=True)
     async with AsyncSessionLocal() as session:
         yield session
 
@@ -50,7 +133,7 @@ async def get_current_active_user(
     request: Request = None 
 ) -> User:
     """Get current active user."""
-    current_user = await get_current_user(settings=settings, db=db, token=token)
+    current_user = await get_current_user(settings=settings, db=db, token=token, request=request)
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
@@ -80,7 +163,7 @@ async def get_current_admin(
 ) -> Admin:
     """Get current admin user."""
     # Get the user first
-    current_user = await get_current_user(settings=settings, db=db, token=token)
+    current_user = await get_current_user(settings=settings, db=db, token=token, request=request)
     
     logger = logging.getLogger(__name__)
     logger.debug(f"Attempting to get admin for user_id: {current_user.id}") # Now current_user is a User object
@@ -100,6 +183,9 @@ async def get_current_admin(
                 detail="Inactive admin user",
             )
         logger.debug(f"Admin found for user_id: {current_user.id}, admin_id: {admin.id}, role: {admin.role}")
+        # The principal loaded above is the admin's user row; hand it over so
+        # endpoints can read current_admin.user without another query
+        set_committed_value(admin, "user", current_user)
         return admin
     except HTTPException as e:
         logger.debug(f"HTTPException in get_current_admin: status_code={e.status_code}, detail={e.detail}")
@@ -9,12 +9,13 @@ from fastapi import Depends
 import structlog
 
 from app.api.deps import MonitoredDB
+from app.api.routing import ValidatedBodyRoute
 from app.core.cache import cached
 from app.db.query_monitor import monitor_query
 from app.models.user import User
 from app.schemas.user import UserResponse
 
-router = APIRouter(prefix="/examples", tags=["examples"])
+router = APIRouter(prefix="/examples", tags=["examples"], route_class=ValidatedBodyRoute)
 
 logger = structlog.get_logger()
 
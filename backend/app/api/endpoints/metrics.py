@@ -3,19 +3,15 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import PlainTextResponse
-from prometheus_client import (
-    CONTENT_TYPE_LATEST,
-    REGISTRY,
-    generate_latest,
-)
+from prometheus_client import CONTENT_TYPE_LATEST
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.crud import email_tracking
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.core.redis import get_redis
-from app.core.metrics import get_metrics
+from app.core.metrics import generate_metrics, get_metrics
 
 router = APIRouter()
 
@@ -31,7 +27,7 @@ router = APIRouter()
     },
 )
 async def get_metrics_endpoint(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     redis: Annotated[Redis, Depends(get_redis)],
 ) -> PlainTextResponse:
     """
@@ -43,6 +39,9 @@ async def get_metrics_endpoint(
     - Database connection metrics
     - Redis connection status
     - Email delivery metrics
+
+    When running several workers with ``PROMETHEUS_MULTIPROC_DIR`` set, the
+    values of all workers are merged into a single response.
     """
     try:
         metrics = get_metrics()
@@ -64,7 +63,7 @@ async def get_metrics_endpoint(
 
         # Generate metrics and return with correct content type
         return PlainTextResponse(
-            content=generate_latest(REGISTRY),
+            content=generate_metrics(),
             media_type=CONTENT_TYPE_LATEST,
         )
 
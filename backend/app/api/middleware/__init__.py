@@ -1,8 +1,87 @@
-"""Middleware module exports."""
-from .validation import setup_validation_middleware
-from .security import setup_security_middleware
+"""Middleware module exports.
+
+All middleware is implemented as plain ASGI callables rather than
+BaseHTTPMiddleware subclasses, so no extra task or memory stream is created
+per request and streaming responses are passed through untouched.
+"""
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+import structlog
+
+from app.core.config import get_settings
+from .errors import ErrorHandlerMiddleware
+from .query_count import QueryCountMiddleware
+from .rate_limit import RateLimitMiddleware
+from .security import SecurityHeadersMiddleware, setup_security_middleware
+from .server_timing import ServerTimingMiddleware
+from .validation import RequestValidationMiddleware, setup_validation_middleware
+
+logger = structlog.get_logger()
+
+
+def setup_middleware(app: FastAPI) -> None:
+    """Set up all middleware for the application."""
+    current_settings = get_settings() # Fetch settings once
+    
+    # Add CORS middleware (must be early)
+    if current_settings.cors_origins:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=[str(origin) for origin in current_settings.cors_origins],
+            allow_credentials=True,
+            allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+            allow_headers=[
+                "Content-Type",
+                "Authorization",
+                "X-Requested-With",
+                "Accept",
+                "Origin",
+                "Access-Control-Request-Method",
+                "Access-Control-Request-Headers",
+            ],
+            expose_headers=[
+                "Content-Length",
+                "Content-Range",
+            ],
+            max_age=600,  # 10 minutes
+        )
+    
+    # Add Security Headers middleware
+    app.add_middleware(SecurityHeadersMiddleware, settings=current_settings)
+    
+    # Add error handling middleware (must be after CORS/Security? Check order)
+    app.add_middleware(ErrorHandlerMiddleware)
+    
+    # Add validation middleware
+    app.add_middleware(RequestValidationMiddleware, settings=current_settings)
+    
+    # Report N+1 query patterns while developing
+    if current_settings.environment == "development":
+        app.add_middleware(QueryCountMiddleware, settings=current_settings)
+
+    # Add rate limiting middleware (conditionally)
+    if current_settings.enable_rate_limiting:
+        app.add_middleware(RateLimitMiddleware, settings=current_settings)
+
+    # Report where request time goes; outermost, so the total covers the stack
+    if current_settings.server_timing_enabled:
+        app.add_middleware(ServerTimingMiddleware, settings=current_settings)
+
+    logger.info(
+        "all_middleware_configured",
+        cors_origins=current_settings.cors_origins,
+        rate_limiting_enabled=current_settings.enable_rate_limiting
+    )
+
 
 __all__ = [
+    "ErrorHandlerMiddleware",
+    "QueryCountMiddleware",
+    "RateLimitMiddleware",
+    "RequestValidationMiddleware",
+    "SecurityHeadersMiddleware",
+    "ServerTimingMiddleware",
+    "setup_middleware",
     "setup_validation_middleware",
     "setup_security_middleware",
-] 
\ No newline at end of file
+]
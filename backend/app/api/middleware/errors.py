@@ -0,0 +1,114 @@
+"""Error handling middleware."""
+import time
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import structlog
+
+logger = structlog.get_logger()
+
+
+class ErrorHandlerMiddleware:
+    """Middleware for handling errors and logging requests."""
+
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process the request and handle any errors."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        status_code = 500
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            # Once the response has started it can no longer be replaced
+            if response_started:
+                raise
+            response = self._error_response(scope, e)
+            await response(scope, receive, send)
+            return
+
+        # Log request details
+        process_time = (time.time() - start_time) * 1000
+        logger.info(
+            "request_processed",
+            method=scope["method"],
+            url=self._get_url(scope),
+            status_code=status_code,
+            processing_time_ms=round(process_time, 2),
+        )
+
+    def _error_response(self, scope: Scope, error: Exception) -> JSONResponse:
+        """Log an error and build the matching JSON response."""
+        method = scope["method"]
+        url = self._get_url(scope)
+
+        if isinstance(error, RequestValidationError):
+            # Handle validation errors
+            logger.warning(
+                "validation_error",
+                method=method,
+                url=url,
+                errors=str(error.errors()),
+            )
+            return JSONResponse(
+                status_code=422,
+                content={
+                    "detail": "Validation Error",
+                    "errors": error.errors(),
+                },
+            )
+
+        if isinstance(error, SQLAlchemyError):
+            # Handle database errors
+            logger.error(
+                "database_error",
+                method=method,
+                url=url,
+                error=str(error),
+            )
+            return JSONResponse(
+                status_code=500,
+                content={
+                    "detail": "Database Error",
+                    "message": "An error occurred while processing your request",
+                },
+            )
+
+        # Handle unexpected errors
+        logger.exception(
+            "unexpected_error",
+            method=method,
+            url=url,
+            error=str(error),
+            exc_info=error,
+        )
+        return JSONResponse(
+            status_code=500,
+            content={
+                "detail": "Internal Server Error",
+                "message": "An unexpected error occurred",
+            },
+        )
+
+    @staticmethod
+    def _get_url(scope: Scope) -> str:
+        """Rebuild the request URL for logging."""
+        return str(URL(scope=scope))
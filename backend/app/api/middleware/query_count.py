@@ -0,0 +1,43 @@
+"""Per-request query counting middleware.
+
+Every statement a request sends to the database is recorded through the
+query monitor's cursor listeners. A normalized statement that runs more than
+``query_n_plus_one_threshold`` times in one request is almost always a lazy
+load or a query issued in a loop (N+1), and is logged as a warning.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+import structlog
+
+from app.core.config import Settings
+from app.core.metrics import get_endpoint_label
+from app.db.query_monitor import count_queries
+
+logger = structlog.get_logger()
+
+
+class QueryCountMiddleware:
+    """Middleware that counts queries per request and reports N+1 patterns."""
+
+    def __init__(self, app: ASGIApp, settings: Settings):
+        """Initialize middleware."""
+        self.app = app
+        self.threshold = settings.query_n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process the request inside a query counting block."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+            await self.app(scope, receive, send)
+
+        for statement, executions in counter.repeated(self.threshold):
+            logger.warning(
+                "n_plus_one_query",
+                method=scope["method"],
+                endpoint=get_endpoint_label(scope),
+                statement=statement,
+                executions=executions,
+                request_queries=counter.count,
+            )
@@ -0,0 +1,291 @@
+"""Rate limiting middleware.
+
+Limits are enforced with GCRA (generic cell rate algorithm) in a single Lua
+script, so each request costs one Redis round trip and a client is released
+again as soon as it slows down to the allowed rate. When Redis is slow or
+unavailable, an in-process token bucket takes over for a short cool-down.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import math
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from redis.asyncio import Redis
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from jose import JWTError
+import structlog
+
+from app.core.config import Settings
+from app.core.redis import get_redis
+from app.core.security import decode_access_token
+
+logger = structlog.get_logger()
+
+# KEYS[1]: bucket key. ARGV[1]: limit, ARGV[2]: window in seconds.
+# Stores the theoretical arrival time (TAT) in ms and returns
+# {allowed, remaining, reset_after_ms, retry_after_ms}.
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000
+local interval = math.max(1, math.floor(period / limit))
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, tat - now, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor((period - (new_tat - now)) / interval), new_tat - now, 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Number of requests allowed per window (in seconds)."""
+
+    limit: int
+    window: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimitPolicy":
+        """Parse a policy written as ``"<limit>/<window seconds>"``."""
+        limit, window = value.split("/")
+        return cls(limit=int(limit), window=int(window))
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+
+class LocalTokenBucket:
+    """In-process token bucket used while Redis is unavailable.
+
+    Counts are per worker, so limits are approximate during a fallback; the
+    number of tracked keys is bounded to keep memory flat.
+    """
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        """Take a token for ``key`` if one is available."""
+        now = time.monotonic()
+        rate = policy.limit / policy.window
+        tokens, updated = self._buckets.pop(key, (float(policy.limit), now))
+        tokens = min(float(policy.limit), tokens + (now - updated) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=policy.limit,
+            remaining=int(tokens),
+            reset_after=(policy.limit - tokens) / rate,
+            retry_after=0.0 if allowed else (1 - tokens) / rate,
+        )
+
+
+class RateLimitMiddleware:
+    """Middleware for rate limiting requests."""
+
+    def __init__(self, app: ASGIApp, settings: Settings, redis_client: Optional[Redis] = None):
+        """Initialize middleware."""
+        self.app = app
+        self.settings = settings
+        self.redis: Optional[Redis] = redis_client
+        self._script = None
+        self.local_bucket = LocalTokenBucket()
+        self._redis_degraded_until = 0.0
+        # Longest prefix first so the most specific policy wins
+        self.policies: List[Tuple[str, RateLimitPolicy]] = sorted(
+            (
+                (prefix, RateLimitPolicy.parse(value))
+                for prefix, value in settings.rate_limit_policies.items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    async def _get_redis(self) -> Redis:
+        """Get Redis connection."""
+        if not self.redis:
+            self.redis = await anext(get_redis())
+        return self.redis
+
+    async def _get_user_id(self, request: Request) -> Optional[str]:
+        """Extract user ID from JWT token if present."""
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return None
+
+        token = auth_header.split(" ")[1]
+        try:
+            payload = decode_access_token(token, self.settings)
+        except JWTError:
+            return None
+        # Keep the verified claims so get_current_user does not decode again
+        request.scope.setdefault("state", {}).update(access_token=token, token_claims=payload)
+        return str(payload.get("sub"))
+
+    def _get_policy(self, path: str, user_id: Optional[str] = None) -> Tuple[str, RateLimitPolicy]:
+        """Return the bucket scope and policy that apply to a path."""
+        for prefix, policy in self.policies:
+            if path.startswith(prefix):
+                return prefix, policy
+
+        # Default policy, with a higher allowance for authenticated clients
+        limit = (
+            self.settings.rate_limit_auth_requests
+            if user_id
+            else self.settings.rate_limit_requests
+        )
+        return path, RateLimitPolicy(limit=limit, window=self.settings.rate_limit_window)
+
+    def _get_rate_limit_key(self, bucket: str, client_ip: str, user_id: Optional[str] = None) -> str:
+        """Generate rate limit key based on IP and/or user ID."""
+        # Base key includes the route or policy scope to separate limits by endpoint
+        base_key = f"ratelimit:{bucket}"
+
+        if user_id and self.settings.rate_limit_by_key:
+            # Use user ID if available and rate_limit_by_key is enabled
+            return f"{base_key}:user:{user_id}"
+        elif self.settings.rate_limit_by_ip:
+            # Fall back to IP-based limiting if enabled
+            return f"{base_key}:ip:{client_ip}"
+        else:
+            # Global rate limiting if neither option is enabled
+            return base_key
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process the request and apply rate limiting."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Skip rate limiting for certain paths
+        if scope["path"] in ["/health", "/metrics"]:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
+        # Get client IP
+        client_ip = request.client.host if request.client else "unknown"
+
+        # Get user ID if authenticated
+        user_id = await self._get_user_id(request)
+
+        result = await self._check_rate_limit(scope["path"], client_ip, user_id)
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        rate_limit_headers = self._build_headers(result)
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "detail": "Too Many Requests",
+                    "message": "Please try again later",
+                },
+                headers={
+                    **rate_limit_headers,
+                    "Retry-After": str(math.ceil(result.retry_after)),
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _build_headers(result: RateLimitResult) -> Dict[str, str]:
+        """Build the X-RateLimit-* response headers."""
+        return {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(max(result.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(result.reset_after)),
+        }
+
+    async def _check_rate_limit(
+        self,
+        path: str,
+        client_ip: str,
+        user_id: Optional[str] = None
+    ) -> Optional[RateLimitResult]:
+        """Apply the matching policy, returning None when no limit could be checked."""
+        bucket, policy = self._get_policy(path, user_id)
+        key = self._get_rate_limit_key(bucket, client_ip, user_id)
+
+        # Skip Redis entirely while it is known to be slow or down
+        if time.monotonic() < self._redis_degraded_until:
+            return self.local_bucket.hit(key, policy)
+
+        redis = await self._get_redis()
+        if not redis:
+            logger.error("Redis connection not available for rate limiting")
+            return None
+
+        try:
+            if self._script is None:
+                self._script = redis.register_script(GCRA_SCRIPT)
+            allowed, remaining, reset_after_ms, retry_after_ms = await asyncio.wait_for(
+                self._script(keys=[key], args=[policy.limit, policy.window]),
+                timeout=self.settings.rate_limit_redis_timeout,
+            )
+        except Exception as e:
+            self._redis_degraded_until = time.monotonic() + self.settings.rate_limit_fallback_seconds
+            logger.warning(
+                "rate_limit_fallback",
+                key=key,
+                error=str(e) or type(e).__name__,
+                fallback_seconds=self.settings.rate_limit_fallback_seconds,
+            )
+            return self.local_bucket.hit(key, policy)
+
+        result = RateLimitResult(
+            allowed=bool(allowed),
+            limit=policy.limit,
+            remaining=int(remaining),
+            reset_after=int(reset_after_ms) / 1000,
+            retry_after=int(retry_after_ms) / 1000,
+        )
+        if not result.allowed:
+            logger.warning(
+                "rate_limit_exceeded",
+                key=key,
+                limit=policy.limit,
+                window=policy.window,
+                retry_after=result.retry_after,
+            )
+        return result
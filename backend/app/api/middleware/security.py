@@ -1,40 +1,54 @@
 """Security middleware for the application."""
-from typing import Callable
-from fastapi import FastAPI, Request, Response
+from typing import Dict
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 from app.core.config import Settings, get_settings
 
 logger = structlog.get_logger()
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Middleware for adding security headers to responses."""
     
     def __init__(self, app: ASGIApp, settings: Settings):
         """Initialize middleware."""
-        super().__init__(app)
+        self.app = app
         self.settings = settings
+        # Headers are static for the lifetime of the app, so build them once
+        self.security_headers = self._build_security_headers()
         
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Add security headers to response."""
-        response = await call_next(request)
-        
-        # Security Headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Content-Security-Policy"] = self._build_csp_header()
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = (
-            "accelerometer=(), camera=(), geolocation=(), gyroscope=(), "
-            "magnetometer=(), microphone=(), payment=(), usb=()"
-        )
-        
-        return response
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.security_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+    
+    def _build_security_headers(self) -> Dict[str, str]:
+        """Build the security headers added to every response."""
+        return {
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "X-XSS-Protection": "1; mode=block",
+            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+            "Content-Security-Policy": self._build_csp_header(),
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+            "Permissions-Policy": (
+                "accelerometer=(), camera=(), geolocation=(), gyroscope=(), "
+                "magnetometer=(), microphone=(), payment=(), usb=()"
+            ),
+        }
     
     def _build_csp_header(self) -> str:
         """Build Content Security Policy header."""
@@ -1,18 +1,24 @@
 """Request validation middleware."""
 import time
 import json
-from typing import Callable, Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.requests import ClientDisconnect
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 from pydantic import ValidationError, BaseModel, create_model
-from app.core.metrics import get_metrics
+from app.core.metrics import get_endpoint_label, get_metrics
 from app.core.config import Settings, get_settings
 
 logger = structlog.get_logger()
 
+# Scope key holding the (raw bytes, parsed JSON) body validated by the middleware
+VALIDATED_BODY_SCOPE_KEY = "validated_body"
+
+# Status recorded for requests whose client went away (nginx's convention)
+CLIENT_CLOSED_REQUEST = "499"
+
 class ValidationErrorModel(create_model('ValidationErrorModel', 
     type=(str, 'missing'),
     loc=(List[str], ...),
@@ -21,12 +27,12 @@ class ValidationErrorModel(create_model('ValidationErrorModel',
 )):
     pass
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+class RequestValidationMiddleware:
     """Middleware for validating requests."""
     
     def __init__(self, app: ASGIApp, settings: Settings):
         """Initialize middleware."""
-        super().__init__(app)
+        self.app = app
         self.settings = settings
         # Initialize metrics at middleware startup
         self.metrics = get_metrics()
@@ -45,95 +51,85 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
             f"{self.settings.api_v1_str}/auth/reset-password",
         }
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Validate and process the request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
+        request = Request(scope, receive)
         method = request.method
-        endpoint = request.url.path
+        path = scope["path"]
+        is_public = path in self.public_endpoints
+        status_code = 500
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+            await send(message)
 
         try:
             # Skip validation for public endpoints but still track metrics
-            if endpoint in self.public_endpoints:
-                response = await call_next(request)
-                duration = time.time() - start_time
-                
-                # Record metrics
-                self.metrics["http_request_duration_seconds"].labels(
-                    method=method,
-                    endpoint=endpoint,
-                ).observe(duration)
-                
-                self.metrics["http_requests"].labels(
-                    method=method,
-                    endpoint=endpoint,
-                    status=str(response.status_code),
-                ).inc()
-
-                return response
-
-            # For API endpoints, validate request body first
-            if endpoint.startswith(self.settings.api_v1_str):
+            if not is_public and path.startswith(self.settings.api_v1_str):
                 # Validate request headers
                 validation_error = await self._validate_headers(request)
                 if validation_error:
-                    return validation_error
+                    await validation_error(scope, receive, send)
+                    return
 
                 # Validate request body for POST/PUT/PATCH requests
                 if method in ["POST", "PUT", "PATCH"]:
+                    body = await self._read_body(receive)
+                    if body is None:
+                        response = JSONResponse(
+                            status_code=413,
+                            content={"detail": "Request body too large"}
+                        )
+                        await response(scope, receive, send)
+                        return
                     try:
-                        body = await request.json()
-                    except json.JSONDecodeError:
-                        return JSONResponse(
+                        parsed = json.loads(body)
+                    except ValueError:
+                        response = JSONResponse(
                             status_code=422,
                             content={"detail": "Invalid JSON in request body"}
                         )
+                        await response(scope, receive, send)
+                        return
+                    # Hand the parsed body to the route so it is not parsed twice,
+                    # and replay the raw bytes for anything reading the stream
+                    scope[VALIDATED_BODY_SCOPE_KEY] = (body, parsed)
+                    receive = self._replay_body(body, receive)
 
             # Process request and track duration
-            response = await call_next(request)
-            duration = time.time() - start_time
-            
-            # Record metrics
-            self.metrics["http_request_duration_seconds"].labels(
-                method=method,
-                endpoint=endpoint,
-            ).observe(duration)
-            
-            self.metrics["http_requests"].labels(
-                method=method,
-                endpoint=endpoint,
-                status=str(response.status_code),
-            ).inc()
+            await self.app(scope, receive, send_wrapper)
 
-            # Log request details
+        except ClientDisconnect:
+            # Nobody is left to send a response to
+            duration = time.time() - start_time
+            self._record_metrics(method, scope, CLIENT_CLOSED_REQUEST, duration)
             logger.info(
-                "request_processed",
+                "client_disconnected",
                 method=method,
                 url=str(request.url),
-                status_code=response.status_code,
                 duration_ms=round(duration * 1000, 2),
             )
+            return
 
-            return response
-            
         except Exception as e:
-            duration = (time.time() - start_time) * 1000
-            self.metrics["http_request_duration_seconds"].labels(
-                method=method,
-                endpoint=endpoint,
-            ).observe(duration)
-            
-            self.metrics["http_requests"].labels(
-                method=method,
-                endpoint=endpoint,
-                status="500",
-            ).inc()
+            duration = time.time() - start_time
+            self._record_metrics(method, scope, "500", duration)
 
             logger.error(
                 json.dumps({
                     "method": method,
                     "url": str(request.url),
                     "error": str(e),
-                    "duration_ms": round(duration, 2),
+                    "duration_ms": round(duration * 1000, 2),
                     "event": "request_error",
                     "level": "error",
                     "logger": logger.name,
@@ -142,13 +138,79 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                     "app_version": self.settings.version,
                 })
             )
-            return JSONResponse(
+            # Once the response has started it can no longer be replaced
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "detail": "Internal Server Error",
                     "message": "An error occurred while processing your request",
                 },
             )
+            await response(scope, receive, send)
+            return
+
+        duration = time.time() - start_time
+        self._record_metrics(method, scope, str(status_code), duration)
+
+        if not is_public:
+            # Log request details
+            logger.info(
+                "request_processed",
+                method=method,
+                url=str(request.url),
+                status_code=status_code,
+                duration_ms=round(duration * 1000, 2),
+            )
+
+    def _record_metrics(self, method: str, scope: Scope, status: str, duration: float) -> None:
+        """Record request count and duration metrics."""
+        # Label by route template, resolved once routing has run
+        endpoint = get_endpoint_label(scope)
+        self.metrics["http_request_duration_seconds"].labels(
+            method=method,
+            endpoint=endpoint,
+        ).observe(duration)
+        
+        self.metrics["http_requests"].labels(
+            method=method,
+            endpoint=endpoint,
+            status=status,
+        ).inc()
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        """Buffer the request body, or return None once it exceeds the size limit."""
+        limit = self.settings.max_request_body_size
+        chunks: List[bytes] = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ClientDisconnect()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            # Stop reading as soon as the limit is crossed
+            if size > limit:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_body(body: bytes, receive: Receive) -> Receive:
+        """Build a receive callable that yields an already-read body once."""
+        body_sent = False
+
+        async def replay() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
     
     async def _validate_headers(self, request: Request) -> Optional[Response]:
         """Validate request headers."""
@@ -181,14 +243,17 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                 )
             try:
                 length = int(content_length)
-                # Optionally check if length > 0 if needed
-                # if length <= 0:
-                #    return JSONResponse(...)
             except ValueError:
                 return JSONResponse(
                     content={"detail": "Invalid Content-Length header"},
                     status_code=400, # Bad Request for invalid value
                 )
+            # Reject oversized bodies before reading them
+            if length > self.settings.max_request_body_size:
+                return JSONResponse(
+                    content={"detail": "Request body too large"},
+                    status_code=413,
+                )
 
         return None
 
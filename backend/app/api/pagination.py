@@ -0,0 +1,146 @@
+"""Helpers for paginated list endpoints."""
+from enum import Enum
+from typing import Any, Callable, Optional, Sequence
+import math
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from app.core.config import Settings
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.crud.base import CRUDBase
+from app.schemas.common import PaginatedResponse
+
+logger = structlog.get_logger()
+
+# Upper bound for the ``limit`` query parameter of list endpoints
+MAX_PAGE_SIZE = 1000
+
+
+class CountStrategy(str, Enum):
+    """How a list endpoint computes ``total``."""
+
+    NONE = "none"  # no total
+    EXACT = "exact"  # COUNT(*) on every request
+    ESTIMATED = "estimated"  # planner statistics, exact below a threshold
+    CACHED = "cached"  # exact count kept in Redis per listing for a TTL
+
+
+def get_cursor_position(cursor: Optional[str], scope: str, settings: Settings) -> Optional[int]:
+    """
+    Decode the ``cursor`` query parameter into the last ID of the previous page.
+
+    Raises:
+        HTTPException: If the cursor is invalid for this listing
+    """
+    if not cursor:
+        return None
+    try:
+        (last_id,) = decode_cursor(cursor, scope, settings)
+    except (InvalidCursorError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    if not isinstance(last_id, int):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return last_id
+
+
+async def count_total(
+    db: AsyncSession,
+    crud: CRUDBase,
+    query: Select,
+    *,
+    strategy: CountStrategy,
+    scope: str,
+    settings: Settings,
+    cursor: Optional[str] = None,
+    redis: Optional[Redis] = None,
+) -> Optional[int]:
+    """
+    Count the rows of a listing with the route's count strategy.
+
+    Totals are skipped on follow-up pages of a cursor walk; clients get the
+    total with the first page.
+
+    Args:
+        db: Database session
+        crud: CRUD object for the listed model
+        query: Filtered, unpaginated query of the listing
+        strategy: Count strategy the route opted in to
+        scope: Listing identifier, used as the cache key for cached counts
+        settings: Application settings
+        cursor: Cursor of the requested page, if any
+        redis: Redis connection, required for cached counts
+
+    Returns:
+        Total number of rows, or None when not computed
+    """
+    if strategy == CountStrategy.NONE or cursor:
+        return None
+
+    if strategy == CountStrategy.ESTIMATED:
+        total = await crud.count(db, query=query, estimate=True)
+        # Planner estimates are coarse for small results; those are cheap to count
+        if total < settings.pagination_exact_count_threshold:
+            total = await crud.count(db, query=query)
+        return total
+
+    if strategy == CountStrategy.CACHED and redis is not None:
+        key = f"count:{scope}"
+        try:
+            cached = await redis.get(key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning("count_cache_get_failed", key=key, error=str(e))
+            return await crud.count(db, query=query)
+
+        total = await crud.count(db, query=query)
+        try:
+            await redis.set(key, total, ex=settings.pagination_count_cache_ttl)
+        except Exception as e:
+            logger.warning("count_cache_set_failed", key=key, error=str(e))
+        return total
+
+    return await crud.count(db, query=query)
+
+
+def build_page(
+    rows: Sequence[Any],
+    *,
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+    scope: str,
+    settings: Settings,
+    total: Optional[int] = None,
+    get_id: Callable[[Any], int] = lambda row: row.id,
+) -> PaginatedResponse:
+    """
+    Build a page from rows fetched with ``limit + 1``.
+
+    The extra row only signals that another page exists; it is dropped and
+    the ID of the last returned row becomes the next cursor.
+    """
+    has_more = len(rows) > limit
+    items = list(rows[:limit])
+    next_cursor = (
+        encode_cursor([get_id(items[-1])], scope, settings) if has_more and items else None
+    )
+    return PaginatedResponse(
+        items=items,
+        total=total,
+        # Page numbers only make sense for offset pagination
+        page=None if cursor else skip // limit + 1,
+        page_size=limit,
+        pages=math.ceil(total / limit) if total is not None else None,
+        next_cursor=next_cursor,
+    )
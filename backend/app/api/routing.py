@@ -0,0 +1,67 @@
+"""Custom API route classes."""
+from typing import Any, Callable, Coroutine
+import asyncio
+import functools
+import time
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.api.middleware.validation import VALIDATED_BODY_SCOPE_KEY
+from app.core.timing import current_timings, record_timing
+
+
+def _mark_endpoint_returned() -> None:
+    timings = current_timings()
+    if timings is not None:
+        timings.endpoint_returned = time.perf_counter()
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint so the request's timings note when it returned."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_returned()
+    else:
+        # Sync endpoints run in the threadpool with a copy of the context,
+        # which still refers to the same RequestTimings
+        @functools.wraps(call)
+        def endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return call(*args, **kwargs)
+            finally:
+                _mark_endpoint_returned()
+    return endpoint
+
+
+class ValidatedBodyRoute(APIRoute):
+    """Route that reuses the body already parsed by RequestValidationMiddleware.
+
+    Starlette caches the body and JSON on the Request instance, so seeding the
+    cache from the scope stops FastAPI from reading and parsing it again.
+
+    When the request is timed (see app.core.timing), the time between the
+    endpoint returning and the response being built, i.e. response_model
+    validation and rendering, is recorded as "render".
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        # The endpoint signature was already read when the dependant was built
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        route_handler = super().get_route_handler()
+
+        async def validated_body_route_handler(request: Request) -> Response:
+            validated = request.scope.get(VALIDATED_BODY_SCOPE_KEY)
+            if validated is not None:
+                request._body, request._json = validated
+            response = await route_handler(request)
+            timings = current_timings()
+            if timings is not None and timings.endpoint_returned is not None:
+                record_timing("render", time.perf_counter() - timings.endpoint_returned)
+            return response
+
+        return validated_body_route_handler
@@ -1,21 +1,44 @@
 """Admin API endpoints."""
-from typing import Any, List
+from typing import Any, List, Optional
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.api import deps
+from app.api.export import (
+    DEFAULT_EXPORT_CHUNK_SIZE,
+    MAX_EXPORT_CHUNK_SIZE,
+    ExportFormat,
+    export_response,
+)
+from app.api.pagination import (
+    MAX_PAGE_SIZE,
+    CountStrategy,
+    build_page,
+    count_total,
+    get_cursor_position,
+)
+from app.api.routing import ValidatedBodyRoute
 from app.core.auth import get_password_hash
+from app.core.config import Settings, get_settings
+from app.db.explain import explain_sampler
+from app.db.query_monitor import query_stats
 from app.models.admin import Admin, AdminRole
+from app.models.email_tracking import EmailEvent, EmailTracking
+from app.models.item import Item
+from app.models.user import User
 from app.schemas import admin as schemas
+from app.schemas.common import PaginatedResponse
 from app.schemas.user import UserCreate
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=ValidatedBodyRoute)
 
 
 def check_admin_permission(
@@ -111,15 +134,10 @@ async def create_admin(
 @router.get("/me", response_model=schemas.AdminWithUser)
 async def read_admin_me(
     current_admin: Admin = Depends(deps.get_current_admin),
-    db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
     """Get current admin user."""
-    user = await crud.user.get(db, id=current_admin.user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    # get_current_admin already loaded the admin's user row
+    user = current_admin.user
     return schemas.AdminWithUser(
         id=current_admin.id,
         user_id=current_admin.user_id,
@@ -149,21 +167,14 @@ async def read_admin(
         resource="admin",
     )
     
-    # Get admin
-    admin = await crud.admin.get(db, id=admin_id)
+    # Get admin and the associated user
+    admin = await crud.admin.get_with_user(db, id=admin_id)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Admin not found",
         )
-    
-    # Get the associated user
-    user = await crud.user.get(db, id=admin.user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    user = admin.user
     
     return schemas.AdminWithUser(
         id=admin.id,
@@ -178,11 +189,13 @@ async def read_admin(
     )
 
 
-@router.get("/", response_model=List[schemas.AdminWithUser])
+@router.get("/", response_model=PaginatedResponse[schemas.AdminWithUser])
 async def read_admins(
-    db: AsyncSession = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    db: AsyncSession = Depends(deps.get_read_db),
+    settings: Settings = Depends(get_settings),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_admin: Admin = Depends(deps.get_current_admin),
 ) -> Any:
     """Retrieve admins."""
@@ -194,10 +207,12 @@ async def read_admins(
         resource="admin",
     )
 
+    after = get_cursor_position(cursor, "admins", settings)
     admins = await crud.admin.get_multi_with_users(
         db=db,
         skip=skip,
-        limit=limit,
+        limit=limit + 1,
+        after=after,
     )
     
     # Format the response to include user information
@@ -208,7 +223,25 @@ async def read_admins(
         admin_data["full_name"] = user.full_name
         result.append(admin_data)
     
-    return result
+    total = await count_total(
+        db,
+        crud.admin,
+        select(Admin),
+        strategy=CountStrategy.EXACT,
+        scope="admins",
+        settings=settings,
+        cursor=cursor,
+    )
+    return build_page(
+        result,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        scope="admins",
+        settings=settings,
+        total=total,
+        get_id=lambda row: row["id"],
+    )
 
 
 @router.put("/{admin_id}", response_model=schemas.AdminWithUser)
@@ -228,21 +261,14 @@ async def update_admin(
         resource="admin",
     )
     
-    # Get admin
-    admin = await crud.admin.get(db, id=admin_id)
+    # Get admin and the associated user
+    admin = await crud.admin.get_with_user(db, id=admin_id)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Admin not found",
         )
-    
-    # Get the associated user
-    user = await crud.user.get(db, id=admin.user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    user = admin.user
     
     # Update user if needed
     if admin_in.email or admin_in.full_name or admin_in.password:
@@ -327,4 +353,129 @@ async def delete_admin(
         id=admin_id,
         actor_id=current_admin.id,
     )
-    return admin 
\ No newline at end of file
+    return admin 
+
+
+@router.get("/export/users", response_class=StreamingResponse)
+async def export_users(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    chunk_size: int = Query(DEFAULT_EXPORT_CHUNK_SIZE, ge=1, le=MAX_EXPORT_CHUNK_SIZE),
+    gzip: bool = False,
+    current_admin: Admin = Depends(deps.get_current_admin),
+) -> StreamingResponse:
+    """Stream all users as NDJSON or CSV."""
+    check_admin_permission(
+        current_admin=current_admin,
+        required_role=AdminRole.USER_ADMIN,
+        action="export",
+        resource="users",
+    )
+    logger.info(f"Admin {current_admin.id} exporting users as {format}")
+    query = select(
+        User.id,
+        User.email,
+        User.full_name,
+        User.is_active,
+        User.is_superuser,
+        User.created_at,
+        User.updated_at,
+    ).order_by(User.id)
+    return export_response(
+        request, query, fmt=format, chunk_size=chunk_size, gzip=gzip, name="users"
+    )
+
+
+@router.get("/export/items", response_class=StreamingResponse)
+async def export_items(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    chunk_size: int = Query(DEFAULT_EXPORT_CHUNK_SIZE, ge=1, le=MAX_EXPORT_CHUNK_SIZE),
+    gzip: bool = False,
+    current_admin: Admin = Depends(deps.get_current_admin),
+) -> StreamingResponse:
+    """Stream all items as NDJSON or CSV."""
+    check_admin_permission(
+        current_admin=current_admin,
+        required_role=AdminRole.CONTENT_ADMIN,
+        action="export",
+        resource="items",
+    )
+    logger.info(f"Admin {current_admin.id} exporting items as {format}")
+    query = select(
+        Item.id,
+        Item.title,
+        Item.description,
+        Item.owner_id,
+        Item.created_at,
+        Item.updated_at,
+    ).order_by(Item.id)
+    return export_response(
+        request, query, fmt=format, chunk_size=chunk_size, gzip=gzip, name="items"
+    )
+
+
+@router.get("/export/email-events", response_class=StreamingResponse)
+async def export_email_events(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    chunk_size: int = Query(DEFAULT_EXPORT_CHUNK_SIZE, ge=1, le=MAX_EXPORT_CHUNK_SIZE),
+    gzip: bool = False,
+    current_admin: Admin = Depends(deps.get_current_admin),
+) -> StreamingResponse:
+    """Stream all email events, with the e-mail they belong to, as NDJSON or CSV."""
+    check_admin_permission(
+        current_admin=current_admin,
+        required_role=AdminRole.USER_ADMIN,
+        action="export",
+        resource="email_events",
+    )
+    logger.info(f"Admin {current_admin.id} exporting email events as {format}")
+    query = (
+        select(
+            EmailEvent.id,
+            EmailTracking.email_id,
+            EmailTracking.recipient,
+            EmailTracking.template_name,
+            EmailEvent.event_type,
+            EmailEvent.occurred_at,
+            EmailEvent.user_agent,
+            EmailEvent.ip_address,
+            EmailEvent.location,
+            EmailEvent.event_metadata,
+        )
+        .join(EmailTracking, EmailEvent.email_id == EmailTracking.id)
+        .order_by(EmailEvent.id)
+    )
+    return export_response(
+        request, query, fmt=format, chunk_size=chunk_size, gzip=gzip, name="email_events"
+    )
+
+
+@router.get("/queries/top", response_model=List[schemas.QueryFingerprintStats])
+async def read_top_queries(
+    limit: int = Query(20, ge=1, le=200),
+    current_admin: Admin = Depends(deps.get_current_admin),
+) -> Any:
+    """List the SQL statement fingerprints with the highest total time in this worker."""
+    check_admin_permission(
+        current_admin=current_admin,
+        required_role=AdminRole.SUPER_ADMIN,
+        action="read",
+        resource="queries",
+    )
+    return query_stats.top(limit)
+
+
+@router.get("/queries/plans", response_model=List[schemas.QueryPlanSample])
+async def read_query_plans(
+    current_admin: Admin = Depends(deps.get_current_admin),
+) -> Any:
+    """List the EXPLAIN plans sampled for slow statements in this worker, newest first."""
+    check_admin_permission(
+        current_admin=current_admin,
+        required_role=AdminRole.SUPER_ADMIN,
+        action="read",
+        resource="queries",
+    )
+    return explain_sampler.recent()
@@ -2,19 +2,23 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import create_access_token
 from app.core.config import Settings, get_settings
+from app.core.login_throttle import LoginThrottle
+from app.core.redis import get_redis
 from app.crud.user import user as user_crud
 from app.api.deps import get_db
+from app.api.routing import ValidatedBodyRoute
 from app.schemas.auth import Token, TokenPayload
 from app.models.user import User
 import logging # Import logging
 
-router = APIRouter()
+router = APIRouter(route_class=ValidatedBodyRoute)
 logger = logging.getLogger(__name__) # Get logger instance
 
 
@@ -23,18 +27,37 @@ async def login_access_token(
     settings: Annotated[Settings, Depends(get_settings)],
     db: Annotated[AsyncSession, Depends(get_db)],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    redis: Annotated[Redis, Depends(get_redis)],
+    request: Request,
 ) -> Token:
     """ 
     OAuth2 compatible token login, get an access token for future requests.
     """
+    client_ip = request.client.host if request.client else "unknown"
+    throttle = LoginThrottle(redis, settings) if settings.login_throttle_enabled else None
+
+    # Reject locked-out accounts and IPs before any DB lookup or hashing
+    if throttle:
+        retry_after = await throttle.check(form_data.username, client_ip)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts",
+                headers={"Retry-After": str(retry_after)},
+            )
+
     user = await user_crud.authenticate(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
+        if throttle:
+            await throttle.register_failure(form_data.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+    if throttle:
+        await throttle.register_success(form_data.username, client_ip)
     
     # Log the user ID before creating the token
     logger.info(f"Generating token for User ID: {user.id}")
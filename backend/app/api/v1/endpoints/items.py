@@ -1,19 +1,27 @@
 """Item endpoints."""
-from typing import Annotated, Any, List
+from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
-from sqlalchemy import select
 
 from app import crud, models
 from app.api import deps
+from app.api.pagination import (
+    MAX_PAGE_SIZE,
+    CountStrategy,
+    build_page,
+    count_total,
+    get_cursor_position,
+)
+from app.api.routing import ValidatedBodyRoute
+from app.core.config import Settings, get_settings
+from app.schemas.common import PaginatedResponse
 from app.schemas.item import Item, ItemCreate, ItemUpdate
 from app.core.security import get_current_user
 from app.schemas.user import UserResponse
-from app.models.item import Item as ItemModel
 
-router = APIRouter()
+router = APIRouter(route_class=ValidatedBodyRoute)
 logger = structlog.get_logger()
 
 
@@ -43,21 +51,40 @@ async def create_item(
         raise
 
 
-@router.get("/", response_model=List[Item])
+@router.get("/", response_model=PaginatedResponse[Item])
 async def read_items(
-    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    db: Annotated[AsyncSession, Depends(deps.get_read_db)],
+    settings: Annotated[Settings, Depends(get_settings)],
     current_user: Annotated[models.User, Depends(deps.get_current_active_user)],
-    skip: int = 0,
-    limit: int = 100,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
-    """Retrieve items."""
-    result = await db.execute(
-        select(ItemModel)
-        .where(ItemModel.owner_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
+    """Retrieve items, paginated by ``cursor`` (preferred) or ``skip``."""
+    scope = f"items:{current_user.id}"
+    after = get_cursor_position(cursor, scope, settings)
+    items = await crud.item.get_multi_by_owner(
+        db, owner_id=current_user.id, skip=skip, limit=limit + 1, after=after
+    )
+    # Per-owner counts are served by the (owner_id, id) index
+    total = await count_total(
+        db,
+        crud.item,
+        crud.item.query_by_owner(current_user.id),
+        strategy=CountStrategy.EXACT,
+        scope=scope,
+        settings=settings,
+        cursor=cursor,
+    )
+    return build_page(
+        items,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        scope=scope,
+        settings=settings,
+        total=total,
     )
-    return list(result.scalars().all())
 
 
 @router.get("/{item_id}", response_model=Item)
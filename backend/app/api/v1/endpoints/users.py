@@ -1,17 +1,26 @@
 """User endpoints."""
-from typing import Annotated, Any, List
+from typing import Annotated, Any, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models
 from app.api import deps
+from app.api.pagination import (
+    MAX_PAGE_SIZE,
+    CountStrategy,
+    build_page,
+    count_total,
+    get_cursor_position,
+)
+from app.api.routing import ValidatedBodyRoute
+from app.core.config import Settings, get_settings
+from app.schemas.common import PaginatedResponse
 from app.schemas.user import UserResponse, UserCreate, UserUpdate
 from app.schemas.item import Item
-from app.models.item import Item as ItemModel
 
-router = APIRouter()
+router = APIRouter(route_class=ValidatedBodyRoute)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -61,15 +70,37 @@ async def create_user(
     return await crud.user.create(db, obj_in=user_in)
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=PaginatedResponse[UserResponse])
 async def read_users(
-    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    db: Annotated[AsyncSession, Depends(deps.get_read_db)],
+    settings: Annotated[Settings, Depends(get_settings)],
     current_user: Annotated[models.User, Depends(deps.get_current_active_superuser)],
-    skip: int = 0,
-    limit: int = 100,
-) -> List[UserResponse]:
-    """Retrieve users."""
-    return await crud.user.get_multi(db, skip=skip, limit=limit)
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 100,
+    cursor: Optional[str] = None,
+) -> Any:
+    """Retrieve users, paginated by ``cursor`` (preferred) or ``skip``."""
+    after = get_cursor_position(cursor, "users", settings)
+    users = await crud.user.get_multi(db, skip=skip, limit=limit + 1, after=after)
+    # The users table grows without bound; an estimate is enough for paging UIs
+    total = await count_total(
+        db,
+        crud.user,
+        select(models.User),
+        strategy=CountStrategy.ESTIMATED,
+        scope="users",
+        settings=settings,
+        cursor=cursor,
+    )
+    return build_page(
+        users,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        scope="users",
+        settings=settings,
+        total=total,
+    )
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -91,7 +122,7 @@ async def read_user_by_id(
 @router.get("/{user_id}/items", response_model=List[Item])
 async def read_user_items(
     *,
-    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    db: Annotated[AsyncSession, Depends(deps.get_read_db)],
     current_user: Annotated[models.User, Depends(deps.get_current_active_superuser)],
     user_id: int,
 ) -> List[Item]:
@@ -105,7 +136,7 @@ async def read_user_items(
     
     # Explicitly query items for the user
     result = await db.execute(
-        select(ItemModel).where(ItemModel.owner_id == user_id)
+        crud.item.with_loader(crud.item.query_by_owner(user_id))
     )
     return list(result.scalars().all())
 
@@ -1,7 +1,58 @@
 """Authentication utilities."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+import time
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import Settings, get_settings
+from app.core.metrics import get_metrics
+from app.core.timing import record_timing
+
+
+def build_pwd_context(settings: Settings) -> CryptContext:
+    """
+    Build the password hashing policy.
+
+    New hashes use ``settings.password_hash_scheme``. Hashes made with the
+    other scheme, or with weaker parameters than configured, still verify
+    but are reported by ``password_needs_rehash``.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Configured CryptContext
+    """
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        default=settings.password_hash_scheme,
+        deprecated="auto",
+        bcrypt__rounds=settings.bcrypt_rounds,
+        bcrypt__min_rounds=settings.bcrypt_rounds,
+        argon2__type="ID",
+        argon2__time_cost=settings.argon2_time_cost,
+        argon2__memory_cost=settings.argon2_memory_cost,
+        argon2__parallelism=settings.argon2_parallelism,
+    )
+
+
+pwd_context = build_pwd_context(get_settings())
+
+T = TypeVar("T")
+
+# Hash verified for unknown accounts so their logins cost the same as real ones
+_dummy_hash: Optional[str] = None
+
+# Dedicated pool so hashing never competes with the default executor
+_hash_executor: Optional[ThreadPoolExecutor] = None
+# Hash jobs submitted and not yet finished (running + queued)
+_pending_hashes = 0
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hash jobs are already queued."""
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -28,4 +79,115 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hashed password
     """
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with an outdated scheme or parameters.
+
+    Args:
+        hashed_password: Hashed password
+
+    Returns:
+        True if the password should be hashed again with the current policy
+    """
+    return pwd_context.needs_update(hashed_password)
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Get the password hashing executor, creating it on first use."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=get_settings().password_hash_workers,
+            thread_name_prefix="password-hash",
+        )
+    return _hash_executor
+
+
+async def _run_hash_job(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a hashing function in the bounded executor.
+
+    Raises:
+        PasswordHasherBusy: If the executor already has the maximum number of
+            pending jobs
+    """
+    global _pending_hashes
+    metrics = get_metrics()
+    if _pending_hashes >= get_settings().password_hash_max_pending:
+        metrics["password_hash_rejections"].inc()
+        raise PasswordHasherBusy()
+
+    _pending_hashes += 1
+    metrics["password_hash_queue_depth"].set(_pending_hashes)
+    started = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        # Includes the wait for a worker, which the request spends as well
+        record_timing("hash", time.perf_counter() - started)
+        _pending_hashes -= 1
+        metrics["password_hash_queue_depth"].set(_pending_hashes)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify password against hash without blocking the event loop.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password
+
+    Returns:
+        True if password matches hash
+
+    Raises:
+        PasswordHasherBusy: If the hashing executor is saturated
+    """
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash password without blocking the event loop.
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        Hashed password
+
+    Raises:
+        PasswordHasherBusy: If the hashing executor is saturated
+    """
+    return await _run_hash_job(get_password_hash, password)
+
+
+async def dummy_verify_password(plain_password: str) -> None:
+    """
+    Spend the cost of a password verification without a real hash.
+
+    Used when the account does not exist, so response timing does not reveal
+    which e-mail addresses are registered.
+
+    Args:
+        plain_password: Plain text password
+
+    Raises:
+        PasswordHasherBusy: If the hashing executor is saturated
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await get_password_hash_async("dummy-password-for-timing")
+    await verify_password_async(plain_password, _dummy_hash)
+
+
+def shutdown_hash_executor() -> None:
+    """Shut down the password hashing executor."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
@@ -44,14 +44,57 @@ class Settings(BaseSettings):
     algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     rate_limit_requests: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(default=60, env="RATE_LIMIT_WINDOW")
+    enable_rate_limiting: bool = Field(default=True, env="ENABLE_RATE_LIMITING")
+    rate_limit_auth_requests: int = Field(default=500, env="RATE_LIMIT_AUTH_REQUESTS")
+    rate_limit_by_ip: bool = Field(default=True, env="RATE_LIMIT_BY_IP")
+    rate_limit_by_key: bool = Field(default=True, env="RATE_LIMIT_BY_KEY")
+    rate_limit_policies: Dict[str, str] = Field(default={}, env="RATE_LIMIT_POLICIES")  # path prefix -> "limit/window"
+    rate_limit_redis_timeout: float = Field(default=0.05, env="RATE_LIMIT_REDIS_TIMEOUT")  # seconds
+    rate_limit_fallback_seconds: int = Field(default=5, env="RATE_LIMIT_FALLBACK_SECONDS")
     api_v1_str: str = Field(default="/api/v1", env="API_V1_STR")
+    pagination_count_cache_ttl: int = Field(default=60, env="PAGINATION_COUNT_CACHE_TTL")  # seconds
+    pagination_exact_count_threshold: int = Field(default=10000, env="PAGINATION_EXACT_COUNT_THRESHOLD")  # estimates below this are recounted exactly
+    query_n_plus_one_threshold: int = Field(default=10, env="QUERY_N_PLUS_ONE_THRESHOLD")  # same statement per request, development only
+    query_stats_max_fingerprints: int = Field(default=1000, env="QUERY_STATS_MAX_FINGERPRINTS")  # per worker
+    query_stats_samples: int = Field(default=256, env="QUERY_STATS_SAMPLES")  # recent durations kept per fingerprint
+    query_explain_enabled: bool = Field(default=False, env="QUERY_EXPLAIN_ENABLED")  # re-run slow SELECTs under EXPLAIN ANALYZE
+    query_explain_interval: int = Field(default=600, env="QUERY_EXPLAIN_INTERVAL")  # seconds between plans of one fingerprint
+    query_explain_plans_kept: int = Field(default=50, env="QUERY_EXPLAIN_PLANS_KEPT")  # per worker
+    server_timing_enabled: bool = Field(default=False, env="SERVER_TIMING_ENABLED")  # Server-Timing header and request_timings log
+    max_request_body_size: int = Field(default=1_048_576, env="MAX_REQUEST_BODY_SIZE")  # 1 MiB
     database_url_for_env: str = Field(default="postgresql+asyncpg://postgres:postgres@db:5432/app", env="DATABASE_URL")
+    database_pool_profile: Literal["small", "default", "large"] = Field(default="default", env="DATABASE_POOL_PROFILE")
+    database_pool_size: Optional[int] = Field(default=None, env="DATABASE_POOL_SIZE")  # overrides the profile
+    database_max_overflow: Optional[int] = Field(default=None, env="DATABASE_MAX_OVERFLOW")  # overrides the profile
+    database_pool_timeout: Optional[float] = Field(default=None, env="DATABASE_POOL_TIMEOUT")  # seconds, overrides the profile
+    database_pool_leak_seconds: float = Field(default=0.0, env="DATABASE_POOL_LEAK_SECONDS")  # report connections held longer, 0 disables
+    database_pgbouncer: bool = Field(default=False, env="DATABASE_PGBOUNCER")  # transaction pooling safe connections
+    database_replica_urls: List[str] = Field(default=[], env="DATABASE_REPLICA_URLS")  # read-only sessions use these when healthy
+    replica_max_lag_seconds: float = Field(default=5.0, env="REPLICA_MAX_LAG_SECONDS")
+    replica_check_interval: float = Field(default=5.0, env="REPLICA_CHECK_INTERVAL")  # seconds
+    read_your_writes_seconds: int = Field(default=10, env="READ_YOUR_WRITES_SECONDS")  # a user's reads stay on the primary this long after a write
     debug: bool = Field(default=False, env="DEBUG")
     testing: bool = Field(default=False, env="TESTING")
     redis_url: RedisDsn = Field(default="redis://redis:6379/0", env="REDIS_URL")
     environment: Environment = Field(default=Environment.DEVELOPMENT, env="ENVIRONMENT")
     cors_origins: List[str] = Field(default=["http://localhost:3000"], env="CORS_ORIGINS")
     access_token_expire_minutes: int = Field(default=10080, env="ACCESS_TOKEN_EXPIRE_MINUTES")  # 7 days
+    jwt_cache_size: int = Field(default=1024, env="JWT_CACHE_SIZE")  # 0 disables the verified-token cache
+    principal_cache_ttl: int = Field(default=0, env="PRINCIPAL_CACHE_TTL")  # seconds, 0 disables
+    password_hash_workers: int = Field(default=4, env="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(default=32, env="PASSWORD_HASH_MAX_PENDING")  # beyond this, logins get 429
+    password_hash_scheme: Literal["bcrypt", "argon2"] = Field(default="bcrypt", env="PASSWORD_HASH_SCHEME")
+    bcrypt_rounds: int = Field(default=12, env="BCRYPT_ROUNDS")
+    argon2_time_cost: int = Field(default=2, env="ARGON2_TIME_COST")
+    argon2_memory_cost: int = Field(default=19456, env="ARGON2_MEMORY_COST")  # KiB
+    argon2_parallelism: int = Field(default=1, env="ARGON2_PARALLELISM")
+    password_rehash_on_login: bool = Field(default=True, env="PASSWORD_REHASH_ON_LOGIN")
+    login_throttle_enabled: bool = Field(default=True, env="LOGIN_THROTTLE_ENABLED")
+    login_max_failures_per_account: int = Field(default=5, env="LOGIN_MAX_FAILURES_PER_ACCOUNT")
+    login_max_failures_per_ip: int = Field(default=20, env="LOGIN_MAX_FAILURES_PER_IP")
+    login_failure_window: int = Field(default=900, env="LOGIN_FAILURE_WINDOW")  # seconds
+    login_lockout_base: int = Field(default=30, env="LOGIN_LOCKOUT_BASE")  # seconds, doubles per failure
+    login_lockout_max: int = Field(default=3600, env="LOGIN_LOCKOUT_MAX")  # seconds
     smtp_user: Optional[str] = Field(default=None, env="SMTP_USER")
     smtp_password: Optional[str] = Field(default=None, env="SMTP_PASSWORD")
 
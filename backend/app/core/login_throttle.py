@@ -0,0 +1,159 @@
+"""Login throttling backed by Redis.
+
+Failed logins are counted per account and per client IP. Once a counter
+reaches its threshold the account or IP is locked out, and the lockout
+doubles with every further failure. Locked-out attempts are rejected before
+the user lookup and password hash verification, so credential stuffing
+cannot burn CPU on bcrypt/argon2.
+"""
+from typing import Dict, Optional
+import hashlib
+
+from redis.asyncio import Redis
+import structlog
+
+from app.core.config import Settings
+
+logger = structlog.get_logger()
+
+# KEYS[1]: failure counter, KEYS[2]: lock key.
+# ARGV: threshold, failure window, base lockout, max lockout (seconds).
+# Returns the lockout in seconds applied by this failure, or 0.
+REGISTER_FAILURE_SCRIPT = """
+local threshold = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local count = redis.call('INCR', KEYS[1])
+if count < threshold then
+    if count == 1 then
+        redis.call('EXPIRE', KEYS[1], window)
+    end
+    return 0
+end
+local lockout = math.min(tonumber(ARGV[4]), tonumber(ARGV[3]) * 2 ^ (count - threshold))
+redis.call('SET', KEYS[2], 1, 'EX', lockout)
+-- Keep counting past the lockout so repeated offenders back off further
+redis.call('EXPIRE', KEYS[1], math.max(window, lockout * 2))
+return lockout
+"""
+
+
+class LoginThrottle:
+    """Per-account and per-IP login failure throttling."""
+
+    def __init__(self, redis: Redis, settings: Settings):
+        """Initialize throttle."""
+        self.redis = redis
+        self.settings = settings
+
+    @staticmethod
+    def _account_id(email: str) -> str:
+        """Hash the login name so e-mail addresses are not stored in Redis keys."""
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+    def _keys(self, email: str, client_ip: str) -> Dict[str, str]:
+        """Build the Redis keys for an account and IP."""
+        account = self._account_id(email)
+        return {
+            "account_failures": f"login:failures:account:{account}",
+            "account_lock": f"login:lock:account:{account}",
+            "ip_failures": f"login:failures:ip:{client_ip}",
+            "ip_lock": f"login:lock:ip:{client_ip}",
+        }
+
+    async def check(self, email: str, client_ip: str) -> Optional[int]:
+        """
+        Check whether a login attempt is currently locked out.
+
+        Args:
+            email: Login name being attempted
+            client_ip: Client IP address
+
+        Returns:
+            Seconds until the attempt may be retried, or None if allowed
+        """
+        keys = self._keys(email, client_ip)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.ttl(keys["account_lock"])
+            pipe.ttl(keys["ip_lock"])
+            account_ttl, ip_ttl = await pipe.execute()
+        except Exception as e:
+            # Fail open: throttling must not take logins down with Redis
+            logger.warning("login_throttle_check_failed", error=str(e))
+            return None
+
+        retry_after = max(account_ttl, ip_ttl)
+        if retry_after > 0:
+            logger.warning(
+                "login_throttled",
+                client_ip=client_ip,
+                account_locked=account_ttl > 0,
+                ip_locked=ip_ttl > 0,
+                retry_after=retry_after,
+            )
+            return retry_after
+        return None
+
+    async def register_failure(self, email: str, client_ip: str) -> int:
+        """
+        Record a failed login and lock out the account and/or IP if needed.
+
+        Args:
+            email: Login name that failed
+            client_ip: Client IP address
+
+        Returns:
+            Longest lockout in seconds started by this failure, or 0
+        """
+        keys = self._keys(email, client_ip)
+        settings = self.settings
+        try:
+            script = self.redis.register_script(REGISTER_FAILURE_SCRIPT)
+            account_lockout = await script(
+                keys=[keys["account_failures"], keys["account_lock"]],
+                args=[
+                    settings.login_max_failures_per_account,
+                    settings.login_failure_window,
+                    settings.login_lockout_base,
+                    settings.login_lockout_max,
+                ],
+            )
+            ip_lockout = await script(
+                keys=[keys["ip_failures"], keys["ip_lock"]],
+                args=[
+                    settings.login_max_failures_per_ip,
+                    settings.login_failure_window,
+                    settings.login_lockout_base,
+                    settings.login_lockout_max,
+                ],
+            )
+        except Exception as e:
+            logger.warning("login_throttle_register_failed", error=str(e))
+            return 0
+
+        lockout = max(int(account_lockout), int(ip_lockout))
+        if lockout:
+            logger.warning(
+                "login_lockout",
+                client_ip=client_ip,
+                account_lockout=int(account_lockout),
+                ip_lockout=int(ip_lockout),
+            )
+        return lockout
+
+    async def register_success(self, email: str, client_ip: str) -> None:
+        """
+        Clear the account's failure count after a successful login.
+
+        The IP counter is left alone so one valid account cannot be used to
+        reset the budget of an IP that is guessing other accounts.
+
+        Args:
+            email: Login name that succeeded
+            client_ip: Client IP address
+        """
+        keys = self._keys(email, client_ip)
+        try:
+            await self.redis.delete(keys["account_failures"])
+        except Exception as e:
+            logger.warning("login_throttle_reset_failed", error=str(e))
@@ -1,10 +1,25 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
+import os
 import time
 import psutil
-from prometheus_client import Counter, Histogram, Gauge, REGISTRY
+from prometheus_client import (
+    Counter,
+    Histogram,
+    Gauge,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
 
 _metrics: Dict[str, Any] = {}
 
+# Maximum number of distinct endpoint label values; anything beyond it, and any
+# path that did not match a route, is recorded under UNMATCHED_ENDPOINT.
+MAX_ENDPOINT_LABELS = 200
+UNMATCHED_ENDPOINT = "other"
+_endpoint_labels: Set[str] = set()
+
 def initialize_metrics() -> Dict[str, Any]:
     """Initialize and register application metrics."""
     global _metrics
@@ -27,9 +42,12 @@ def initialize_metrics() -> Dict[str, Any]:
     )
     _metrics["http_request_duration_seconds"] = hist_http
 
+    # Gauge multiprocess modes only apply when PROMETHEUS_MULTIPROC_DIR is set;
+    # "livesum" sums the values of workers that are still alive.
     _metrics["db_connections_active"] = Gauge(
          "db_connections_active",
-         "Active database connections"
+         "Active database connections",
+         multiprocess_mode="livesum"
     )
 
     # Add db_query_count metric
@@ -49,7 +67,8 @@ def initialize_metrics() -> Dict[str, Any]:
     # Add database pool metrics
     _metrics["db_pool_size"] = Gauge(
          "db_pool_size",
-         "Current database connection pool size"
+         "Current database connection pool size",
+         multiprocess_mode="livesum"
     )
     
     _metrics["db_pool_checkouts"] = Counter(
@@ -67,6 +86,47 @@ def initialize_metrics() -> Dict[str, Any]:
          "Total number of database connection pool overflows"
     )
 
+    _metrics["db_pool_checkout_wait_seconds"] = Histogram(
+         "db_pool_checkout_wait_seconds",
+         "Time taken to get a connection from the database pool",
+         ["pool"],
+         buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+    )
+
+    _metrics["db_pool_waiting"] = Gauge(
+         "db_pool_waiting",
+         "Tasks waiting to get a connection from the database pool",
+         ["pool"],
+         multiprocess_mode="livesum"
+    )
+
+    _metrics["db_pool_checked_out"] = Gauge(
+         "db_pool_checked_out",
+         "Database connections currently checked out of the pool",
+         ["pool"],
+         multiprocess_mode="livesum"
+    )
+
+    _metrics["db_pool_hold_seconds"] = Histogram(
+         "db_pool_hold_seconds",
+         "Time a database connection is held between checkout and checkin",
+         ["pool"],
+         buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+    )
+
+    # Divide by http_requests_total for the mean hold time per request
+    _metrics["db_pool_endpoint_hold_seconds"] = Counter(
+         "db_pool_endpoint_hold_seconds_total",
+         "Total time database connections were held, by endpoint",
+         ["endpoint"]
+    )
+
+    _metrics["db_pool_leaks"] = Counter(
+         "db_pool_leaks_total",
+         "Database connections held longer than the leak threshold",
+         ["pool"]
+    )
+
     hist_db = Histogram(
          "db_query_duration_seconds",
          "Database query duration in seconds",
@@ -87,6 +147,17 @@ def initialize_metrics() -> Dict[str, Any]:
          ["error_type"]
     )
 
+    _metrics["password_hash_queue_depth"] = Gauge(
+         "password_hash_queue_depth",
+         "Password hash jobs running or waiting in the hashing executor",
+         multiprocess_mode="livesum"
+    )
+
+    _metrics["password_hash_rejections"] = Counter(
+         "password_hash_rejections_total",
+         "Password hash jobs rejected because the hashing executor was saturated"
+    )
+
     return _metrics
 
 def get_metrics() -> Dict[str, Any]:
@@ -105,6 +176,93 @@ def reset_metrics() -> None:
         except KeyError:
             pass
     _metrics = {}
+    _endpoint_labels.clear()
+
+def get_endpoint_label(scope: Dict[str, Any]) -> str:
+    """Return a bounded-cardinality ``endpoint`` label for a request.
+
+    Uses the template of the route the router matched (``/api/v1/items/{item_id}``)
+    rather than the raw path, so the number of time series stays constant.
+
+    Args:
+        scope: ASGI scope of the request, after routing
+
+    Returns:
+        Route template, or UNMATCHED_ENDPOINT
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if not path:
+        return UNMATCHED_ENDPOINT
+    if path not in _endpoint_labels:
+        if len(_endpoint_labels) >= MAX_ENDPOINT_LABELS:
+            return UNMATCHED_ENDPOINT
+        _endpoint_labels.add(path)
+    return path
+
+def get_multiprocess_dir() -> Optional[str]:
+    """Return the multiprocess value directory, or None in single-process mode.
+
+    prometheus_client decides between in-memory and mmap-backed values when it
+    is first imported, so the variable must be set before the workers start
+    (e.g. ``PROMETHEUS_MULTIPROC_DIR=/tmp/prom uvicorn app.main:app --workers 4``).
+    """
+    return (
+        os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        or os.environ.get("prometheus_multiproc_dir")
+    )
+
+def is_multiprocess_mode() -> bool:
+    """Check whether metrics are shared between worker processes."""
+    return get_multiprocess_dir() is not None
+
+def get_registry() -> CollectorRegistry:
+    """Return the registry to expose on a scrape.
+
+    In multiprocess mode a fresh registry is built for every scrape so that the
+    value files of all workers are merged, whichever worker serves the request.
+    """
+    if not is_multiprocess_mode():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=get_multiprocess_dir())
+    return registry
+
+def generate_metrics() -> bytes:
+    """Render all metrics in the Prometheus text format."""
+    return generate_latest(get_registry())
+
+def mark_worker_dead(pid: Optional[int] = None) -> None:
+    """Drop the live gauge files of a worker that has exited.
+
+    Counter and histogram files are kept so totals never go backwards.
+    """
+    if not is_multiprocess_mode():
+        return
+    multiprocess.mark_process_dead(pid or os.getpid(), get_multiprocess_dir())
+
+def cleanup_dead_workers() -> List[int]:
+    """Mark every worker whose value files outlived its process as dead.
+
+    uvicorn has no child-exit hook, so this is run on startup of each worker.
+
+    Returns:
+        Sorted list of PIDs that were cleaned up
+    """
+    path = get_multiprocess_dir()
+    if not path or not os.path.isdir(path):
+        return []
+
+    dead_pids = set()
+    for filename in os.listdir(path):
+        if not filename.endswith(".db"):
+            continue
+        pid = filename[:-3].rsplit("_", 1)[-1]
+        if pid.isdigit() and not psutil.pid_exists(int(pid)):
+            dead_pids.add(int(pid))
+
+    for pid in dead_pids:
+        multiprocess.mark_process_dead(pid, path)
+    return sorted(dead_pids)
 
 class MetricsManager:
     """A context manager for metrics handling."""
@@ -167,7 +325,14 @@ __all__ = [
     'initialize_metrics', 
     'get_metrics', 
     'reset_metrics', 
+    'get_endpoint_label',
     'MetricsManager',
+    'get_multiprocess_dir',
+    'is_multiprocess_mode',
+    'get_registry',
+    'generate_metrics',
+    'mark_worker_dead',
+    'cleanup_dead_workers',
     'get_process_time',
     'get_process_memory',
     'get_system_cpu',
@@ -0,0 +1,83 @@
+"""Opaque, signed cursors for keyset pagination.
+
+A cursor carries the sort key of the last row on a page. It is signed with
+the application secret and bound to a scope (for example the endpoint and
+the filter it was issued for), so clients cannot forge positions or replay
+a cursor against a different listing.
+"""
+from typing import Any, List, Sequence
+import base64
+import hashlib
+import hmac
+import json
+
+from app.core.config import Settings
+
+_SIGNATURE_BYTES = 16
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed, tampered with or out of scope."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes, scope: str, settings: Settings) -> bytes:
+    key = settings.secret_key.get_secret_value().encode()
+    return hmac.new(key, scope.encode() + b"\x00" + payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(key: Sequence[Any], scope: str, settings: Settings) -> str:
+    """
+    Encode a keyset position as an opaque cursor.
+
+    Args:
+        key: JSON-serializable sort key of the last row returned
+        scope: Listing the cursor is valid for
+        settings: Application settings
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps(list(key), separators=(",", ":")).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload, scope, settings))}"
+
+
+def decode_cursor(cursor: str, scope: str, settings: Settings) -> List[Any]:
+    """
+    Verify a cursor and return the keyset position it carries.
+
+    Args:
+        cursor: Cursor previously returned by encode_cursor
+        scope: Listing the cursor must have been issued for
+        settings: Application settings
+
+    Returns:
+        Sort key of the last row of the previous page
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or its signature does not match
+    """
+    try:
+        encoded_payload, encoded_signature = cursor.split(".")
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except ValueError as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+    if not hmac.compare_digest(signature, _sign(payload, scope, settings)):
+        raise InvalidCursorError("Invalid cursor")
+
+    try:
+        key = json.loads(payload)
+    except ValueError as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(key, list):
+        raise InvalidCursorError("Malformed cursor")
+    return key
@@ -11,6 +11,7 @@ from prometheus_client import Counter, Histogram
 
 from app.core.config import Settings, get_settings
 from app.core.metrics import get_metrics
+from app.core.timing import record_timing
 
 logger = structlog.get_logger()
 
@@ -75,6 +76,7 @@ class MonitoredRedis(Redis):
         finally:
             duration = time.time() - start_time
             REDIS_OPERATION_DURATION.labels(operation=command).observe(duration)
+            record_timing("redis", duration)
 
 
 # Create monitored Redis client
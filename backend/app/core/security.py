@@ -1,8 +1,11 @@
 """Security utilities."""
+from collections import OrderedDict
 from datetime import datetime, timedelta, UTC
-from typing import Annotated, Any, Union, Optional
+from typing import Annotated, Any, Dict, Tuple, Union, Optional
+import hashlib
+import time
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,6 +22,9 @@ from app.schemas import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+# Verified claims by token hash, with the token expiry as a float timestamp
+_token_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
 
 def create_access_token(
     subject: Union[str, Any], 
@@ -52,10 +58,57 @@ def create_access_token(
     return encoded_jwt
 
 
+def decode_access_token(token: str, settings: Settings) -> Dict[str, Any]:
+    """
+    Verify a JWT access token and return its claims.
+
+    Verified claims are kept in a bounded LRU keyed by a hash of the token
+    (and the signing key), so repeated requests with the same token skip
+    signature verification until the token expires.
+
+    Args:
+        token: Encoded JWT token
+        settings: Application settings dependency
+
+    Returns:
+        Token claims
+
+    Raises:
+        JWTError: If the token is invalid or expired
+    """
+    secret_value = settings.secret_key.get_secret_value()
+    cache_size = settings.jwt_cache_size
+    if cache_size <= 0:
+        return jwt.decode(token, secret_value, algorithms=[settings.algorithm])
+
+    key = hashlib.sha256(f"{settings.algorithm}:{secret_value}:{token}".encode()).hexdigest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        claims, expires_at = cached
+        if time.time() < expires_at:
+            _token_cache.move_to_end(key)
+            return dict(claims)
+        # Expired: drop it and let decode raise the proper error
+        del _token_cache[key]
+
+    claims = jwt.decode(token, secret_value, algorithms=[settings.algorithm])
+    expires_at = float(claims["exp"]) if "exp" in claims else float("inf")
+    _token_cache[key] = (claims, expires_at)
+    if len(_token_cache) > cache_size:
+        _token_cache.popitem(last=False)
+    return dict(claims)
+
+
+def clear_token_cache() -> None:
+    """Drop all cached token claims."""
+    _token_cache.clear()
+
+
 async def get_current_user(
     settings: Settings,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
+    request: Optional[Request] = None,
 ) -> User:
     """Get current user based on JWT token."""
     logger.debug(f"Attempting to get current user with token: {token[:10]}...")
@@ -67,12 +120,13 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        logger.debug("Decoding JWT token...")
-        secret_value = settings.secret_key.get_secret_value()
-        logger.debug(f"[VERIFY_TOKEN] Using Secret Key: {secret_value[:5]}...{secret_value[-5:]}") # Log key safely
-        payload = jwt.decode(
-            token, secret_value, algorithms=[settings.algorithm]
-        )
+        # Reuse the claims verified earlier in this request (e.g. by the rate limiter)
+        state = request.scope.get("state", {}) if request is not None else {}
+        if state.get("access_token") == token and "token_claims" in state:
+            payload = state["token_claims"]
+        else:
+            logger.debug("Decoding JWT token...")
+            payload = decode_access_token(token, settings)
         logger.debug(f"Token payload decoded: {payload}")
         user_id: str | None = payload.get("sub")
         if user_id is None:
@@ -99,9 +153,9 @@ async def get_current_user(
     try:
         user_id_int = int(token_data.sub) # Convert sub to int
         logger.debug(f"Attempting to fetch user with ID: {user_id_int}")
-        # Revert back to using crud layer
-        user = await user_crud.get(db, id=user_id_int) 
-        # user = await db.get(User, user_id_int) # Changed line
+        user = await user_crud.get_principal(
+            db, id=user_id_int, ttl=settings.principal_cache_ttl
+        )
         logger.debug(f"User lookup result: {'Found' if user else 'Not Found'}")
     except ValueError:
         logger.warning(f"Could not convert user ID '{token_data.sub}' to integer.")
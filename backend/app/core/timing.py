@@ -0,0 +1,87 @@
+"""Request-scoped timing breakdown.
+
+While a request runs inside ``track_timings()``, the database cursor
+listeners, the Redis client, the password hashing executor and the route
+handler add the time they spend to the request's ``RequestTimings``. The
+server timing middleware reports it as a ``Server-Timing`` header and as log
+fields. Outside a tracked request, ``record_timing`` is a single context
+variable lookup.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+import time
+
+# Components in the order they are reported, with their Server-Timing descriptions
+COMPONENTS = {
+    "db": "database",
+    "redis": "redis",
+    "hash": "password hashing",
+    "render": "response serialization",
+}
+
+
+class RequestTimings:
+    """Time spent per component during one request."""
+
+    __slots__ = ("started", "endpoint_returned", "seconds", "calls")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        # Set by the route class; what follows is serialization and rendering
+        self.endpoint_returned: Optional[float] = None
+        self.seconds: Dict[str, float] = dict.fromkeys(COMPONENTS, 0.0)
+        self.calls: Dict[str, int] = dict.fromkeys(COMPONENTS, 0)
+
+    def add(self, component: str, seconds: float) -> None:
+        self.seconds[component] += seconds
+        self.calls[component] += 1
+
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Format the breakdown as a Server-Timing header value."""
+        metrics = [
+            f'{name};dur={self.seconds[name] * 1000:.1f};desc="{description} ({self.calls[name]})"'
+            for name, description in COMPONENTS.items()
+            if self.calls[name]
+        ]
+        metrics.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def log_fields(self) -> Dict[str, float]:
+        """Flatten the breakdown into structured log fields."""
+        fields: Dict[str, float] = {}
+        for name in COMPONENTS:
+            fields[f"{name}_ms"] = round(self.seconds[name] * 1000, 1)
+            fields[f"{name}_calls"] = self.calls[name]
+        fields["total_ms"] = round(self.elapsed() * 1000, 1)
+        return fields
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_timing(component: str, seconds: float) -> None:
+    """Add time spent in ``component`` to the current request, if tracked."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(component, seconds)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the current request, or None outside ``track_timings``."""
+    return _current_timings.get()
+
+
+@contextmanager
+def track_timings() -> Iterator[RequestTimings]:
+    """Collect the timing breakdown of the code run in this context."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
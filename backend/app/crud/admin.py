@@ -3,10 +3,11 @@ from typing import Any, Dict, Optional, Union, List
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import contains_eager
 
 from app.crud.base import CRUDBase
 from app.models.admin import Admin
+from app.models.user import User
 from app.schemas.admin import AdminCreate, AdminUpdate
 
 
@@ -35,13 +36,35 @@ class CRUDAdmin(CRUDBase[Admin, AdminCreate, AdminUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def get_with_user(
+        self, db: AsyncSession, *, id: int
+    ) -> Optional[Admin]:
+        """
+        Get admin by ID together with its user in one query.
+        
+        Args:
+            db: Database session
+            id: Admin ID
+            
+        Returns:
+            Admin with ``user`` loaded if found, None otherwise
+        """
+        result = await db.execute(
+            select(Admin)
+            .join(Admin.user)
+            .where(Admin.id == id)
+            .options(contains_eager(Admin.user))
+        )
+        return result.scalar_one_or_none()
+
     async def get_multi_with_users(
         self,
         db: AsyncSession,
         *,
         skip: int = 0,
         limit: int = 100,
-    ) -> List[tuple[Admin, "User"]]:
+        after: Optional[int] = None,
+    ) -> List[tuple[Admin, User]]:
         """
         Get multiple admins with their associated users.
         
@@ -49,17 +72,18 @@ class CRUDAdmin(CRUDBase[Admin, AdminCreate, AdminUpdate]):
             db: Database session
             skip: Number of records to skip
             limit: Maximum number of records to return
+            after: Return admins with an ID greater than this (keyset pagination)
             
         Returns:
             List of tuples containing (admin, user) pairs
         """
-        from app.models.user import User
-        
         result = await db.execute(
-            select(Admin, User)
-            .join(User, Admin.user_id == User.id)
-            .offset(skip)
-            .limit(limit)
+            self.paginate(
+                select(Admin, User).join(User, Admin.user_id == User.id),
+                skip=skip,
+                limit=limit,
+                after=after,
+            )
         )
         return list(result.all())
 
@@ -1,9 +1,12 @@
 """Base class for CRUD operations."""
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from typing import Any, Dict, Generic, Iterator, List, Literal, Optional, Sequence, Set, Type, TypeVar, Union
+import json
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import Select, Table, delete, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import ORMOption
 
 from app.db.base_class import Base
 
@@ -11,38 +14,150 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows per statement for bulk operations; keeps bind parameters well below
+# the PostgreSQL limit of 32767 per statement
+BULK_CHUNK_SIZE = 1000
+
+
+def _chunks(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Split rows into consecutive chunks of at most ``size``."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """Base class for CRUD operations."""
 
+    # Named sets of loader options that read methods accept as ``load=``.
+    # The "default" profile applies when no profile is requested, so
+    # relationships are only loaded by queries that ask for them.
+    loader_profiles: Dict[str, Sequence[ORMOption]] = {}
+
     def __init__(self, model: Type[ModelType]):
         """Initialize with SQLAlchemy model."""
         self.model = model
 
+    def with_loader(self, query: Select, load: Optional[str] = None) -> Select:
+        """
+        Apply the loader options of a profile to a query.
+
+        Args:
+            query: Query selecting this model
+            load: Profile name from ``loader_profiles``, or None for "default"
+
+        Raises:
+            ValueError: If the requested profile does not exist
+        """
+        if load is not None and load not in self.loader_profiles:
+            raise ValueError(
+                f"Unknown loader profile {load!r} for {self.model.__name__}"
+            )
+        return query.options(*self.loader_profiles.get(load or "default", ()))
+
     async def get(
         self,
         db: AsyncSession,
         id: Any,
+        *,
+        load: Optional[str] = None,
     ) -> Optional[ModelType]:
-        """Get a record by ID."""
+        """Get a record by ID, with relationships from the ``load`` profile."""
         result = await db.execute(
-            select(self.model).where(self.model.id == id),
+            self.with_loader(select(self.model).where(self.model.id == id), load),
         )
         return result.scalar_one_or_none()
 
+    def paginate(
+        self,
+        query: Select,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+    ) -> Select:
+        """
+        Apply ordering and pagination to a query on this model.
+
+        Rows are ordered by primary key. With ``after`` the query seeks past
+        the last ID of the previous page (keyset pagination), which uses the
+        primary key index and stays fast at any depth; otherwise ``skip``
+        rows are skipped with OFFSET.
+        """
+        query = query.order_by(self.model.id).limit(limit)
+        if after is not None:
+            return query.where(self.model.id > after)
+        return query.offset(skip)
+
     async def get_multi(
         self,
         db: AsyncSession,
         *,
         skip: int = 0,
         limit: int = 100,
+        after: Optional[int] = None,
+        load: Optional[str] = None,
     ) -> List[ModelType]:
-        """Get multiple records with pagination."""
+        """Get multiple records with offset or keyset pagination."""
         result = await db.execute(
-            select(self.model).offset(skip).limit(limit),
+            self.paginate(
+                self.with_loader(select(self.model), load),
+                skip=skip,
+                limit=limit,
+                after=after,
+            ),
         )
         return list(result.scalars().all())
 
+    async def count(
+        self,
+        db: AsyncSession,
+        *,
+        query: Optional[Select] = None,
+        estimate: bool = False,
+    ) -> int:
+        """
+        Count the rows matched by a query on this model (all rows by default).
+
+        With ``estimate`` on PostgreSQL the planner's statistics are used
+        instead of scanning: ``pg_class.reltuples`` for an unfiltered table,
+        otherwise the row estimate of ``EXPLAIN``. Falls back to an exact
+        ``COUNT(*)`` when no estimate is available.
+        """
+        if query is None:
+            query = select(self.model)
+        # Only the row count matters: drop ORM columns (and eager-load joins)
+        query = query.with_only_columns(self.model.id).order_by(None).limit(None).offset(None)
+
+        if estimate and db.get_bind().dialect.name == "postgresql":
+            estimated = await self._estimate_count(db, query)
+            if estimated is not None:
+                return estimated
+
+        result = await db.execute(select(func.count()).select_from(query.subquery()))
+        return result.scalar_one()
+
+    async def _estimate_count(self, db: AsyncSession, query: Select) -> Optional[int]:
+        """Return the planner's row estimate for a query, or None if unknown."""
+        froms = query.get_final_froms()
+        if query.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+            result = await db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": froms[0].fullname},
+            )
+            reltuples = result.scalar_one_or_none()
+            # -1 means the table has never been vacuumed or analyzed
+            return reltuples if reltuples is not None and reltuples >= 0 else None
+
+        compiled = query.compile(
+            dialect=db.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
     async def create(
         self,
         db: AsyncSession,
@@ -65,17 +180,161 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: UpdateSchemaType | Dict[str, Any],
     ) -> ModelType:
         """Update a record."""
-        obj_data = db_obj.__dict__
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
+        # Mapped attributes rather than __dict__, so columns a loader
+        # profile left unloaded can still be updated
+        for field in self.model.__mapper__.attrs.keys():
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         await db.commit()
         return db_obj
 
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        on_conflict: Optional[Literal["ignore", "update"]] = None,
+        conflict_columns: Sequence[str] = ("id",),
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> List[ModelType]:
+        """
+        Create many records in one transaction.
+
+        Each chunk is a single multi-row ``INSERT ... RETURNING`` statement,
+        instead of one INSERT, commit and refresh per record.
+
+        Args:
+            db: Database session
+            objs_in: Records to create
+            on_conflict: Skip ("ignore") or overwrite ("update") rows that
+                conflict on ``conflict_columns``
+            conflict_columns: Columns of the unique constraint to upsert on
+            chunk_size: Rows per statement
+
+        Returns:
+            Created (or upserted) records; rows skipped by "ignore" are not returned
+
+        Raises:
+            ValueError: If ``on_conflict`` is used on a database other than
+                PostgreSQL or SQLite, or if rows given for "update" do not all
+                set the same columns (besides ``conflict_columns``)
+        """
+        rows = [
+            obj if isinstance(obj, dict) else obj.model_dump()
+            for obj in objs_in
+        ]
+        if not rows:
+            return []
+        update_columns = self._update_columns(rows[0], conflict_columns)
+        if on_conflict == "update" and any(
+            self._update_columns(row, conflict_columns) != update_columns for row in rows
+        ):
+            # A row without a column would overwrite it with the column default
+            raise ValueError("Rows upserted with on_conflict='update' must set the same columns")
+        created: List[ModelType] = []
+        for chunk in _chunks(rows, chunk_size):
+            stmt = self._insert(db, update_columns, on_conflict, conflict_columns)
+            result = await db.scalars(
+                stmt.returning(self.model),
+                chunk,
+                execution_options={"populate_existing": on_conflict == "update"},
+            )
+            created.extend(result.all())
+        await db.commit()
+        return created
+
+    @staticmethod
+    def _update_columns(row: Dict[str, Any], conflict_columns: Sequence[str]) -> Set[str]:
+        """Columns of a row that an upsert overwrites; the creation time is kept."""
+        return set(row) - set(conflict_columns) - {"id", "created_at"}
+
+    def _insert(
+        self,
+        db: AsyncSession,
+        update_columns: Set[str],
+        on_conflict: Optional[str],
+        conflict_columns: Sequence[str],
+    ):
+        """Build the INSERT for create_many, with an ON CONFLICT clause if requested."""
+        if on_conflict is None:
+            return insert(self.model)
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(self.model)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(self.model)
+        else:
+            raise ValueError(f"on_conflict is not supported on {dialect}")
+
+        if on_conflict == "ignore":
+            return stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        set_ = {name: stmt.excluded[name] for name in update_columns}
+        set_["updated_at"] = stmt.excluded.updated_at
+        return stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Dict[str, Any]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Update many records by primary key in one transaction.
+
+        Each dict must contain ``id`` plus the columns to set. Chunks are sent
+        as a single executemany, so the driver pipelines all statements of a
+        chunk in one round trip. Dicts with different keys are grouped by
+        SQLAlchemy into separate statements.
+
+        Args:
+            db: Database session
+            objs_in: Column values by record, each including ``id``
+            chunk_size: Rows per executemany
+
+        Returns:
+            Number of records given for update. This is the input size, not a
+            count of matched rows: ORM bulk updates expose no rowcount, and
+            asyncpg does not report one for executemany. Drivers that do
+            (e.g. sqlite) raise StaleDataError when an ``id`` matches no row.
+        """
+        for chunk in _chunks(list(objs_in), chunk_size):
+            await db.execute(update(self.model), chunk)
+        await db.commit()
+        return len(objs_in)
+
+    async def remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Sequence[int],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Delete many records by ID in one transaction.
+
+        Args:
+            db: Database session
+            ids: IDs of records to delete
+            chunk_size: IDs per DELETE statement
+
+        Returns:
+            Number of records deleted
+        """
+        deleted = 0
+        for chunk in _chunks(list(ids), chunk_size):
+            result = await db.execute(
+                delete(self.model).where(self.model.id.in_(chunk))
+            )
+            deleted += result.rowcount
+        await db.commit()
+        return deleted
+
     async def remove(
         self,
         db: AsyncSession,
@@ -1,29 +1,65 @@
 """CRUD operations for items."""
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.crud.base import CRUDBase
 from app.models.item import Item
+from app.models.user import User
 from app.schemas.item import ItemCreate, ItemUpdate
 
 
 class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
     """CRUD operations for items."""
 
+    # Item queries select only the items table; the owner is joined in, with
+    # just its public columns, when the "owner" profile is requested
+    loader_profiles = {
+        "owner": (
+            joinedload(Item.owner).load_only(User.id, User.email, User.full_name),
+        ),
+    }
+
     async def get_by_title(
         self,
         db: AsyncSession,
         *,
         title: str,
+        load: Optional[str] = None,
     ) -> Optional[Item]:
         """Get item by title."""
         result = await db.execute(
-            select(self.model).where(self.model.title == title),
+            self.with_loader(select(self.model).where(self.model.title == title), load),
         )
         return result.scalar_one_or_none()
 
+    def query_by_owner(self, owner_id: int) -> Select:
+        """Build the unpaginated query for an owner's items."""
+        return select(self.model).where(self.model.owner_id == owner_id)
+
+    async def get_multi_by_owner(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+        load: Optional[str] = None,
+    ) -> List[Item]:
+        """Get items of an owner with offset or keyset pagination."""
+        result = await db.execute(
+            self.paginate(
+                self.with_loader(self.query_by_owner(owner_id), load),
+                skip=skip,
+                limit=limit,
+                after=after,
+            ),
+        )
+        return list(result.scalars().all())
+
     async def create(
         self,
         db: AsyncSession,
@@ -1,26 +1,51 @@
 """User CRUD operations."""
-from typing import Any, Dict, Optional, Union
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+import asyncio
+import time
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached, noload, raiseload, selectinload
 
-from app.core.auth import get_password_hash, verify_password
+from app.core.auth import (
+    dummy_verify_password,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.core.config import get_settings
 from app.crud.base import CRUDBase
+from app.db.session import AsyncSessionLocal
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Column values of recently resolved principals by user ID, with their expiry
+_principal_cache: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+PRINCIPAL_CACHE_MAX_SIZE = 10_000
+
+# Keep references to background rehash tasks so they are not garbage collected
+_rehash_tasks: Set[asyncio.Task] = set()
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     """User CRUD operations."""
 
+    # A user's items are unbounded, so they are never loaded unless asked
+    # for; read_user_items pages through them instead
+    loader_profiles = {
+        "default": (noload(User.items),),
+        "items": (selectinload(User.items),),
+    }
+
     def __init__(self):
         """Initialize with User model."""
         super().__init__(User)
 
     async def get_by_email(
-        self, db: AsyncSession, *, email: str
+        self, db: AsyncSession, *, email: str, load: Optional[str] = None
     ) -> Optional[User]:
         """
         Get user by email.
@@ -28,15 +53,65 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         Args:
             db: Database session
             email: User email
+            load: Loader profile, see ``loader_profiles``
             
         Returns:
             User if found, None otherwise
         """
         result = await db.execute(
-            select(User).where(User.email == email)
+            self.with_loader(select(User).where(User.email == email), load)
         )
         return result.scalar_one_or_none()
 
+    async def get_principal(
+        self, db: AsyncSession, *, id: int, ttl: int = 0
+    ) -> Optional[User]:
+        """
+        Get the user behind an access token.
+
+        Only the users row is selected; relationships are not loaded and raise
+        if accessed. With a positive ``ttl`` the row is cached in-process for
+        that many seconds and merged into the session without a query.
+
+        Args:
+            db: Database session
+            id: User ID
+            ttl: Cache lifetime in seconds, 0 disables the cache
+
+        Returns:
+            User if found, None otherwise
+        """
+        if ttl > 0:
+            cached = _principal_cache.get(id)
+            if cached is not None and time.monotonic() < cached[1]:
+                user = User(**cached[0])
+                make_transient_to_detached(user)
+                return await db.merge(user, load=False)
+
+        result = await db.execute(
+            select(User)
+            .where(User.id == id)
+            .options(raiseload(User.items), raiseload(User.admin))
+        )
+        user = result.scalar_one_or_none()
+
+        if ttl > 0 and user is not None:
+            columns = {key: getattr(user, key) for key in User.__mapper__.columns.keys()}
+            _principal_cache[id] = (columns, time.monotonic() + ttl)
+            _principal_cache.move_to_end(id)
+            if len(_principal_cache) > PRINCIPAL_CACHE_MAX_SIZE:
+                _principal_cache.popitem(last=False)
+        return user
+
+    def invalidate_principal(self, id: int) -> None:
+        """
+        Drop a cached principal.
+
+        Args:
+            id: User ID
+        """
+        _principal_cache.pop(id, None)
+
     async def create(
         self, db: AsyncSession, *, obj_in: UserCreate
     ) -> User:
@@ -53,7 +128,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         create_data = obj_in.model_dump()
         db_obj = User(
             email=create_data["email"],
-            hashed_password=get_password_hash(create_data["password"]),
+            hashed_password=await get_password_hash_async(create_data["password"]),
             full_name=create_data["full_name"],
             is_superuser=create_data.get("is_superuser", False),
         )
@@ -62,6 +137,50 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[UserCreate, Dict[str, Any]]],
+        **kwargs: Any,
+    ) -> List[User]:
+        """
+        Create many users in one transaction.
+
+        Passwords of UserCreate objects are hashed first, at most as many at
+        a time as the hashing executor has workers; dicts are inserted as-is
+        and must already carry ``hashed_password``.
+
+        Args:
+            db: Database session
+            objs_in: Users to create
+            **kwargs: Passed on to CRUDBase.create_many
+
+        Returns:
+            Created users
+        """
+        batch_size = get_settings().password_hash_workers
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(objs_in), batch_size):
+            batch = objs_in[start:start + batch_size]
+            hashes = await asyncio.gather(*(
+                get_password_hash_async(obj.password)
+                for obj in batch
+                if isinstance(obj, UserCreate)
+            ))
+            hashes_iter = iter(hashes)
+            for obj in batch:
+                if isinstance(obj, dict):
+                    rows.append(obj)
+                    continue
+                rows.append({
+                    "email": obj.email,
+                    "hashed_password": next(hashes_iter),
+                    "full_name": obj.full_name,
+                    "is_superuser": obj.is_superuser,
+                })
+        return await super().create_many(db, objs_in=rows, **kwargs)
+
     async def update(
         self,
         db: AsyncSession,
@@ -85,10 +204,54 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        # After the commit, so a concurrent lookup cannot re-cache the old row
+        self.invalidate_principal(user.id)
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: int) -> User:
+        """
+        Delete user.
+
+        Args:
+            db: Database session
+            id: User ID
+
+        Returns:
+            Deleted user
+        """
+        user = await super().remove(db, id=id)
+        self.invalidate_principal(id)
+        return user
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Dict[str, Any]],
+        **kwargs: Any,
+    ) -> int:
+        """Update many users by ID, dropping their cached principals."""
+        updated = await super().update_many(db, objs_in=objs_in, **kwargs)
+        for obj in objs_in:
+            self.invalidate_principal(obj["id"])
+        return updated
+
+    async def remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Sequence[int],
+        **kwargs: Any,
+    ) -> int:
+        """Delete many users by ID, dropping their cached principals."""
+        deleted = await super().remove_many(db, ids=ids, **kwargs)
+        for id in ids:
+            self.invalidate_principal(id)
+        return deleted
 
     async def authenticate(
         self, db: AsyncSession, *, email: str, password: str
@@ -108,6 +271,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = await self.get_by_email(db, email=email)
         if not user:
             logger.warning(f"Authentication failed: User {email} not found.")
+            # Keep timing uniform with a wrong password for an existing user
+            await dummy_verify_password(password)
             return None
         
         logger.debug(f"User found: {user.email}, ID: {user.id}. Verifying password...")
@@ -117,17 +282,60 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         provided_password_snippet = password[:3] + "..."
         logger.debug(f"Provided password snippet: {provided_password_snippet}")
 
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             logger.warning(f"Authentication failed: Incorrect password for user {email}.")
             return None
             
         if not user.is_active:
             logger.warning(f"Authentication failed: User {email} is inactive.")
             return None
+
+        if get_settings().password_rehash_on_login and password_needs_rehash(user.hashed_password):
+            # Upgrade the hash in the background so the login is not slowed down
+            task = asyncio.create_task(
+                self.rehash_password(user_id=user.id, old_hash=user.hashed_password, password=password)
+            )
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
             
         logger.info(f"User {email} authenticated successfully.")
         return user
 
+    async def rehash_password(self, *, user_id: int, old_hash: str, password: str) -> bool:
+        """
+        Re-hash a password with the current hashing policy.
+
+        Runs in its own session. The row is only updated if the stored hash is
+        still ``old_hash``, so a password changed in the meantime is kept.
+
+        Args:
+            user_id: User ID
+            old_hash: Hash the password was verified against
+            password: Verified plain text password
+
+        Returns:
+            True if the stored hash was replaced
+        """
+        try:
+            new_hash = await get_password_hash_async(password)
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    update(User)
+                    .where(User.id == user_id, User.hashed_password == old_hash)
+                    .values(hashed_password=new_hash)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Password rehash failed for user {user_id}: {e}")
+            return False
+
+        if result.rowcount != 1:
+            # The password changed since it was verified; keep the new hash
+            return False
+        self.invalidate_principal(user_id)
+        logger.info(f"Password hash upgraded for user {user_id}.")
+        return True
+
     def is_active(self, user: User) -> bool:
         """
         Check if user is active.
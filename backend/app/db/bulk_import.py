@@ -0,0 +1,370 @@
+"""Streaming bulk import of users and items through PostgreSQL COPY.
+
+Rows are read from CSV or NDJSON one chunk at a time, validated against
+UserCreate/ItemCreate, loaded into a temporary staging table with asyncpg's
+binary COPY and merged into the real table with a single INSERT ... SELECT
+per chunk. Memory stays bounded by the chunk size however large the file.
+Rejected rows are written to an NDJSON error file with their line number as
+each chunk is processed; the report itself only keeps counts.
+
+Usage:
+    python -m app.db.bulk_import users users.csv [--errors rejected.ndjson]
+    python -m app.db.bulk_import items items.ndjson [--chunk-size 10000]
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import sys
+import time
+
+import asyncpg
+from pydantic import ValidationError
+import structlog
+
+from app.core.auth import get_password_hash, pwd_context
+from app.core.config import get_settings
+from app.schemas.item import ItemCreate
+from app.schemas.user import UserCreate
+
+logger = structlog.get_logger()
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# (line number, raw row) as read from the source file
+SourceRow = Tuple[int, Dict[str, Any]]
+
+
+@dataclass
+class RejectedRow:
+    """A row that was not imported."""
+
+    line: int
+    error: str
+    row: Dict[str, Any]
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import run."""
+
+    read: int = 0
+    imported: int = 0
+
+    @property
+    def rejected(self) -> int:
+        return self.read - self.imported
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """How rows of one target table are validated, staged and merged."""
+
+    table: str
+    staging_columns: Tuple[str, ...]
+    staging_types: Tuple[str, ...]
+    validate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    # INSERT ... SELECT from the staging table, returning the staged line
+    # numbers that were inserted
+    merge_sql: str
+    # Reported for valid rows the merge skipped
+    skipped_error: str
+
+
+def _validate_user(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a user row; the password is hashed later, in the process pool."""
+    hashed_password = row.pop("hashed_password", None)
+    if hashed_password:
+        # Pre-hashed passwords (e.g. migrated from another system) are kept
+        # as-is if they use a scheme the password policy can verify
+        if not pwd_context.identify(hashed_password):
+            raise ValueError("hashed_password uses an unsupported scheme")
+        row["password"] = hashed_password
+    row.setdefault("password_confirm", row.get("password"))
+    user = UserCreate.model_validate(row)
+    return {
+        "email": user.email,
+        "full_name": user.full_name,
+        "password": None if hashed_password else user.password,
+        "hashed_password": hashed_password,
+        "is_active": True if user.is_active is None else user.is_active,
+        "is_superuser": user.is_superuser,
+    }
+
+
+def _validate_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate an item row, which must name its owner by user ID."""
+    item = ItemCreate.model_validate(row)
+    try:
+        owner_id = int(row["owner_id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("owner_id must be an integer user ID")
+    return {"title": item.title, "description": item.description, "owner_id": owner_id}
+
+
+SPECS: Dict[str, ImportSpec] = {
+    "users": ImportSpec(
+        table="users",
+        staging_columns=("line", "email", "full_name", "hashed_password", "is_active", "is_superuser"),
+        staging_types=("integer", "text", "text", "text", "boolean", "boolean"),
+        validate=_validate_user,
+        # Existing e-mails (and duplicates within a chunk) are skipped and reported
+        merge_sql="""
+            WITH inserted AS (
+                INSERT INTO users (email, full_name, hashed_password, is_active, is_superuser, created_at, updated_at)
+                SELECT email, full_name, hashed_password, is_active, is_superuser, now(), now()
+                FROM {staging}
+                ORDER BY line
+                ON CONFLICT (email) DO NOTHING
+                RETURNING email
+            )
+            SELECT DISTINCT ON (s.email) s.line
+            FROM {staging} s JOIN inserted i ON i.email = s.email
+            ORDER BY s.email, s.line
+        """,
+        skipped_error="email already exists",
+    ),
+    "items": ImportSpec(
+        table="items",
+        staging_columns=("line", "title", "description", "owner_id"),
+        staging_types=("integer", "text", "text", "integer"),
+        validate=_validate_item,
+        # Rows whose owner does not exist are skipped and reported. The
+        # INSERT in the CTE runs even though the outer query does not read it.
+        merge_sql="""
+            WITH inserted AS (
+                INSERT INTO items (title, description, owner_id, created_at, updated_at)
+                SELECT s.title, s.description, s.owner_id, now(), now()
+                FROM {staging} s
+                WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = s.owner_id)
+                ORDER BY s.line
+            )
+            SELECT s.line FROM {staging} s
+            WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = s.owner_id)
+        """,
+        skipped_error="owner does not exist",
+    ),
+}
+
+
+def read_rows(source: TextIO, fmt: str) -> Iterator[SourceRow]:
+    """
+    Stream rows from a CSV (with header) or NDJSON file.
+
+    Empty CSV fields are read as missing values. Unparseable NDJSON lines are
+    yielded as a row holding only the parse error under ``"__error__"``.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(source)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}
+        return
+
+    for line_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, {"__error__": f"Invalid JSON: {e.msg}"}
+            continue
+        if not isinstance(row, dict):
+            row = {"__error__": "Each line must be a JSON object"}
+        yield line_number, row
+
+
+def _chunks(rows: Iterable[SourceRow], size: int) -> Iterator[List[SourceRow]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def validate_chunk(
+    spec: ImportSpec, chunk: List[SourceRow]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[RejectedRow]]:
+    """Split a chunk into valid (line, values) pairs and rejected rows."""
+    valid = []
+    errors = []
+    for line, row in chunk:
+        if "__error__" in row:
+            errors.append(RejectedRow(line, row["__error__"], {}))
+            continue
+        try:
+            valid.append((line, spec.validate(dict(row))))
+        except (ValidationError, ValueError) as e:
+            errors.append(RejectedRow(line, str(e), _redact(row)))
+    return valid, errors
+
+
+def _redact(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop secrets before a row is written to the error report."""
+    return {
+        k: v for k, v in row.items()
+        if k not in {"password", "password_confirm", "hashed_password"}
+    }
+
+
+async def hash_passwords(
+    valid: List[Tuple[int, Dict[str, Any]]], pool: Optional[Executor]
+) -> None:
+    """Hash plaintext passwords of a validated user chunk in the process pool."""
+    pending = [values for _, values in valid if values.get("password")]
+    if not pending:
+        return
+    passwords = [values.pop("password") for values in pending]
+    if pool is None:
+        hashes = [get_password_hash(password) for password in passwords]
+    else:
+        loop = asyncio.get_running_loop()
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(pool, get_password_hash, password)
+            for password in passwords
+        ))
+    for values, hashed in zip(pending, hashes):
+        values["hashed_password"] = hashed
+
+
+async def import_rows(
+    conn: asyncpg.Connection,
+    kind: str,
+    rows: Iterable[SourceRow],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pool: Optional[Executor] = None,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+    on_rejected: Optional[Callable[[List[RejectedRow]], None]] = None,
+) -> ImportReport:
+    """
+    Import rows into ``users`` or ``items``.
+
+    Each chunk is validated, staged with COPY and merged in its own
+    transaction, so a failure loses at most the chunk in flight.
+
+    Args:
+        conn: asyncpg connection
+        kind: "users" or "items"
+        rows: Source rows, e.g. from read_rows
+        chunk_size: Rows per validation/COPY/merge round
+        pool: Executor for password hashing (users only); inline if None
+        on_progress: Called with the running report after each chunk
+        on_rejected: Called with the rejected rows of each chunk that has any;
+            they are not kept afterwards
+
+    Returns:
+        Counts of read and imported rows
+    """
+    spec = SPECS[kind]
+    staging = f"import_{spec.table}"
+    columns = ", ".join(
+        f"{name} {type_}" for name, type_ in zip(spec.staging_columns, spec.staging_types)
+    )
+    await conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging} ({columns})")
+    merge_sql = spec.merge_sql.format(staging=staging)
+
+    report = ImportReport()
+    for chunk in _chunks(rows, chunk_size):
+        report.read += len(chunk)
+        valid, errors = validate_chunk(spec, chunk)
+        await hash_passwords(valid, pool)
+
+        if valid:
+            records = [
+                (line, *(values[name] for name in spec.staging_columns[1:]))
+                for line, values in valid
+            ]
+            async with conn.transaction():
+                await conn.copy_records_to_table(
+                    staging, records=records, columns=list(spec.staging_columns)
+                )
+                inserted = {row["line"] for row in await conn.fetch(merge_sql)}
+                await conn.execute(f"TRUNCATE {staging}")
+            report.imported += len(inserted)
+            rows_by_line = dict(chunk)
+            errors.extend(
+                RejectedRow(line, spec.skipped_error, _redact(rows_by_line[line]))
+                for line, _ in valid
+                if line not in inserted
+            )
+
+        if errors and on_rejected:
+            on_rejected(errors)
+        if on_progress:
+            on_progress(report)
+    return report
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    """Turn an SQLAlchemy URL into a plain libpq DSN for asyncpg."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import users or items.")
+    parser.add_argument("kind", choices=sorted(SPECS))
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="password hashing processes")
+    parser.add_argument("--errors", type=Path, help="write rejected rows here as NDJSON")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+    started = time.perf_counter()
+
+    def on_progress(report: ImportReport) -> None:
+        rate = report.read / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"\r{args.kind}: {report.read:,} read, {report.imported:,} imported, "
+            f"{report.rejected:,} rejected ({rate:,.0f} rows/s)",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    conn = await asyncpg.connect(_asyncpg_dsn(get_settings().database_url_for_env))
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.kind == "users" else None
+    try:
+        with ExitStack() as files:
+            source = files.enter_context(args.path.open(newline="" if fmt == "csv" else None))
+            out = files.enter_context(args.errors.open("w")) if args.errors else None
+
+            def write_rejected(errors: List[RejectedRow]) -> None:
+                out.writelines(
+                    json.dumps({"line": error.line, "error": error.error, "row": error.row}) + "\n"
+                    for error in errors
+                )
+
+            report = await import_rows(
+                conn,
+                args.kind,
+                read_rows(source, fmt),
+                chunk_size=args.chunk_size,
+                pool=pool,
+                on_progress=on_progress,
+                on_rejected=write_rejected if out else None,
+            )
+    finally:
+        if pool:
+            pool.shutdown()
+        await conn.close()
+    print(file=sys.stderr)
+
+    logger.info(
+        "bulk_import_finished",
+        kind=args.kind,
+        read=report.read,
+        imported=report.imported,
+        rejected=report.rejected,
+        seconds=round(time.perf_counter() - started, 1),
+    )
+    return 1 if report.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,202 @@
+"""Sampling of EXPLAIN (ANALYZE, BUFFERS) plans for slow queries.
+
+When enabled, a slow SELECT seen by the query monitor is re-run in the
+background under EXPLAIN (ANALYZE, BUFFERS) on its own pooled connection,
+with the same parameters, inside a read-only transaction that is rolled back.
+Statements that take row locks or call side-effecting functions are never
+re-run, and the re-run itself is hidden from the query monitor. Captures are
+rate-limited per statement fingerprint, only one runs at a time, and the
+plans are kept in a fixed-size ring buffer (GET /api/v1/admin/queries/plans).
+
+This is the application-side counterpart of PostgreSQL's ``auto_explain``
+module, for databases where server settings cannot be changed. Plans are
+re-run, not recorded, so they show the statement as it performs now rather
+than at the moment it was slow.
+"""
+import asyncio
+import contextvars
+import json
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Set
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+from app.db.session import engine
+
+if TYPE_CHECKING:
+    from app.db.query_monitor import StatementInfo
+
+logger = structlog.get_logger()
+
+# Upper bound for a re-run; a statement slower than this is not explained
+EXPLAIN_STATEMENT_TIMEOUT_MS = 10_000
+
+# Fingerprints remembered for rate limiting before stale entries are pruned
+MAX_TRACKED_FINGERPRINTS = 10_000
+
+# Execution option marking a connection the query monitor's listeners ignore
+SKIP_MONITOR_OPTION = "skip_query_monitor"
+
+# Row locks would block or be taken again by the re-run, and these functions
+# act outside the transaction, so a read-only rollback does not undo them.
+# Other volatile functions that write fail in the read-only transaction.
+_UNSAFE_PATTERN = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b|\bSKIP\s+LOCKED\b|\bNOWAIT\b"
+    r"|\b(?:nextval|setval|pg_advisory\w*|pg_try_advisory\w*|pg_sleep\w*|pg_notify"
+    r"|pg_cancel_backend|pg_terminate_backend|set_config|dblink\w*|lo_\w+)\s*\(",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PlanSample:
+    """An EXPLAIN (ANALYZE, BUFFERS) plan captured for a slow statement."""
+
+    fingerprint: str
+    table: str
+    duration_seconds: float
+    execution_ms: float
+    plan: Dict[str, Any]
+    seq_scans: List[Dict[str, Any]] = field(default_factory=list)
+    captured_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def find_seq_scans(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the sequential scan nodes of a JSON plan, outermost first."""
+    scans = []
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop(0)
+        if node.get("Node Type") == "Seq Scan":
+            scans.append({
+                "relation": node.get("Relation Name"),
+                "rows": node.get("Actual Rows"),
+                "rows_removed_by_filter": node.get("Rows Removed by Filter", 0),
+            })
+        nodes.extend(node.get("Plans", ()))
+    return scans
+
+
+class ExplainSampler:
+    """
+    Re-runs slow SELECTs under EXPLAIN (ANALYZE, BUFFERS) and keeps the plans.
+
+    A fingerprint is explained at most once per ``interval`` seconds; the
+    ``capacity`` most recent plans are kept.
+    """
+
+    def __init__(self, engine: AsyncEngine, *, enabled: bool, interval: float, capacity: int):
+        self.engine = engine
+        self.enabled = enabled
+        self.interval = interval
+        self.plans: Deque[PlanSample] = deque(maxlen=capacity)
+        self._last_capture: Dict[str, float] = {}
+        self._in_flight = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    def maybe_capture(
+        self,
+        dialect: str,
+        statement: str,
+        parameters: Any,
+        info: "StatementInfo",
+        duration: float,
+    ) -> bool:
+        """
+        Schedule a plan capture for a slow statement if sampling allows it.
+
+        Called from the cursor listener, so it never blocks: the capture runs
+        as a task on the current event loop. Returns whether one was scheduled.
+        """
+        if not self.enabled or self._in_flight:
+            return False
+        # EXPLAIN ANALYZE executes the statement, so only plain reads are re-run
+        if dialect != "postgresql" or info.query_type != "select":
+            return False
+        if _UNSAFE_PATTERN.search(statement):
+            return False
+        now = time.monotonic()
+        last = self._last_capture.get(info.fingerprint)
+        if last is not None and now - last < self.interval:
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+        if len(self._last_capture) >= MAX_TRACKED_FINGERPRINTS:
+            self._last_capture = {
+                fingerprint: at for fingerprint, at in self._last_capture.items()
+                if now - at < self.interval
+            }
+        self._last_capture[info.fingerprint] = now
+        self._in_flight = True
+        # A fresh context keeps the EXPLAIN out of the request's query counters
+        task = loop.create_task(
+            self._capture(statement, parameters, info, duration),
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _capture(
+        self, statement: str, parameters: Any, info: "StatementInfo", duration: float
+    ) -> Optional[PlanSample]:
+        try:
+            async with self.engine.connect() as conn:
+                # Keeps the re-run out of slow query metrics and query stats
+                await conn.execution_options(**{SKIP_MONITOR_OPTION: True})
+                async with conn.begin() as transaction:
+                    await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                    await conn.exec_driver_sql(
+                        f"SET LOCAL statement_timeout = {EXPLAIN_STATEMENT_TIMEOUT_MS}"
+                    )
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                    )
+                    output = result.scalar_one()
+                    await transaction.rollback()
+        except Exception as e:
+            logger.warning("explain_capture_failed", fingerprint=info.fingerprint, error=str(e))
+            return None
+        finally:
+            self._in_flight = False
+
+        if isinstance(output, str):
+            output = json.loads(output)
+        explained = output[0]
+        sample = PlanSample(
+            fingerprint=info.fingerprint,
+            table=info.table,
+            duration_seconds=round(duration, 4),
+            execution_ms=explained.get("Execution Time", 0.0),
+            plan=explained["Plan"],
+            seq_scans=find_seq_scans(explained["Plan"]),
+        )
+        self.plans.append(sample)
+        logger.info(
+            "slow_query_plan_captured",
+            fingerprint=info.fingerprint,
+            execution_ms=sample.execution_ms,
+            seq_scans=[scan["relation"] for scan in sample.seq_scans],
+        )
+        return sample
+
+    def recent(self) -> List[PlanSample]:
+        """Captured plans, newest first."""
+        return list(reversed(self.plans))
+
+
+explain_sampler = ExplainSampler(
+    engine,
+    enabled=get_settings().query_explain_enabled,
+    interval=get_settings().query_explain_interval,
+    capacity=get_settings().query_explain_plans_kept,
+)
@@ -1,46 +1,124 @@
-"""Database metrics module."""
-from typing import Dict, Any
+"""Database metrics module.
 
+Pool events keep a snapshot of each pool's occupancy (``get_pool_stats``),
+and time how long every connection is held between checkout and checkin.
+Hold time is recorded per pool and attributed to the route that held the
+connection (see ``bind_request_scope``). Connections held for longer than
+``database_pool_leak_seconds`` (off by default) are reported by
+``watch_for_leaks`` with the stack that checked them out; sessions of
+streaming responses are expected to be held long and are not tracked.
+
+How long tasks wait to get a connection is recorded by the pool itself
+(app.db.pool).
+"""
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import asyncio
+import sys
+import time
+import traceback
+
+import greenlet
 import structlog
 from sqlalchemy import event
-from sqlalchemy.pool import NullPool
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import NullPool, Pool
 
-from app.db.session import engine
-from app.core.metrics import get_metrics
+from app.core.config import get_settings
+from app.core.metrics import get_endpoint_label, get_metrics
+from app.db.session import engine, replica_router
 
 logger = structlog.get_logger()
 
 # Initialize metrics
 metrics = get_metrics()
 
-def get_pool_stats() -> Dict[str, Any]:
-    """Get current database pool statistics."""
-    if isinstance(engine.pool, NullPool):
-        # Return dummy stats for NullPool
-        stats = {
-            "size": 0,
-            "checked_in": 0,
-            "checked_out": 0,
-            "overflow": 0,
-        }
+# Frames kept of the stack that checked out a connection
+LEAK_STACK_LIMIT = 30
+
+# Route of the request running in the current context, for hold time
+_request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("db_request_scope", default=None)
+
+# Set while a streaming response holds its session, so it is not reported as a leak
+_streaming: ContextVar[bool] = ContextVar("db_streaming", default=False)
+
+# Engines whose pools are tracked, by pool label
+_engines: Dict[str, Engine] = {}
+
+# Latest occupancy of each pool, by pool label, updated on checkout/checkin
+_pool_stats: Dict[str, Dict[str, int]] = {}
+
+# Connection records currently checked out, by id
+_checked_out: Dict[int, Any] = {}
+
+
+def bind_request_scope(scope: Dict[str, Any], streaming: bool = False) -> None:
+    """
+    Attribute connections checked in from this context to the request's route.
+
+    Checkouts of a ``streaming`` context are kept out of leak detection.
+    """
+    _request_scope.set(scope)
+    _streaming.set(streaming)
+
+
+def _caller_stack() -> traceback.StackSummary:
+    """Stack of the code that asked for a connection, without source lines."""
+    frame = sys._getframe(2)
+    # Async engines run pool code in a greenlet whose own stack ends at
+    # SQLAlchemy; the application's coroutines are on the parent's stack
+    parent = greenlet.getcurrent().parent
+    if parent is not None and parent.gr_frame is not None:
+        frame = parent.gr_frame
+    stack = traceback.StackSummary.extract(
+        traceback.walk_stack(frame), limit=LEAK_STACK_LIMIT, lookup_lines=False
+    )
+    # Outermost call first, as in a traceback
+    stack.reverse()
+    return stack
+
+
+def _pool_label(pool: Pool) -> str:
+    return getattr(pool, "label", "primary")
+
+
+def _snapshot(pool: Pool, returning: bool = False) -> Dict[str, int]:
+    """Read a pool's occupancy and publish it."""
+    if isinstance(pool, NullPool):
+        stats = {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
     else:
-        pool = engine.pool
         stats = {
             "size": pool.size(),
             "checked_in": pool.checkedin(),
             "checked_out": pool.checkedout(),
             "overflow": pool.overflow(),
         }
-
-    # Update Prometheus metrics
-    try:
+        if returning:
+            # The checkin event fires before the pool takes the connection
+            # back; it is queued, or closed if the queue is full
+            stats["checked_out"] -= 1
+            if stats["checked_in"] < stats["size"]:
+                stats["checked_in"] += 1
+            else:
+                stats["overflow"] -= 1
+    label = _pool_label(pool)
+    _pool_stats[label] = stats
+    if label == "primary":
         metrics["db_pool_size"].set(stats["size"])
-    except (KeyError, AttributeError):
-        logger.debug("db_pool_size metric not initialized")
-
+    metrics["db_pool_checked_out"].labels(pool=label).set(stats["checked_out"])
     return stats
 
 
+def get_pool_stats(pool: str = "primary") -> Dict[str, Any]:
+    """Get the latest statistics of a database pool ("primary" or "replicaN")."""
+    stats = _pool_stats.get(pool)
+    if stats is None:
+        # No checkout or checkin yet
+        stats = _snapshot(_engines[pool].pool)
+    return dict(stats)
+
+
 async def log_pool_stats() -> None:
     """Log current database pool statistics."""
     try:
@@ -56,32 +134,122 @@ async def log_pool_stats() -> None:
         logger.error("db_pool_stats_error", error=str(e))
 
 
-def on_checkout(dbapi_con, con_record, con_proxy):
+def on_checkout(pool: Pool, con_record: Any) -> None:
     """Handle connection checkout event."""
     try:
         metrics["db_pool_checkouts"].inc()
+        con_record.info["checked_out_at"] = time.perf_counter()
+        con_record.info["pool"] = _pool_label(pool)
+        if get_settings().database_pool_leak_seconds > 0 and not _streaming.get():
+            # Source lines are only looked up if the connection leaks
+            con_record.info["checkout_stack"] = _caller_stack()
+            con_record.info.pop("leak_reported", None)
+            _checked_out[id(con_record)] = con_record
+        stats = _snapshot(pool)
         # Check if we're at max capacity and need to overflow
-        if not isinstance(engine.pool, NullPool):
-            if engine.pool.checkedout() >= engine.pool.size():
-                metrics["db_pool_overflow"].inc()
-                logger.warning(
-                    "db_pool_overflow",
-                    current_size=engine.pool.size(),
-                    overflow=engine.pool.overflow(),
-                )
+        if not isinstance(pool, NullPool) and stats["checked_out"] >= stats["size"]:
+            metrics["db_pool_overflow"].inc()
+            logger.warning(
+                "db_pool_overflow",
+                pool=_pool_label(pool),
+                current_size=stats["size"],
+                overflow=stats["overflow"],
+            )
     except Exception as e:
         logger.error("db_pool_checkout_error", error=str(e))
 
 
-def on_checkin(dbapi_con, con_record):
+def on_detach(pool: Pool, con_record: Any) -> None:
+    """Handle connection detach event; a detached connection is never checked in."""
+    try:
+        _checked_out.pop(id(con_record), None)
+        con_record.info.pop("checked_out_at", None)
+        _snapshot(pool)
+    except Exception as e:
+        logger.error("db_pool_detach_error", error=str(e))
+
+
+def on_checkin(pool: Pool, con_record: Any) -> None:
     """Handle connection checkin event."""
     try:
         metrics["db_pool_checkins"].inc()
+        _checked_out.pop(id(con_record), None)
+        checked_out_at = con_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            held = time.perf_counter() - checked_out_at
+            label = _pool_label(pool)
+            metrics["db_pool_hold_seconds"].labels(pool=label).observe(held)
+            scope = _request_scope.get()
+            endpoint = get_endpoint_label(scope) if scope is not None else "background"
+            metrics["db_pool_endpoint_hold_seconds"].labels(endpoint=endpoint).inc(held)
+        _snapshot(pool, returning=True)
     except Exception as e:
         logger.error("db_pool_checkin_error", error=str(e))
 
 
-# Register event listeners for our specific engine instance
-if not isinstance(engine.sync_engine.pool, NullPool):
-    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
-    event.listen(engine.sync_engine.pool, "checkin", on_checkin) 
\ No newline at end of file
+def find_leaks(threshold: float) -> List[Dict[str, Any]]:
+    """
+    Report connections held longer than ``threshold`` seconds.
+
+    Each checkout is reported once, with the stack that checked it out.
+    """
+    now = time.perf_counter()
+    leaks = []
+    for con_record in list(_checked_out.values()):
+        checked_out_at = con_record.info.get("checked_out_at")
+        if checked_out_at is None:
+            _checked_out.pop(id(con_record), None)
+            continue
+        if con_record.info.get("leak_reported"):
+            continue
+        held = now - checked_out_at
+        if held < threshold:
+            continue
+        con_record.info["leak_reported"] = True
+        stack = con_record.info.get("checkout_stack")
+        leaks.append({
+            "pool": con_record.info.get("pool"),
+            "held_seconds": round(held, 1),
+            "stack": "".join(stack.format()) if stack is not None else None,
+        })
+    return leaks
+
+
+async def watch_for_leaks() -> None:
+    """Log connections held past ``database_pool_leak_seconds``, until cancelled."""
+    threshold = get_settings().database_pool_leak_seconds
+    if threshold <= 0:
+        return
+    while True:
+        await asyncio.sleep(threshold / 2)
+        for leak in find_leaks(threshold):
+            metrics["db_pool_leaks"].labels(pool=leak["pool"]).inc()
+            logger.warning("db_connection_leak", **leak)
+
+
+def register_pool_events(db_engine: AsyncEngine) -> None:
+    """Track checkouts and checkins of an engine's pool."""
+    sync_engine = db_engine.sync_engine
+    if isinstance(sync_engine.pool, NullPool):
+        return
+    _engines[_pool_label(sync_engine.pool)] = sync_engine
+
+    # engine.pool is looked up on every event because dispose() replaces the
+    # pool (the new one keeps these listeners)
+    def checkout(dbapi_con, con_record, con_proxy):
+        on_checkout(sync_engine.pool, con_record)
+
+    def checkin(dbapi_con, con_record):
+        on_checkin(sync_engine.pool, con_record)
+
+    def detach(dbapi_con, con_record):
+        on_detach(sync_engine.pool, con_record)
+
+    event.listen(sync_engine.pool, "checkout", checkout)
+    event.listen(sync_engine.pool, "checkin", checkin)
+    event.listen(sync_engine.pool, "detach", detach)
+
+
+# Register event listeners for our specific engine instances
+for db_engine in (engine, *replica_router.engines):
+    register_pool_events(db_engine)
@@ -0,0 +1,39 @@
+"""Connection pool with checkout instrumentation."""
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import get_metrics
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long each checkout takes, and how
+    many tasks are checking out at the moment (``db_pool_waiting``).
+
+    The time covers waiting for a free connection, opening a new one when
+    the pool may grow, and the pre-ping. A p95 that is more than a few
+    milliseconds means requests are queueing for connections and the pool
+    (or the database's ``max_connections``) is too small for the load.
+    """
+
+    # Reported as the "pool" label; replica pools are renamed after creation
+    label = "primary"
+
+    def connect(self):
+        metrics = get_metrics()
+        waiting = metrics["db_pool_waiting"].labels(pool=self.label)
+        waiting.inc()
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waiting.dec()
+            metrics["db_pool_checkout_wait_seconds"].labels(pool=self.label).observe(
+                time.perf_counter() - started
+            )
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
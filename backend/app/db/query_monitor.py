@@ -1,7 +1,14 @@
 """SQL query monitoring module."""
+import heapq
+import math
+import re
+import threading
 import time
-from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Dict, Optional
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 import structlog
 from sqlalchemy import event
@@ -10,74 +17,271 @@ from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.db.session import engine
+from app.db.session import engine, replica_router
+from app.core.config import get_settings
 from app.core.metrics import get_metrics
+from app.core.timing import record_timing
+from app.db.explain import SKIP_MONITOR_OPTION, explain_sampler
 
 logger = structlog.get_logger()
 
 # Initialize metrics
 metrics = get_metrics()
 
+# Literals and bind parameters of every paramstyle (qmark, named, numeric,
+# pyformat, asyncpg's $n); "::" casts are left alone
+_LITERAL_PATTERN = re.compile(
+    r"'(?:[^']|'')*'|(?<![\w:]):\w+|\$\d+|%\(\w+\)s|\?|\b\d+(?:\.\d+)?\b"
+)
+# IN lists of any length collapse to one placeholder, keeping the type cast
+# asyncpg adds to each one (e.g. "IN ($1::INTEGER, $2::INTEGER)")
+_PLACEHOLDER = r"\?(?:::\w+(?: \w+)*(?:\[\])?)?"
+_IN_LIST_PATTERN = re.compile(
+    rf"(\bIN\s*)\(\s*({_PLACEHOLDER})(?:\s*,\s*{_PLACEHOLDER})*\s*\)",
+    re.IGNORECASE,
+)
+# Multi-row VALUES collapse to their first row when every row has its shape,
+# so bulk inserts of any batch size match
+_ROW = r"\((?:[^()]|\([^()]*\))*\)"
+_VALUES_ROWS_PATTERN = re.compile(rf"(\bVALUES\s*)({_ROW})(?:\s*,\s*\2)+", re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape, so repeats with other values match."""
+    statement = _LITERAL_PATTERN.sub("?", statement)
+    statement = _VALUES_ROWS_PATTERN.sub(r"\1\2", statement)
+    statement = _IN_LIST_PATTERN.sub(r"\1(\2)", statement)
+    return " ".join(statement.split())
+
+
+# Table a statement is attributed to: the target of INSERT/UPDATE/DELETE, or
+# the first FROM of a SELECT that is not a subquery
+_TABLE_PATTERNS = {
+    "select": re.compile(r"\bFROM\s+(?!\()([\w.\"]+)", re.IGNORECASE),
+    "insert": re.compile(r"^INSERT\s+INTO\s+([\w.\"]+)", re.IGNORECASE),
+    "update": re.compile(r"^UPDATE\s+([\w.\"]+)", re.IGNORECASE),
+    "delete": re.compile(r"^DELETE\s+FROM\s+([\w.\"]+)", re.IGNORECASE),
+}
+
+# Distinct statement strings remembered by classify_statement; SQLAlchemy
+# caches compiled SQL, so an application emits a bounded set of them
+STATEMENT_CACHE_SIZE = 4096
+
+# Statements slower than this are logged, counted and may be explained
+SLOW_QUERY_SECONDS = 0.1
+
+
+class StatementInfo(NamedTuple):
+    """Fingerprint and metric labels of a SQL statement."""
+
+    fingerprint: str
+    query_type: str
+    table: str
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def classify_statement(statement: str) -> StatementInfo:
+    """Fingerprint a statement and work out its type and main table, cached per string."""
+    fingerprint = normalize_statement(statement)
+    keyword = fingerprint.split(" ", 1)[0].lower()
+    if keyword not in _TABLE_PATTERNS:
+        return StatementInfo(fingerprint, "other", "unknown")
+    match = _TABLE_PATTERNS[keyword].search(fingerprint)
+    table = match.group(1).strip('"').split(".")[-1] if match else "unknown"
+    return StatementInfo(fingerprint, keyword, table)
+
+
 def extract_table_name(query: str) -> str:
     """Extract main table name from SQL query."""
-    # Simple heuristic - can be improved based on actual query patterns
-    query = query.lower()
-    if "from" not in query:
-        return "unknown"
-    
-    # Get the part after FROM
-    from_part = query.split("from")[1].strip()
-    # Get the first word (table name)
-    table = from_part.split()[0].strip('"')
-    # Remove any schema prefix
-    if "." in table:
-        table = table.split(".")[-1]
-    return table
+    return classify_statement(query).table
+
 
 def get_query_type(query: str) -> str:
     """Determine query type from SQL statement."""
-    query = query.lower().strip()
-    if query.startswith("select"):
-        return "select"
-    elif query.startswith("insert"):
-        return "insert"
-    elif query.startswith("update"):
-        return "update"
-    elif query.startswith("delete"):
-        return "delete"
-    else:
-        return "other"
+    return classify_statement(query).query_type
+
+
+class FingerprintStats:
+    """Running totals and recent durations of one statement fingerprint."""
+
+    __slots__ = ("query_type", "table", "count", "total", "max", "samples")
+
+    def __init__(self, info: StatementInfo, samples: int):
+        self.query_type = info.query_type
+        self.table = info.table
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=samples)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class QueryStats:
+    """
+    Execution time per statement fingerprint, bounded in memory.
+
+    At most ``max_fingerprints`` fingerprints are kept; the least recently
+    executed one makes room for a new one. Percentiles are computed from the
+    last ``samples`` durations of each fingerprint. Figures are per process.
+    """
+
+    def __init__(self, max_fingerprints: int = 1000, samples: int = 256):
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self._stats: "OrderedDict[str, FingerprintStats]" = OrderedDict()
+        # Sync engines may execute from worker threads
+        self._lock = threading.Lock()
+
+    def record(self, info: StatementInfo, duration: float) -> None:
+        """Add one execution of a statement."""
+        with self._lock:
+            stats = self._stats.get(info.fingerprint)
+            if stats is None:
+                stats = self._stats[info.fingerprint] = FingerprintStats(info, self.samples)
+                if len(self._stats) > self.max_fingerprints:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(info.fingerprint)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.samples.append(duration)
+
+    def top(self, n: int = 20) -> List[Dict[str, Any]]:
+        """
+        Report the fingerprints with the highest total execution time.
+
+        Args:
+            n: Number of fingerprints to return
+
+        Returns:
+            Dicts with fingerprint, query_type, table, count and total, mean,
+            p50, p95 and max durations in seconds, highest total first
+        """
+        with self._lock:
+            entries = heapq.nlargest(n, self._stats.items(), key=lambda item: item[1].total)
+            snapshot = [(fingerprint, stats, sorted(stats.samples)) for fingerprint, stats in entries]
+        return [
+            {
+                "fingerprint": fingerprint,
+                "query_type": stats.query_type,
+                "table": stats.table,
+                "count": stats.count,
+                "total_seconds": stats.total,
+                "mean_seconds": stats.total / stats.count,
+                "p50_seconds": _percentile(ordered, 0.5),
+                "p95_seconds": _percentile(ordered, 0.95),
+                "max_seconds": stats.max,
+            }
+            for fingerprint, stats, ordered in snapshot
+        ]
+
+    def reset(self) -> None:
+        """Forget all fingerprints."""
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats(
+    max_fingerprints=get_settings().query_stats_max_fingerprints,
+    samples=get_settings().query_stats_samples,
+)
+
+
+class QueryCounter:
+    """Statements executed while a count_queries() block is active."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        """Number of statements (database round trips)."""
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Normalized statements that ran more than ``threshold`` times, most frequent first."""
+        counts = Counter(classify_statement(statement).fingerprint for statement in self.statements)
+        return [(statement, n) for statement, n in counts.most_common() if n > threshold]
+
+
+# Counters of the enclosing count_queries() blocks, innermost last
+_active_counters: ContextVar[Tuple[QueryCounter, ...]] = ContextVar(
+    "active_query_counters", default=()
+)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count the queries executed in the current context.
+
+    Blocks nest: a statement is recorded by every enclosing counter, so a
+    test can wrap a request that the per-request middleware counts as well.
+
+    Example:
+        with count_queries() as counter:
+            await crud.user.get(db, id=1)
+        assert counter.count == 1
+    """
+    counter = QueryCounter()
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
 
 def record_query_metrics(query: str, duration: float) -> None:
     """Record query metrics."""
-    logger.debug(f"[Metrics] Recording metrics for query: {query[:100]}... Duration: {duration:.4f}s")
-    query_type = get_query_type(query)
-    table = extract_table_name(query)
-    
+    info = classify_statement(query)
+    query_type, table = info.query_type, info.table
+
     # Update metrics
     metrics["db_query_count"].labels(query_type=query_type, table=table).inc()
     metrics["db_query_duration_seconds"].labels(query_type=query_type, table=table).observe(duration)
-    
-    # Log slow queries (>100ms)
-    if duration > 0.1:
+
+    # Log slow queries
+    if duration > SLOW_QUERY_SECONDS:
         metrics["db_slow_queries"].labels(query_type=query_type, table=table).inc()
         logger.warning(
-            f"Slow query detected: {duration:.4f}s - {query_type} on {table}"
+            "slow_query",
+            duration_seconds=round(duration, 4),
+            query_type=query_type,
+            table=table,
+            fingerprint=info.fingerprint,
         )
 
 def before_cursor_execute(
     conn, cursor, statement, parameters, context, executemany
 ):
     """Event listener for query execution start."""
+    if context.execution_options.get(SKIP_MONITOR_OPTION):
+        return
     context._query_start_time = time.time()
+    for counter in _active_counters.get():
+        counter.statements.append(statement)
     
 def after_cursor_execute(
     conn, cursor, statement, parameters, context, executemany
 ):
     """Event listener for query execution end."""
+    if context.execution_options.get(SKIP_MONITOR_OPTION):
+        return
     start_time = context._query_start_time
     total_time = time.time() - start_time
     record_query_metrics(statement, total_time)
+    record_timing("db", total_time)
+    # Only statements seen by the cursor, so flushes and QueryMonitor
+    # wrappers are not counted twice
+    info = classify_statement(statement)
+    query_stats.record(info, total_time)
+    if total_time > SLOW_QUERY_SECONDS and not executemany:
+        explain_sampler.maybe_capture(conn.dialect.name, statement, parameters, info, total_time)
 
 # --- ORM Event Listeners --- 
 
@@ -109,6 +313,10 @@ else:
     event.listen(engine, "before_cursor_execute", before_cursor_execute)
     event.listen(engine, "after_cursor_execute", after_cursor_execute)
 
+for replica in replica_router.engines:
+    event.listen(replica.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(replica.sync_engine, "after_cursor_execute", after_cursor_execute)
+
 # Register ORM event listeners globally for Session (applied to AsyncSession)
 # Note: The event system uses the sync Session for targets
 event.listen(Session, "before_flush", before_flush)
@@ -1,65 +1,114 @@
 """Database session module."""
-from typing import AsyncGenerator, Dict, Any
+from typing import AsyncGenerator, Dict, Any, List, Optional, Sequence
+from uuid import uuid4
+import asyncio
+import itertools
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+import structlog
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.core.config import Settings, get_settings
 from app.db.base_class import Base
+from app.db.pool import InstrumentedQueuePool
+
+logger = structlog.get_logger()
+
+# Pool sizes per deployment shape. Every worker process has its own pool, so
+# a host opens up to workers * (pool_size + max_overflow) connections; keep
+# that, summed over all hosts, below the database's max_connections.
+POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Many workers per host, or PgBouncer in front of the database
+    "small": {"pool_size": 5, "max_overflow": 5, "pool_timeout": 10, "pool_recycle": 1800},
+    "default": {"pool_size": 20, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800},
+    # Few workers talking to a large database
+    "large": {"pool_size": 40, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800},
+    # Small pool for testing to enable pool metrics
+    "testing": {"pool_size": 5, "max_overflow": 2, "pool_timeout": 5, "pool_recycle": 300},
+}
+
+# Session settings sent at connect time; PgBouncer only forwards these
+# parameters, the others are rejected or would leak between clients
+PGBOUNCER_SERVER_SETTINGS = ("timezone", "application_name")
+
+
+def _pgbouncer_statement_name() -> str:
+    # Names must not repeat on a server connection shared with other clients
+    return f"__asyncpg_{uuid4()}__"
+
 
 def get_engine_args(settings: Settings) -> Dict[str, Any]:
-    """Get database engine arguments based on environment."""
-    common_args = {
-        "echo": settings.debug,
-        "future": True,
-        "pool_pre_ping": True,
-        "connect_args": {
-            "command_timeout": 60,
-            "statement_cache_size": 0 if settings.testing else 1000,
-            "prepared_statement_cache_size": 0 if settings.testing else 500,
+    """
+    Get database engine arguments based on environment.
+
+    The pool is sized by ``settings.database_pool_profile`` (see
+    POOL_PROFILES), with ``database_pool_size``, ``database_max_overflow``
+    and ``database_pool_timeout`` overriding single values. With
+    ``database_pgbouncer`` set, the connection is made safe for PgBouncer's
+    transaction pooling: prepared statements are not cached, get unique
+    names, and only the startup parameters PgBouncer tracks are sent.
+    """
+    server_settings = {
+        "timezone": "UTC",
+        "application_name": "neoforge",
+        "jit": "off",
+        "work_mem": "64MB",
+        "maintenance_work_mem": "128MB",
+        "effective_cache_size": "1GB",
+        "effective_io_concurrency": "200",
+        "random_page_cost": "1.1",
+        "cpu_tuple_cost": "0.03",
+        "cpu_index_tuple_cost": "0.01",
+    }
+    connect_args: Dict[str, Any] = {
+        "command_timeout": 60,
+        "statement_cache_size": 0 if settings.testing else 1000,
+        "prepared_statement_cache_size": 0 if settings.testing else 500,
+        "server_settings": server_settings,
+    }
+    if settings.database_pgbouncer:
+        connect_args.update({
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _pgbouncer_statement_name,
             "server_settings": {
-                "timezone": "UTC",
-                "application_name": "neoforge",
-                "jit": "off",
-                "work_mem": "64MB",
-                "maintenance_work_mem": "128MB",
-                "effective_cache_size": "1GB",
-                "effective_io_concurrency": "200",
-                "random_page_cost": "1.1",
-                "cpu_tuple_cost": "0.03",
-                "cpu_index_tuple_cost": "0.01",
+                name: value for name, value in server_settings.items()
+                if name in PGBOUNCER_SERVER_SETTINGS
             },
-        },
-    }
-
-    # Use a small pool for testing to enable pool metrics
-    if settings.testing:
-        common_args.update({
-            "poolclass": AsyncAdaptedQueuePool,
-            "pool_size": 5,
-            "max_overflow": 2,
-            "pool_timeout": 5,
-            "pool_recycle": 300,
-        })
-    else:
-        common_args.update({
-            "poolclass": AsyncAdaptedQueuePool,
-            "pool_size": 20,
-            "max_overflow": 10,
-            "pool_timeout": 30,
-            "pool_recycle": 1800,
         })
 
-    return common_args
+    profile = "testing" if settings.testing else settings.database_pool_profile
+    pool_args = dict(POOL_PROFILES[profile])
+    overrides = {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+    }
+    pool_args.update({name: value for name, value in overrides.items() if value is not None})
+
+    return {
+        "echo": settings.debug,
+        "future": True,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+        "poolclass": InstrumentedQueuePool,
+        **pool_args,
+    }
 
 # Get settings instance once
 current_settings = get_settings()
 
 # Create async engine with timezone support and optimized pooling
-engine = create_async_engine(
-    current_settings.database_url_for_env,
-    **get_engine_args(current_settings),
+engine_args = get_engine_args(current_settings)
+engine = create_async_engine(current_settings.database_url_for_env, **engine_args)
+logger.info(
+    "db_pool_configured",
+    profile="testing" if current_settings.testing else current_settings.database_pool_profile,
+    pool_size=engine_args["pool_size"],
+    max_overflow=engine_args["max_overflow"],
+    pgbouncer=current_settings.database_pgbouncer,
 )
 
 # Create async session factory with optimized settings
@@ -71,6 +120,174 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+# Replication state of a server, turned into a lag by replica_lag().
+# pg_stat_wal_receiver has no row while no WAL receiver runs; its status is
+# NULL for roles without pg_read_all_stats.
+REPLICA_STATE_QUERY = text("""
+    SELECT
+        pg_is_in_recovery() AS in_recovery,
+        receiver.pid IS NOT NULL AS has_receiver,
+        receiver.status AS receiver_status,
+        pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AS replayed_all,
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS replay_age
+    FROM (SELECT 1) AS server
+    LEFT JOIN pg_stat_wal_receiver AS receiver ON true
+""")
+
+
+def replica_lag(state: Any) -> Optional[float]:
+    """
+    Seconds a replica has fallen behind the primary, or None if it is cut off.
+
+    A streaming replica that has replayed all WAL it received is caught up
+    (lag 0), so an idle primary does not make its replicas look stale.
+    Without a WAL receiver nothing new arrives, and received == replayed
+    says nothing, so the replica is reported as unusable.
+
+    Args:
+        state: Row of REPLICA_STATE_QUERY
+    """
+    if not state.in_recovery:
+        return 0.0
+    if not state.has_receiver or state.receiver_status not in (None, "streaming"):
+        return None
+    if state.receiver_status == "streaming" and state.replayed_all:
+        return 0.0
+    if state.replay_age is None:
+        return None
+    return float(state.replay_age)
+
+
+class ReplicaRouter:
+    """
+    Round-robin choice among the read replicas that are currently healthy.
+
+    A background task measures each replica's replication lag every
+    ``check_interval`` seconds. Replicas that cannot be reached or lag more
+    than ``max_lag`` seconds are skipped; with none left, reads go to the
+    primary. Until the first check completes all reads go to the primary.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], *, max_lag: float, check_interval: float):
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Dict[AsyncEngine, Optional[float]] = dict.fromkeys(self.engines)
+        self.healthy: List[AsyncEngine] = []
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Next healthy replica, or None to use the primary."""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    async def check(self) -> None:
+        """Measure the lag of every replica and update the healthy set."""
+        for replica in self.engines:
+            try:
+                async with replica.connect() as conn:
+                    if replica.dialect.name == "postgresql":
+                        lag = replica_lag((await conn.execute(REPLICA_STATE_QUERY)).one())
+                    else:
+                        # Stand-in replicas (e.g. SQLite in tests) never lag
+                        await conn.execute(text("SELECT 1"))
+                        lag = 0.0
+            except Exception as e:
+                logger.warning("replica_check_failed", replica=repr(replica.url), error=str(e))
+                lag = None
+            self.lag[replica] = None if lag is None else float(lag)
+
+        healthy = [
+            replica for replica in self.engines
+            if self.lag[replica] is not None and self.lag[replica] <= self.max_lag
+        ]
+        if healthy != self.healthy:
+            logger.info(
+                "replicas_changed",
+                healthy=len(healthy),
+                total=len(self.engines),
+                lag={repr(replica.url): self.lag[replica] for replica in self.engines},
+            )
+        self.healthy = healthy
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        """Start the health checks; does nothing without replicas."""
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the health checks and close the replica pools."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.healthy = []
+        for replica in self.engines:
+            await replica.dispose()
+
+
+replica_router = ReplicaRouter(
+    [create_async_engine(url, **engine_args) for url in current_settings.database_replica_urls],
+    max_lag=current_settings.replica_max_lag_seconds,
+    check_interval=current_settings.replica_check_interval,
+)
+for number, replica in enumerate(replica_router.engines, start=1):
+    replica.pool.label = f"replica{number}"
+
+
+class ReplicaSession(Session):
+    """
+    Session for read-only work that runs its queries on a replica.
+
+    The replica is chosen once, on first use, so every query of the session
+    sees the same snapshot. Flushes and INSERT/UPDATE/DELETE statements go to
+    the primary, and so does the rest of the session after one of them.
+    Setting ``info["use_primary"]`` before the first query keeps the whole
+    session on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["replica"] = None
+        elif "replica" not in self.info:
+            self.info["replica"] = None if self.info.get("use_primary") else replica_router.choose()
+        replica = self.info.get("replica")
+        if replica is not None:
+            return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+ReadSessionLocal = sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=ReplicaSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_write(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
 
 async def init_db() -> None:
     """Initialize database."""
@@ -93,4 +310,18 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close() 
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get a database session for read-only work.
+
+    Queries run on a healthy read replica when one is configured, and on the
+    primary otherwise.
+
+    Yields:
+        Database session routed to a replica
+    """
+    async with ReadSessionLocal() as session:
+        yield session
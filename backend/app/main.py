@@ -5,11 +5,13 @@ A modern, cost-efficient starter kit for bootstrapped founders.
 """
 from contextlib import asynccontextmanager
 from typing import Annotated, AsyncGenerator
+import asyncio
 import time
 
 import structlog
-from fastapi import Depends, FastAPI, HTTPException, status, APIRouter
+from fastapi import Depends, FastAPI, HTTPException, Request, status, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
 from fastapi.openapi.docs import get_swagger_ui_html
 from pydantic import BaseModel
@@ -18,9 +20,11 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.core.auth import PasswordHasherBusy, shutdown_hash_executor
 from app.core.config import get_settings
 from app.core.logging import setup_logging
-from app.db.session import get_db, engine
+from app.db.metrics import watch_for_leaks
+from app.db.session import get_db, engine, replica_router
 from app.db.base import Base
 from app.core.redis import get_redis, redis_client
 from app.api.v1.api import api_router
@@ -28,8 +32,14 @@ from app.api.endpoints import metrics
 from app.worker.email_worker import email_worker
 from app.core.queue import EmailQueue
 # Import specific middleware setup functions
-from app.api.middleware import setup_security_middleware, setup_validation_middleware
-from app.core.metrics import get_metrics
+from app.api.middleware import (
+    QueryCountMiddleware,
+    RateLimitMiddleware,
+    ServerTimingMiddleware,
+    setup_security_middleware,
+    setup_validation_middleware,
+)
+from app.core.metrics import get_metrics, cleanup_dead_workers, mark_worker_dead
 from app.schemas.user import UserResponse
 from app.api import deps
 
@@ -86,9 +96,12 @@ async def lifespan(app: FastAPI):
     # Initialize services
     await init_db()
     await init_redis()
+    replica_router.start()
+    leak_watcher = asyncio.create_task(watch_for_leaks())
     
     # Initialize metrics
     get_metrics()
+    cleanup_dead_workers()
     
     # Initialize email queue
     email_queue = EmailQueue(redis=redis_client)
@@ -107,7 +120,11 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     email_worker.stop()
+    leak_watcher.cancel()
+    await replica_router.stop()
     await close_redis()
+    shutdown_hash_executor()
+    mark_worker_dead()
     
     logger.info("application_shutdown")
 
@@ -144,6 +161,19 @@ app = FastAPI(
 # Override the default OpenAPI schema
 app.openapi = custom_openapi
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy) -> JSONResponse:
+    """Shed load when the password hashing executor is saturated."""
+    logger.warning("password_hasher_busy", path=request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "detail": "Too Many Requests",
+            "message": "Please try again later",
+        },
+        headers={"Retry-After": "1"},
+    )
+
 # Set up CORS first
 if get_settings().cors_origins:
     app.add_middleware(
@@ -158,6 +188,19 @@ if get_settings().cors_origins:
 setup_security_middleware(app)
 setup_validation_middleware(app)
 
+# Report N+1 query patterns while developing
+if get_settings().environment == "development":
+    app.add_middleware(QueryCountMiddleware, settings=get_settings())
+
+# Rate limit before validation; it also verifies the bearer token once for
+# get_current_user (see request.state.token_claims)
+if get_settings().enable_rate_limiting:
+    app.add_middleware(RateLimitMiddleware, settings=get_settings())
+
+# Report where request time goes; outermost, so the total covers the stack
+if get_settings().server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware, settings=get_settings())
+
 # Add API router
 app.include_router(api_router, prefix=get_settings().api_v1_str)
 
@@ -35,7 +35,11 @@ class Admin(Base):
     """Admin model extending the base user model."""
     __tablename__ = "admins"
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), unique=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
     role: Mapped[AdminRole] = mapped_column(SQLEnum(AdminRole), nullable=False)
     is_active: Mapped[bool] = mapped_column(default=True)
     last_login: Mapped[Optional[datetime]] = mapped_column(TZDateTime, nullable=True)
@@ -1,7 +1,7 @@
 """Item model."""
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
@@ -14,19 +14,23 @@ class Item(Base):
     """Item model."""
 
     __tablename__ = "items"
+    __table_args__ = (
+        # Serves owner-filtered listings ordered by ID, including keyset seeks
+        Index("ix_items_owner_id_id", "owner_id", "id"),
+    )
 
     title: Mapped[str] = mapped_column(index=True)
     description: Mapped[str | None]
     owner_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     # Relationships
     owner: Mapped["User"] = relationship(
         "User",
         back_populates="items",
-        lazy="joined",
+        # Joined only by queries that ask for it, see CRUDItem.loader_profiles
+        lazy="raise",
         innerjoin=True,  # Since owner_id is not nullable
     ) 
\ No newline at end of file
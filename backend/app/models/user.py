@@ -27,11 +27,17 @@ class User(Base):
         "Item",
         back_populates="owner",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        # Never loaded implicitly; CRUDUser's loader profiles decide per
+        # query, and deletes leave the items to ON DELETE CASCADE
+        lazy="raise",
+        passive_deletes=True,
     )
     admin: Mapped[Optional["Admin"]] = relationship(
         "Admin",
         back_populates="user",
         uselist=False,
-        lazy="selectin",
+        # Admin lookups join the user from the admin side instead, and
+        # deletes leave the admin row to ON DELETE CASCADE
+        lazy="raise",
+        passive_deletes=True,
     ) 
\ No newline at end of file
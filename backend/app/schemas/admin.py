@@ -1,6 +1,6 @@
 """Admin schemas for request/response validation."""
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, ConfigDict
 
@@ -126,4 +126,28 @@ class AdminAuditLog(AdminAuditLogBase):
 
     id: int
     admin_id: int
-    created_at: datetime 
\ No newline at end of file
+    created_at: datetime 
+
+class QueryFingerprintStats(BaseModel):
+    """Execution statistics of one normalized SQL statement."""
+    fingerprint: str
+    query_type: str
+    table: str
+    count: int
+    total_seconds: float
+    mean_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    max_seconds: float
+
+
+class QueryPlanSample(BaseModel):
+    """EXPLAIN (ANALYZE, BUFFERS) plan captured for a slow statement."""
+    fingerprint: str
+    table: str
+    duration_seconds: float
+    execution_ms: float
+    seq_scans: List[Dict[str, Any]]
+    plan: Dict[str, Any]
+    captured_at: datetime
+    model_config = ConfigDict(from_attributes=True)
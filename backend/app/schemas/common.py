@@ -1,14 +1,23 @@
+from typing import Generic, List, Optional, TypeVar
+
 from pydantic import BaseModel, Field
 
+T = TypeVar("T")
+
+
 class PaginationParams(BaseModel):
     """Parameters for pagination."""
     page: int = Field(default=1, ge=1, description="Page number")
     page_size: int = Field(default=10, ge=1, le=100, description="Number of items per page")
 
-class PaginatedResponse(BaseModel):
+class PaginatedResponse(BaseModel, Generic[T]):
     """Generic response model for paginated results."""
-    items: list
-    total: int
-    page: int
+    items: List[T]
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    pages: int 
\ No newline at end of file
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque cursor for the next page; absent on the last page",
+    )
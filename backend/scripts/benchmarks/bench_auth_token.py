@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""Benchmark concurrent logins against /auth/token.
+
+By default two in-process apps are compared: one whose token endpoint
+verifies bcrypt inline on the event loop, and one that uses the bounded
+hashing executor. Each run fires concurrent logins while probing a cheap
+endpoint, so the probe latency shows how much logins stall other requests.
+
+With --url the same load is sent to a running server's real endpoint.
+
+Usage:
+    python scripts/benchmarks/bench_auth_token.py [--concurrency 32] [--logins 128]
+    python scripts/benchmarks/bench_auth_token.py --url http://localhost:8000 \\
+        --email user@example.com --password secret
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Form, HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.core.auth import (  # noqa: E402
+    PasswordHasherBusy,
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+
+PASSWORD = "benchmark-password"
+TOKEN_PATH = "/api/v1/auth/token"
+
+
+def build_app(offload: bool) -> FastAPI:
+    """Build an app with a token endpoint and a cheap probe endpoint."""
+    app = FastAPI()
+    hashed = get_password_hash(PASSWORD)
+
+    @app.post(TOKEN_PATH)
+    async def token(username: str = Form(...), password: str = Form(...)):
+        try:
+            if offload:
+                valid = await verify_password_async(password, hashed)
+            else:
+                valid = verify_password(password, hashed)
+        except PasswordHasherBusy:
+            raise HTTPException(status_code=429, detail="Too Many Requests")
+        if not valid:
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        return {"access_token": "token", "token_type": "bearer"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+async def run_load(
+    client: httpx.AsyncClient, logins: int, concurrency: int, email: str, password: str
+) -> Tuple[float, List[float], List[int], List[float]]:
+    """Fire logins with bounded concurrency while probing /health."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: List[int] = []
+    probes: List[float] = []
+    done = asyncio.Event()
+
+    async def login() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                TOKEN_PATH, data={"username": email, "password": password}
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    async def probe() -> None:
+        while not done.is_set():
+            # Measure from when the probe was due, so event loop stalls count
+            due = time.perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            await client.get("/health")
+            probes.append(time.perf_counter() - due)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return elapsed, latencies, statuses, probes
+
+
+def report(name: str, elapsed: float, latencies: List[float], statuses: List[int], probes: List[float]) -> None:
+    """Print throughput and latency percentiles for one run."""
+    def pct(values: List[float], q: int) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, len(ordered) * q // 100)] * 1000 if ordered else 0.0
+
+    ok = statuses.count(200)
+    print(
+        f"{name:<10}{ok / elapsed:>9.1f}/s"
+        f"{pct(latencies, 50):>10.0f}{pct(latencies, 95):>10.0f}"
+        f"{pct(probes, 50):>10.1f}{pct(probes, 95):>10.1f}"
+        f"{statuses.count(429):>8}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'mode':<10}{'logins':>11}{'p50 ms':>10}{'p95 ms':>10}{'probe50':>10}{'probe95':>10}{'429s':>8}")
+    targets: List[Tuple[str, Optional[FastAPI]]] = (
+        [("remote", None)] if args.url else [("inline", build_app(False)), ("executor", build_app(True))]
+    )
+    for name, app in targets:
+        if app is None:
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        else:
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+            )
+        async with client:
+            result = await run_load(client, args.logins, args.concurrency, args.email, args.password)
+        report(name, *result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=128)
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default=PASSWORD)
+    asyncio.run(main(parser.parse_args()))
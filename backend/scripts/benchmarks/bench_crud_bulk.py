@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Benchmark per-row CRUD vs the bulk create_many/update_many/remove_many.
+
+Uses a scratch table shaped like items in the configured database (or the
+one given with --database-url) and reports rows per second for each
+operation. The per-row path commits each row, as CRUDBase.create,
+update and remove do.
+
+Usage:
+    python scripts/benchmarks/bench_crud_bulk.py [--rows N] [--database-url URL]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import String
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.crud.base import CRUDBase  # noqa: E402
+from app.db.types import TZDateTime  # noqa: E402
+from app.utils.datetime import utc_now  # noqa: E402
+
+
+class BenchBase(DeclarativeBase):
+    pass
+
+
+class BenchItem(BenchBase):
+    """Same columns as the items table, without the foreign key."""
+
+    __tablename__ = "bench_bulk_items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    description: Mapped[Optional[str]]
+    owner_id: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TZDateTime, default=utc_now)
+    updated_at: Mapped[datetime] = mapped_column(TZDateTime, default=utc_now, onupdate=utc_now)
+
+
+class BenchItemCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    owner_id: int
+
+
+crud = CRUDBase(BenchItem)
+
+
+def items_in(rows: int) -> list:
+    return [BenchItemCreate(title=f"item {i}", description="bench", owner_id=1) for i in range(rows)]
+
+
+async def per_row(session: AsyncSession, rows: int) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    created = [await crud.create(session, obj_in=obj) for obj in items_in(rows)]
+    timings["create"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for obj in created:
+        await crud.update(session, db_obj=obj, obj_in={"title": "renamed"})
+    timings["update"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for obj in created:
+        await crud.remove(session, id=obj.id)
+    timings["remove"] = time.perf_counter() - start
+    return timings
+
+
+async def bulk(session: AsyncSession, rows: int) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    created = await crud.create_many(session, objs_in=items_in(rows))
+    timings["create"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await crud.update_many(session, objs_in=[{"id": obj.id, "title": "renamed"} for obj in created])
+    timings["update"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await crud.remove_many(session, ids=[obj.id for obj in created])
+    timings["remove"] = time.perf_counter() - start
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--database-url", default=get_settings().database_url_for_env)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(BenchBase.metadata.drop_all)
+        await conn.run_sync(BenchBase.metadata.create_all)
+
+    results = {}
+    for name, run in (("per-row", per_row), ("bulk", bulk)):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            results[name] = await run(session, args.rows)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(BenchBase.metadata.drop_all)
+    await engine.dispose()
+
+    print(f"{'operation':<10}{'per-row':>14}{'bulk':>14}{'speedup':>10}")
+    for op in ("create", "update", "remove"):
+        row_rate = args.rows / results["per-row"][op]
+        bulk_rate = args.rows / results["bulk"][op]
+        print(f"{op:<10}{row_rate:>10.0f} r/s{bulk_rate:>10.0f} r/s{bulk_rate / row_rate:>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Benchmark JWT verification with and without the verified-token cache.
+
+Usage:
+    python scripts/benchmarks/bench_jwt_decode.py [iterations]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from jose import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.security import (  # noqa: E402
+    clear_token_cache,
+    create_access_token,
+    decode_access_token,
+)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    settings = get_settings()
+    secret = settings.secret_key.get_secret_value()
+    token = create_access_token(subject=1, settings=settings)
+
+    clear_token_cache()
+    results = {
+        "jose.jwt.decode": timeit.timeit(
+            lambda: jwt.decode(token, secret, algorithms=[settings.algorithm]),
+            number=iterations,
+        ),
+        "decode_access_token (cached)": timeit.timeit(
+            lambda: decode_access_token(token, settings), number=iterations
+        ),
+    }
+
+    baseline = results["jose.jwt.decode"]
+    print(f"{'decoder':<32}{'per call':>12}{'speedup':>10}")
+    for name, total in results.items():
+        print(f"{name:<32}{total / iterations * 1e6:>9.2f} us{baseline / total:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
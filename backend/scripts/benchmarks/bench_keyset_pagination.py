@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Benchmark OFFSET vs keyset pagination at increasing page depth.
+
+Loads a scratch table (10M rows by default, via generate_series) into the
+configured database and times one owner-filtered page at several depths
+with both strategies, using the same query builder as the list endpoints.
+The table is dropped afterwards unless --keep is given, so reruns can skip
+the load.
+
+Usage:
+    python scripts/benchmarks/bench_keyset_pagination.py [--rows N] [--limit N] [--keep]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import BigInteger, Index, String, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.crud.base import CRUDBase  # noqa: E402
+
+OWNER_ID = 1
+REPEATS = 5
+
+
+class BenchBase(DeclarativeBase):
+    pass
+
+
+class BenchItem(BenchBase):
+    """Mirror of the items table shape and its (owner_id, id) index."""
+
+    __tablename__ = "bench_pagination_items"
+    __table_args__ = (Index("ix_bench_pagination_items_owner_id_id", "owner_id", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    owner_id: Mapped[int] = mapped_column(nullable=False)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+
+
+crud = CRUDBase(BenchItem)
+
+
+async def load(conn: AsyncConnection, rows: int) -> None:
+    """Create and fill the scratch table unless it already holds ``rows`` rows."""
+    await conn.run_sync(BenchBase.metadata.create_all)
+    existing = (await conn.execute(select(func.count()).select_from(BenchItem))).scalar_one()
+    if existing == rows:
+        return
+    print(f"loading {rows:,} rows ...", flush=True)
+    await conn.execute(text(f"TRUNCATE {BenchItem.__tablename__}"))
+    await conn.execute(text(
+        f"INSERT INTO {BenchItem.__tablename__} (id, owner_id, title) "
+        f"SELECT g, {OWNER_ID}, 'item ' || g FROM generate_series(1, :rows) AS g"
+    ), {"rows": rows})
+    await conn.execute(text(f"ANALYZE {BenchItem.__tablename__}"))
+
+
+async def time_page(conn: AsyncConnection, query) -> float:
+    """Return the median wall time of ``query`` in milliseconds."""
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        (await conn.execute(query)).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    args = parser.parse_args()
+
+    engine = create_async_engine(get_settings().database_url_for_env)
+    async with engine.begin() as conn:
+        await load(conn, args.rows)
+
+    depths = [d for d in (0, 10_000, 100_000, 1_000_000, 5_000_000) if d < args.rows]
+    depths.append(args.rows - args.limit)
+    base = select(BenchItem).where(BenchItem.owner_id == OWNER_ID)
+
+    print(f"{'depth':>12}{'offset':>14}{'keyset':>14}{'speedup':>10}")
+    async with engine.connect() as conn:
+        for depth in depths:
+            offset_ms = await time_page(conn, crud.paginate(base, skip=depth, limit=args.limit))
+            # IDs are contiguous, so the cursor for this depth is the ID before it
+            keyset_ms = await time_page(conn, crud.paginate(base, limit=args.limit, after=depth))
+            print(
+                f"{depth:>12,}{offset_ms:>11.2f} ms{keyset_ms:>11.2f} ms"
+                f"{offset_ms / keyset_ms:>9.0f}x"
+            )
+
+    if not args.keep:
+        async with engine.begin() as conn:
+            await conn.run_sync(BenchBase.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Benchmark counter/histogram overhead in single-process vs multiprocess mode.
+
+prometheus_client picks its value backend at import time, so each mode is
+measured in a fresh interpreter.
+
+Usage:
+    python scripts/benchmarks/bench_metrics_multiprocess.py [iterations]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+WORKER = """
+import json, sys, timeit
+from prometheus_client import Counter, Histogram
+
+iterations = int(sys.argv[1])
+counter = Counter("bench_requests_total", "bench", ["method", "endpoint", "status"])
+histogram = Histogram("bench_duration_seconds", "bench", ["method", "endpoint"])
+child = counter.labels(method="GET", endpoint="/api/v1/items/{item_id}", status="200")
+hist_child = histogram.labels(method="GET", endpoint="/api/v1/items/{item_id}")
+
+results = {
+    "counter_inc_ns": timeit.timeit(child.inc, number=iterations) / iterations * 1e9,
+    "counter_labels_inc_ns": timeit.timeit(
+        lambda: counter.labels(
+            method="GET", endpoint="/api/v1/items/{item_id}", status="200"
+        ).inc(),
+        number=iterations,
+    ) / iterations * 1e9,
+    "histogram_observe_ns": timeit.timeit(
+        lambda: hist_child.observe(0.042), number=iterations
+    ) / iterations * 1e9,
+}
+print(json.dumps(results))
+"""
+
+
+def run(iterations: int, multiproc_dir: str | None) -> dict:
+    """Run the worker snippet and return its timings."""
+    env = {k: v for k, v in os.environ.items() if k.lower() != "prometheus_multiproc_dir"}
+    if multiproc_dir:
+        env["PROMETHEUS_MULTIPROC_DIR"] = multiproc_dir
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER, str(iterations)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    in_memory = run(iterations, None)
+    with tempfile.TemporaryDirectory() as tmp:
+        mmap_backed = run(iterations, tmp)
+
+    print(f"{'operation':<24}{'in-memory':>14}{'multiprocess':>16}{'ratio':>8}")
+    for key in in_memory:
+        ratio = mmap_backed[key] / in_memory[key]
+        print(f"{key:<24}{in_memory[key]:>11.0f} ns{mmap_backed[key]:>13.0f} ns{ratio:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
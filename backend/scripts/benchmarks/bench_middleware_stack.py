@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Benchmark request throughput of a bare app vs the middleware stack.
+
+Requests are driven in-process through httpx's ASGI transport, so the numbers
+measure middleware overhead only (no sockets, no server). Redis is replaced by
+an in-memory stub so rate limiting can be included without a server.
+
+Four apps are compared:
+    plain       no middleware
+    before      security headers + request validation as BaseHTTPMiddleware
+                (the previous implementations, kept in baseline_middleware.py)
+    after       the same two middleware as plain ASGI (this tree)
+    full stack  after + error handling + rate limiting
+
+Usage:
+    python scripts/benchmarks/bench_middleware_stack.py [requests]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import structlog
+from fastapi import FastAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.api.middleware import (  # noqa: E402
+    ErrorHandlerMiddleware,
+    RateLimitMiddleware,
+    RequestValidationMiddleware,
+    SecurityHeadersMiddleware,
+)
+from app.core.config import get_settings  # noqa: E402
+import baseline_middleware  # noqa: E402
+
+HEADERS = {"Accept": "application/json", "User-Agent": "bench"}
+
+
+class FakeRedis:
+    """In-memory redis replacement whose rate limit script always allows."""
+
+    def register_script(self, script):
+        async def run(keys, args):
+            return [1, int(args[0]) - 1, 0, 0]
+        return run
+
+
+def build_app(stack: str) -> FastAPI:
+    """Build a trivial app wrapped in the middleware of ``stack``."""
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.post("/api/v1/echo")
+    async def echo(payload: dict):
+        return payload
+
+    settings = get_settings().model_copy(update={"rate_limit_requests": 10**9})
+    if stack == "before":
+        app.add_middleware(baseline_middleware.SecurityHeadersMiddleware, settings=settings)
+        app.add_middleware(baseline_middleware.RequestValidationMiddleware, settings=settings)
+    elif stack == "after":
+        app.add_middleware(SecurityHeadersMiddleware, settings=settings)
+        app.add_middleware(RequestValidationMiddleware, settings=settings)
+    elif stack == "full stack":
+        app.add_middleware(SecurityHeadersMiddleware, settings=settings)
+        app.add_middleware(ErrorHandlerMiddleware)
+        app.add_middleware(RequestValidationMiddleware, settings=settings)
+        app.add_middleware(RateLimitMiddleware, settings=settings, redis_client=FakeRedis())
+    return app
+
+
+async def measure(app: FastAPI, requests: int, method: str) -> float:
+    """Return requests per second for ``requests`` sequential calls."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        if method == "GET":
+            call = lambda: client.get("/api/v1/ping", headers=HEADERS)  # noqa: E731
+        else:
+            call = lambda: client.post(  # noqa: E731
+                "/api/v1/echo", json={"name": "bench", "value": 42}, headers=HEADERS
+            )
+        for _ in range(50):
+            await call()
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call()
+        return requests / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("requests", nargs="?", type=int, default=2_000)
+    args = parser.parse_args()
+    # Keep logging out of the measurement
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+    stacks = ("plain", "before", "after", "full stack")
+    print(f"{'request':<10}" + "".join(f"{stack:>14}" for stack in stacks))
+    for method in ("GET", "POST"):
+        rates = [await measure(build_app(stack), args.requests, method) for stack in stacks]
+        print(f"{method:<10}" + "".join(f"{rate:>10.0f} r/s" for rate in rates))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
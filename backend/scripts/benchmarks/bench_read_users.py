@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Benchmark memory and latency of the read_users query per loader profile.
+
+Fills a scratch database with users that each own many items, then lists a
+page of users the way read_users does, once with the "items" profile (what
+the old ``lazy="selectin"`` relationship did on every fetch) and once with
+the default profile. Peak memory is measured with tracemalloc.
+
+The schema is created with create_all and dropped afterwards, so point
+--database-url at an empty scratch database; the default is in-memory SQLite.
+
+Usage:
+    python scripts/benchmarks/bench_read_users.py [--users N] [--items-per-user N]
+        [--database-url URL] [--rounds N]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.crud.user import user as user_crud  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.models import Item, User  # noqa: E402
+
+
+async def seed(engine: AsyncEngine, users: int, items_per_user: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"id": i, "email": f"user{i}@bench.local", "full_name": f"User {i}", "hashed_password": "x"}
+            for i in range(1, users + 1)
+        ])
+        rows = [
+            {"title": f"item {n}", "description": "bench", "owner_id": owner}
+            for owner in range(1, users + 1)
+            for n in range(items_per_user)
+        ]
+        for start in range(0, len(rows), 10_000):
+            await conn.execute(insert(Item), rows[start:start + 10_000])
+
+
+async def read_users(engine: AsyncEngine, users: int, load: Optional[str], rounds: int) -> dict:
+    """List one page of users ``rounds`` times; return latency and peak memory."""
+    timings = []
+    peak = 0
+    for _ in range(rounds):
+        async with AsyncSession(engine) as session:
+            tracemalloc.start()
+            start = time.perf_counter()
+            page = await user_crud.get_multi(session, limit=users, load=load)
+            timings.append(time.perf_counter() - start)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            assert len(page) == users
+    return {"p50": statistics.median(timings), "peak": peak}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--items-per-user", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    await seed(engine, args.users, args.items_per_user)
+
+    results = {}
+    for label, load in (("selectin", "items"), ("noload", None)):
+        results[label] = await read_users(engine, args.users, load, args.rounds)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+    print(f"{args.users} users x {args.items_per_user} items")
+    print(f"{'profile':<10}{'p50 latency':>14}{'peak memory':>14}")
+    for label, result in results.items():
+        print(f"{label:<10}{result['p50'] * 1000:>11.1f} ms{result['peak'] / 2**20:>11.1f} MiB")
+    before, after = results["selectin"], results["noload"]
+    print(
+        f"{'ratio':<10}{before['p50'] / after['p50']:>13.0f}x"
+        f"{before['peak'] / after['peak']:>13.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
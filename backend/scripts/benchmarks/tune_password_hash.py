@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Pick password hashing parameters that hit a target verify latency.
+
+Run this on the deployment host (or an identical instance): it measures
+verify latency for increasing bcrypt rounds and argon2id costs, and prints
+the strongest settings that stay within the target, ready for .env.
+
+Usage:
+    python scripts/benchmarks/tune_password_hash.py [--target-ms 250] [--scheme both]
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from passlib.hash import argon2, bcrypt
+
+PASSWORD = "correct horse battery staple"
+# Memory costs in KiB, from the OWASP minimum (19 MiB) upwards
+ARGON2_MEMORY_COSTS = [19456, 47104, 65536, 131072, 262144]
+
+
+def verify_latency_ms(hasher, samples: int) -> float:
+    """Return the median verify time in milliseconds for a configured hasher."""
+    hashed = hasher.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify(PASSWORD, hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def tune_bcrypt(target_ms: float, samples: int) -> Optional[Tuple[int, float]]:
+    """Return the highest bcrypt rounds within the target, with its latency."""
+    best = None
+    for rounds in range(8, 18):
+        latency = verify_latency_ms(bcrypt.using(rounds=rounds), samples)
+        print(f"  bcrypt rounds={rounds:<3}{latency:>10.1f} ms")
+        if latency > target_ms:
+            break
+        best = (rounds, latency)
+    return best
+
+
+def tune_argon2(target_ms: float, samples: int) -> Optional[Tuple[Dict[str, int], float]]:
+    """Return the strongest argon2id parameters within the target, with latency.
+
+    Memory is preferred over iterations, since memory hardness is what slows
+    down GPU attacks.
+    """
+    best = None
+    for memory_cost in ARGON2_MEMORY_COSTS:
+        for time_cost in range(1, 11):
+            params = {"memory_cost": memory_cost, "time_cost": time_cost, "parallelism": 1}
+            latency = verify_latency_ms(argon2.using(type="ID", **params), samples)
+            print(f"  argon2id m={memory_cost:<7} t={time_cost:<3}{latency:>10.1f} ms")
+            if latency > target_ms:
+                break
+            if best is None or (memory_cost, time_cost) > (
+                best[0]["memory_cost"], best[0]["time_cost"]
+            ):
+                best = (params, latency)
+        if time_cost == 1 and latency > target_ms:
+            # Even a single pass is too slow at this memory size
+            break
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2", "both"], default="both")
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    lines: List[str] = []
+    if args.scheme in ("bcrypt", "both"):
+        print(f"bcrypt (target {args.target_ms:.0f} ms):")
+        result = tune_bcrypt(args.target_ms, args.samples)
+        if result:
+            lines.append(f"BCRYPT_ROUNDS={result[0]}  # {result[1]:.0f} ms per verify")
+    if args.scheme in ("argon2", "both"):
+        print(f"argon2id (target {args.target_ms:.0f} ms):")
+        result = tune_argon2(args.target_ms, args.samples)
+        if result:
+            params, latency = result
+            lines.append(f"ARGON2_MEMORY_COST={params['memory_cost']}  # {latency:.0f} ms per verify")
+            lines.append(f"ARGON2_TIME_COST={params['time_cost']}")
+            lines.append(f"ARGON2_PARALLELISM={params['parallelism']}")
+
+    print("\nRecommended settings:")
+    print("\n".join(lines) if lines else "  nothing fits the target, raise --target-ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
 """Test admin API endpoints."""
+from collections import deque
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select, delete
+import json
 import logging
 
 from app.core.config import get_settings, Settings
+from app.db.explain import PlanSample, explain_sampler
 from app.models.admin import AdminRole, Admin
+from app.models.email_tracking import EmailEvent, EmailStatus, EmailTracking
 from app.models.user import User
 from tests.factories import UserFactory, AdminFactory
 
@@ -273,6 +278,21 @@ async def test_read_admin(client: AsyncClient, db: AsyncSession, admin_headers:
     assert data["user_id"] == admin_user.user_id
 
 
+async def test_admin_lookup_round_trips(client: AsyncClient, db: AsyncSession, super_admin_headers: dict, admin_user, max_queries, test_settings: Settings) -> None:
+    """Test admin reads fetch each admin together with its user."""
+    # get_current_admin costs two queries (principal and admin); reading
+    # another admin adds one joined admin/user select
+    budgets = {
+        f"{test_settings.api_v1_str}/admin/me": 2,
+        f"{test_settings.api_v1_str}/admin/{admin_user.id}": 3,
+    }
+    for url, budget in budgets.items():
+        db.expunge_all()
+        with max_queries(budget):
+            response = await client.get(url, headers=super_admin_headers)
+        assert response.status_code == 200
+
+
 async def test_read_admin_permission_denied(client: AsyncClient, db: AsyncSession, readonly_admin_headers: dict, test_settings: Settings):
     # This test might need adjustment based on actual endpoint and ID used
     target_admin_id = 999 # Example ID, replace if needed
@@ -290,8 +310,8 @@ async def test_read_admins(client: AsyncClient, db: AsyncSession, super_admin_he
     
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) > 0
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) > 0
 
 
 async def test_update_admin(client: AsyncClient, db: AsyncSession, super_admin_headers: dict, admin_user, test_settings: Settings) -> None:
@@ -364,4 +384,126 @@ async def test_delete_admin_permission_denied(client: AsyncClient, db: AsyncSess
     
     assert response.status_code == 403
     data = response.json()
-    assert "detail" in data 
\ No newline at end of file
+    assert "detail" in data 
+
+
+async def test_export_users_ndjson(client: AsyncClient, db: AsyncSession, admin_headers: dict, admin_user, test_settings: Settings) -> None:
+    """Test users are streamed as NDJSON without password hashes."""
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/export/users",
+        headers=admin_headers,
+        params={"chunk_size": 1},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert admin_user.user_id in {row["id"] for row in rows}
+    assert all("hashed_password" not in row for row in rows)
+
+
+async def test_export_items_csv_gzip(client: AsyncClient, db: AsyncSession, content_admin_headers: dict, test_settings: Settings) -> None:
+    """Test items are streamed as gzip-encoded CSV with a header row."""
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/export/items",
+        headers=content_admin_headers,
+        params={"format": "csv", "gzip": True},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx transparently decodes the gzip body
+    header = response.text.splitlines()[0]
+    assert header == "id,title,description,owner_id,created_at,updated_at"
+
+
+async def test_export_email_events_joins_tracking(client: AsyncClient, db: AsyncSession, admin_headers: dict, test_settings: Settings) -> None:
+    """Test email events are exported with the columns of the e-mail they belong to."""
+    tracking = EmailTracking(
+        email_id="export-test-email",
+        recipient="recipient@example.com",
+        subject="Welcome",
+        template_name="welcome",
+    )
+    db.add(tracking)
+    await db.flush()
+    event = EmailEvent(
+        email_id=tracking.id,
+        event_type=EmailStatus.OPENED,
+        ip_address="203.0.113.7",
+        event_metadata={"client": "webmail"},
+    )
+    db.add(event)
+    await db.flush()
+
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/export/email-events",
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = {row["id"]: row for row in map(json.loads, response.text.splitlines())}
+    exported = rows[event.id]
+    assert exported["email_id"] == "export-test-email"
+    assert exported["recipient"] == "recipient@example.com"
+    assert exported["template_name"] == "welcome"
+    assert exported["event_type"] == EmailStatus.OPENED.value
+    assert exported["ip_address"] == "203.0.113.7"
+    assert exported["event_metadata"] == {"client": "webmail"}
+
+
+async def test_export_permission_denied(client: AsyncClient, db: AsyncSession, readonly_admin_headers: dict, test_settings: Settings) -> None:
+    """Test read-only admins cannot export data."""
+    for resource in ("users", "items", "email-events"):
+        response = await client.get(
+            f"{test_settings.api_v1_str}/admin/export/{resource}",
+            headers=readonly_admin_headers,
+        )
+        assert response.status_code == 403
+
+
+async def test_read_top_queries(client: AsyncClient, db: AsyncSession, super_admin_headers: dict, readonly_admin_headers: dict, test_settings: Settings) -> None:
+    """Test the slowest statement fingerprints are listed for super admins only."""
+    await db.execute(select(User).where(User.email == "nobody@example.com"))
+
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/queries/top",
+        params={"limit": 5},
+        headers=super_admin_headers,
+    )
+    assert response.status_code == 200
+    rows = response.json()
+    assert 0 < len(rows) <= 5
+    assert rows == sorted(rows, key=lambda row: row["total_seconds"], reverse=True)
+    assert all("nobody@example.com" not in row["fingerprint"] for row in rows)
+
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/queries/top",
+        headers=readonly_admin_headers,
+    )
+    assert response.status_code == 403
+
+
+async def test_read_query_plans(client: AsyncClient, super_admin_headers: dict, readonly_admin_headers: dict, test_settings: Settings, monkeypatch) -> None:
+    """Test sampled plans are listed newest first for super admins only."""
+    monkeypatch.setattr(explain_sampler, "plans", deque(maxlen=2))
+    for table in ("users", "items", "admins"):
+        explain_sampler.plans.append(PlanSample(
+            fingerprint=f"SELECT * FROM {table}",
+            table=table,
+            duration_seconds=0.25,
+            execution_ms=240.0,
+            plan={"Node Type": "Seq Scan", "Relation Name": table},
+            seq_scans=[{"relation": table, "rows": 1, "rows_removed_by_filter": 0}],
+        ))
+
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/queries/plans",
+        headers=super_admin_headers,
+    )
+    assert response.status_code == 200
+    assert [plan["table"] for plan in response.json()] == ["admins", "items"]
+
+    response = await client.get(
+        f"{test_settings.api_v1_str}/admin/queries/plans",
+        headers=readonly_admin_headers,
+    )
+    assert response.status_code == 403
@@ -154,6 +154,35 @@ async def test_login_inactive_user(client: AsyncClient, db: AsyncSession, test_i
     assert data["detail"] == "Incorrect email or password"
 
 
+async def test_login_lockout_after_repeated_failures(
+    client: AsyncClient,
+    redis,
+    test_user: User,
+    test_user_email: str,
+    test_user_password: str,
+    test_settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test an account is locked out after repeated failed logins."""
+    monkeypatch.setattr(test_settings, "login_max_failures_per_account", 2)
+    url = f"{test_settings.api_v1_str}/auth/token"
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+
+    for _ in range(2):
+        response = await client.post(
+            url, data={"username": test_user_email, "password": "wrongpassword"}, headers=headers
+        )
+        assert response.status_code == 401
+
+    # Even the correct password is rejected while the lockout is active
+    response = await client.post(
+        url, data={"username": test_user_email, "password": test_user_password}, headers=headers
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.json()["detail"] == "Too many failed login attempts"
+
+
 async def test_read_users_me(client: AsyncClient, db: AsyncSession, test_user_headers: Dict[str, str], test_user: User, test_settings: Settings) -> None:
     """Test getting the current logged-in user's information."""
     response = await client.get(f"{test_settings.api_v1_str}/users/me", headers=test_user_headers) # Use test_settings, corrected endpoint path
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from typing import AsyncGenerator, Dict
 import logging
 
-from fastapi import HTTPException, Depends, FastAPI
+from fastapi import HTTPException, Depends, FastAPI, Request
 from httpx import AsyncClient, ASGITransport
 from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -305,4 +305,31 @@ async def test_get_current_active_admin(db: AsyncSession):
     
     # Test the dependency directly
     current_admin = await deps.get_current_active_admin(current_admin=admin)
-    assert current_admin == admin 
\ No newline at end of file
+    assert current_admin == admin 
+
+class MarkerRedis:
+    """Redis stand-in that only keeps keys."""
+
+    def __init__(self):
+        self.keys = {}
+
+    async def set(self, key, value, ex=None):
+        self.keys[key] = ex
+
+    async def exists(self, key):
+        return int(key in self.keys)
+
+
+async def test_read_your_writes_window(monkeypatch):
+    """Test a user's write is noted so their next reads skip the replicas."""
+    fake_redis = MarkerRedis()
+    monkeypatch.setattr(deps, "redis_client", fake_redis)
+    writer = Request({"type": "http", "headers": [], "state": {"token_claims": {"sub": "7"}}})
+    reader = Request({"type": "http", "headers": [], "state": {"token_claims": {"sub": "8"}}})
+    anonymous = Request({"type": "http", "headers": []})
+
+    await deps._note_recent_write(writer)
+    assert fake_redis.keys == {"read_your_writes:7": get_settings().read_your_writes_seconds}
+    assert await deps._wrote_recently(writer)
+    assert not await deps._wrote_recently(reader)
+    assert not await deps._wrote_recently(anonymous)
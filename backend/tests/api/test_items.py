@@ -96,7 +96,9 @@ async def test_read_items(client: AsyncClient, db: AsyncSession, test_user: User
         params={"skip": 0, "limit": 5}
     )
     assert response.status_code == 200
-    data = response.json()
+    page = response.json()
+    assert page["total"] >= 3
+    data = page["items"]
     assert isinstance(data, list)
     assert len(data) >= 3 # Ensure at least the created items are returned
     # Verify that all returned items belong to the test user
@@ -105,6 +107,40 @@ async def test_read_items(client: AsyncClient, db: AsyncSession, test_user: User
     # await db.commit() # Removed potentially redundant commit
 
 
+async def test_read_items_cursor_pagination(client: AsyncClient, db: AsyncSession, test_user: User, test_user_headers: Dict[str, str], test_settings: Settings) -> None:
+    """Test walking all items with cursors returns each item once, in ID order."""
+    for _ in range(5):
+        await ItemFactory.create(session=db, owner_id=test_user.id)
+    await db.commit()
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(
+            f"{test_settings.api_v1_str}/items/",
+            headers=test_user_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        if not page["next_cursor"]:
+            break
+        params = {"limit": 2, "cursor": page["next_cursor"]}
+
+    assert len(seen) >= 5
+    assert seen == sorted(set(seen))
+
+    # Tampered cursors are rejected
+    response = await client.get(
+        f"{test_settings.api_v1_str}/items/",
+        headers=test_user_headers,
+        params={"cursor": "WzFd.AAAAAAAAAAAAAAAAAAAAAA"},
+    )
+    assert response.status_code == 400
+
+
 async def test_update_item(client: AsyncClient, db: AsyncSession, test_user: User, test_user_headers: Dict[str, str], test_settings: Settings) -> None:
     """Test updating an item."""
     item = await ItemFactory.create(session=db, owner_id=test_user.id, title="Original Item Title")
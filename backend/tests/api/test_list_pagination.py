@@ -0,0 +1,50 @@
+"""Test totals of paginated list responses."""
+import pytest
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import CountStrategy, build_page, count_total
+from app.core.config import Settings
+from app.crud.item import item as item_crud
+from tests.factories import ItemFactory, UserFactory
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_count_strategies(db: AsyncSession, redis: Redis, test_settings: Settings):
+    """Test exact, estimated and cached totals for an owner's items."""
+    owner = await UserFactory.create(session=db)
+    for _ in range(3):
+        await ItemFactory.create(session=db, owner_id=owner.id)
+    await db.flush()
+    query = item_crud.query_by_owner(owner.id)
+    scope = f"items:{owner.id}"
+
+    async def count(strategy: CountStrategy, **kwargs):
+        return await count_total(
+            db, item_crud, query, strategy=strategy, scope=scope, settings=test_settings, **kwargs
+        )
+
+    assert await count(CountStrategy.NONE) is None
+    assert await count(CountStrategy.EXACT) == 3
+    # Small results are recounted exactly rather than trusting the planner
+    assert await count(CountStrategy.ESTIMATED) == 3
+    # Follow-up pages of a cursor walk skip the count
+    assert await count(CountStrategy.EXACT, cursor="next") is None
+
+    assert await count(CountStrategy.CACHED, redis=redis) == 3
+    await ItemFactory.create(session=db, owner_id=owner.id)
+    await db.flush()
+    # Served from Redis until the TTL expires
+    assert await count(CountStrategy.CACHED, redis=redis) == 3
+    assert await count(CountStrategy.EXACT) == 4
+
+
+def test_build_page_pages(test_settings: Settings):
+    """Test the page count is derived from the total."""
+    page = build_page(
+        [], limit=10, skip=0, cursor=None, scope="users", settings=test_settings, total=25
+    )
+    assert page.total == 25
+    assert page.pages == 3
+    assert page.page == 1
@@ -7,14 +7,25 @@ from datetime import datetime, timedelta, UTC
 
 import pytest
 import pytest_asyncio
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from httpx import AsyncClient, ASGITransport
 from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import patch
 
-from app.core.config import Settings
+from app.core.config import Settings, get_settings
+from app.api.middleware import query_count, server_timing
+from app.api.middleware.errors import ErrorHandlerMiddleware
+from app.api.middleware.rate_limit import (
+    LocalTokenBucket,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+)
 from app.api.middleware.security import SecurityHeadersMiddleware
 from app.api.middleware.validation import RequestValidationMiddleware
+from app.api.routing import ValidatedBodyRoute
 from tests.factories import UserFactory
 from app.main import app
 from app.models.user import User
@@ -126,4 +137,219 @@ async def test_rate_limit_middleware_no_redis_connection(
             "User-Agent": "TestClient"
         }
         response = await test_client.get("/test_no_redis", headers=headers)
-        assert response.status_code == 200 
\ No newline at end of file
+        assert response.status_code == 200 
+
+async def test_error_handler_middleware_unexpected_error(
+    app_with_middleware: FastAPI,
+):
+    """Test unhandled exceptions are turned into a JSON 500 response."""
+    app_with_middleware.add_middleware(ErrorHandlerMiddleware)
+
+    transport = ASGITransport(app=app_with_middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        response = await test_client.get("/error")
+        assert response.status_code == 500
+        assert response.json() == {
+            "detail": "Internal Server Error",
+            "message": "An unexpected error occurred",
+        }
+
+        response = await test_client.get("/test")
+        assert response.status_code == 200
+
+
+async def test_middleware_stack_passes_streaming_responses(
+    app_with_middleware: FastAPI,
+    test_settings: Settings,
+):
+    """Test the ASGI middleware stack forwards streamed chunks with headers added."""
+    @app_with_middleware.get("/stream")
+    async def stream_endpoint():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app_with_middleware.add_middleware(RequestValidationMiddleware, settings=test_settings)
+    app_with_middleware.add_middleware(ErrorHandlerMiddleware)
+    app_with_middleware.add_middleware(SecurityHeadersMiddleware, settings=test_settings)
+
+    transport = ASGITransport(app=app_with_middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        response = await test_client.get("/stream")
+        assert response.status_code == 200
+        assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+async def test_query_count_middleware_reports_n_plus_one(
+    app_with_middleware: FastAPI,
+    db: AsyncSession,
+    test_settings: Settings,
+):
+    """Test a statement repeated past the threshold in one request is reported once."""
+    @app_with_middleware.get("/users-one-by-one")
+    async def users_one_by_one():
+        for user_id in range(1, 5):
+            await db.execute(select(User).where(User.id == user_id))
+        return {"status": "ok"}
+
+    settings = test_settings.model_copy(update={"query_n_plus_one_threshold": 3})
+    app_with_middleware.add_middleware(query_count.QueryCountMiddleware, settings=settings)
+
+    transport = ASGITransport(app=app_with_middleware)
+    with patch.object(query_count.logger, "warning") as warning:
+        async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+            assert (await test_client.get("/users-one-by-one")).status_code == 200
+
+    warning.assert_called_once()
+    assert warning.call_args.kwargs["executions"] == 4
+    assert warning.call_args.kwargs["endpoint"] == "/users-one-by-one"
+    assert "FROM users WHERE users.id = ?" in warning.call_args.kwargs["statement"]
+
+
+async def test_server_timing_middleware_reports_breakdown(
+    app_with_middleware: FastAPI,
+    db: AsyncSession,
+    test_settings: Settings,
+):
+    """Test database and render time of a request end up in the header and log."""
+    router = APIRouter(route_class=ValidatedBodyRoute)
+
+    @router.get("/timed")
+    async def timed_endpoint():
+        await db.execute(select(User).where(User.id == 1))
+        await db.execute(select(User).where(User.id == 2))
+        return {"status": "ok"}
+
+    app_with_middleware.include_router(router)
+    app_with_middleware.add_middleware(server_timing.ServerTimingMiddleware, settings=test_settings)
+
+    transport = ASGITransport(app=app_with_middleware)
+    with patch.object(server_timing.logger, "info") as info:
+        async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+            response = await test_client.get("/timed")
+
+    assert response.status_code == 200
+    metrics = [metric.split(";")[0] for metric in response.headers["Server-Timing"].split(", ")]
+    assert metrics == ["db", "render", "total"]
+    assert 'desc="database (2)"' in response.headers["Server-Timing"]
+
+    info.assert_called_once()
+    fields = info.call_args.kwargs
+    assert fields["endpoint"] == "/timed"
+    assert fields["db_calls"] == 2
+    assert fields["redis_calls"] == 0
+    assert fields["render_calls"] == 1
+    assert fields["total_ms"] >= fields["db_ms"]
+
+
+class SlowRedis:
+    """Redis stand-in whose rate limit script never answers in time."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls += 1
+            await asyncio.sleep(1)
+        return run
+
+
+def test_local_token_bucket_refills():
+    """Test the fallback bucket allows a burst, then refills over time."""
+    bucket = LocalTokenBucket()
+    policy = RateLimitPolicy.parse("2/1")
+    assert bucket.hit("k", policy).allowed
+    assert bucket.hit("k", policy).allowed
+    denied = bucket.hit("k", policy)
+    assert not denied.allowed
+    assert 0 < denied.retry_after <= 0.5
+
+    time.sleep(0.55)
+    assert bucket.hit("k", policy).allowed
+
+
+async def test_rate_limit_gcra_releases_steady_client(
+    app_with_middleware: FastAPI,
+    redis: Redis,
+    test_settings: Settings,
+):
+    """Test GCRA limiting with headers, and release once the client slows down."""
+    settings = test_settings.model_copy(update={"rate_limit_policies": {"/test": "2/1"}})
+    app_with_middleware.add_middleware(RateLimitMiddleware, settings=settings, redis_client=redis)
+
+    transport = ASGITransport(app=app_with_middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        first = await test_client.get("/test")
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+
+        assert (await test_client.get("/test")).status_code == 200
+        limited = await test_client.get("/test")
+        assert limited.status_code == 429
+        assert limited.headers["X-RateLimit-Remaining"] == "0"
+        assert "Retry-After" in limited.headers
+
+        # One emission interval later a single request is allowed again
+        await asyncio.sleep(0.55)
+        assert (await test_client.get("/test")).status_code == 200
+
+
+async def test_rate_limit_falls_back_when_redis_is_slow(
+    app_with_middleware: FastAPI,
+    test_settings: Settings,
+):
+    """Test a slow Redis switches limiting to the local bucket for a cool-down."""
+    slow_redis = SlowRedis()
+    settings = test_settings.model_copy(update={
+        "rate_limit_policies": {"/test": "1/60"},
+        "rate_limit_redis_timeout": 0.01,
+    })
+    app_with_middleware.add_middleware(RateLimitMiddleware, settings=settings, redis_client=slow_redis)
+
+    transport = ASGITransport(app=app_with_middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        response = await test_client.get("/test")
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "1"
+
+        # Redis is skipped while degraded and the local bucket enforces the policy
+        assert (await test_client.get("/test")).status_code == 429
+        assert slow_redis.calls == 1
+
+
+def test_app_rate_limits_before_validation():
+    """Test the application installs the rate limiter outside request validation."""
+    if not get_settings().enable_rate_limiting:
+        pytest.skip("rate limiting is disabled")
+    # user_middleware lists the outermost middleware first
+    stack = [middleware.cls for middleware in app.user_middleware]
+    assert stack.index(RateLimitMiddleware) < stack.index(RequestValidationMiddleware)
+
+
+async def test_rate_limit_hands_verified_claims_to_request_state(
+    app_with_middleware: FastAPI,
+    test_settings: Settings,
+    valid_jwt_token: str,
+):
+    """Test the rate limiter keeps the claims it verified for get_current_user."""
+
+    @app_with_middleware.get("/claims")
+    async def claims_endpoint(request: Request):
+        return {"token": request.state.access_token, "sub": request.state.token_claims["sub"]}
+
+    settings = test_settings.model_copy(update={"rate_limit_redis_timeout": 0.01})
+    app_with_middleware.add_middleware(RateLimitMiddleware, settings=settings, redis_client=SlowRedis())
+
+    transport = ASGITransport(app=app_with_middleware)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        response = await test_client.get(
+            "/claims", headers={"Authorization": f"Bearer {valid_jwt_token}"}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"token": valid_jwt_token, "sub": "test-client"}
@@ -91,7 +91,7 @@ async def test_read_users(client: AsyncClient, db: AsyncSession, superuser_token
     logger.info(f"Read users response body: {response.text}")
     assert response.status_code == 200, f"Read users failed: {response.text}"
     
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) >= 3 # Check if at least the 3 created users are returned (might include superuser)
     created_emails = {u.email for u in test_users_created}
     returned_emails = {u['email'] for u in data}
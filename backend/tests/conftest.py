@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import contextmanager
 import pytest
 import pytest_asyncio
 from typing import AsyncGenerator, Generator, Dict, Optional
@@ -41,7 +42,7 @@ from app.core.config import get_settings as core_get_settings
 from tests.session_context import current_test_session 
 
 # Import event listeners from query_monitor
-from app.db.query_monitor import before_cursor_execute, after_cursor_execute
+from app.db.query_monitor import before_cursor_execute, after_cursor_execute, count_queries
 
 # Get a logger instance for conftest
 logger = logging.getLogger(__name__)
@@ -135,6 +136,25 @@ async def db(engine) -> AsyncGenerator[AsyncSession, None]:
         except Exception as e:
              logger.warning(f"Could not detach event listeners: {e}") # Log warning if removal fails
 
+@pytest.fixture
+def max_queries():
+    """
+    Assert that a block runs at most ``limit`` queries.
+
+    Example:
+        with max_queries(2):
+            await client.get("/api/v1/admin/me", headers=headers)
+    """
+    @contextmanager
+    def check(limit: int):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= limit, (
+            f"{counter.count} queries, budget {limit}:\n" + "\n".join(counter.statements)
+        )
+
+    return check
+
 @pytest_asyncio.fixture(scope="function")
 async def redis(test_settings) -> AsyncGenerator[Redis, None]:
     """Create a test Redis connection using settings from the environment."""
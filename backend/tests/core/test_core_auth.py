@@ -0,0 +1,88 @@
+"""Test password hashing offloaded to the hashing executor."""
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from passlib.context import CryptContext
+
+from app.core import auth
+from app.core.auth import (
+    PasswordHasherBusy,
+    build_pwd_context,
+    get_password_hash,
+    get_password_hash_async,
+    verify_password_async,
+)
+from app.core.config import get_settings
+from app.core.metrics import get_metrics
+
+
+@pytest.mark.asyncio
+async def test_async_hash_and_verify():
+    """Test async hashing round-trips and runs off the event loop thread."""
+    loop_thread = threading.get_ident()
+    threads = []
+    original = auth.pwd_context.hash
+
+    def record_thread(password):
+        threads.append(threading.get_ident())
+        return original(password)
+
+    with patch.object(auth.pwd_context, "hash", side_effect=record_thread):
+        hashed = await get_password_hash_async("test_password")
+
+    assert threads and threads[0] != loop_thread
+    assert await verify_password_async("test_password", hashed) is True
+    assert await verify_password_async("wrong_password", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_saturated_executor_rejects_jobs():
+    """Test jobs beyond the pending limit are rejected instead of queued."""
+    settings = get_settings().model_copy(update={"password_hash_max_pending": 2})
+    hashed = get_password_hash("test_password")
+    release = threading.Event()
+
+    def slow_verify(plain_password, hashed_password):
+        release.wait(5)
+        return True
+
+    with patch("app.core.auth.get_settings", return_value=settings), \
+            patch.object(auth.pwd_context, "verify", side_effect=slow_verify):
+        running = [
+            asyncio.create_task(verify_password_async("test_password", hashed))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        assert get_metrics()["password_hash_queue_depth"]._value.get() == 2
+
+        with pytest.raises(PasswordHasherBusy):
+            await verify_password_async("test_password", hashed)
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+
+    assert get_metrics()["password_hash_queue_depth"]._value.get() == 0
+
+
+def test_hashing_policy_flags_outdated_hashes():
+    """Test hashes from another scheme or with fewer rounds need a rehash."""
+    settings = get_settings()
+    bcrypt_context = build_pwd_context(settings.model_copy(update={"bcrypt_rounds": 5}))
+    weak_hash = CryptContext(schemes=["bcrypt"]).hash("test_password", rounds=4)
+    assert bcrypt_context.verify("test_password", weak_hash)
+    assert bcrypt_context.needs_update(weak_hash)
+    assert not bcrypt_context.needs_update(bcrypt_context.hash("test_password"))
+
+    argon2_context = build_pwd_context(settings.model_copy(update={
+        "password_hash_scheme": "argon2",
+        "argon2_memory_cost": 1024,
+        "argon2_time_cost": 1,
+    }))
+    argon2_hash = argon2_context.hash("test_password")
+    assert argon2_hash.startswith("$argon2id$")
+    assert not argon2_context.needs_update(argon2_hash)
+    # bcrypt hashes still verify under the argon2 policy, but get upgraded
+    assert argon2_context.verify("test_password", weak_hash)
+    assert argon2_context.needs_update(weak_hash)
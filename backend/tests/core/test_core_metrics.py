@@ -68,4 +68,32 @@ def test_http_metrics_functionality():
     # Note: Use _count and _sum suffixes for Histograms
     assert REGISTRY.get_sample_value("http_request_duration_seconds_count", duration_labels) == 2.0
     # Use pytest.approx for floating-point comparison
-    assert REGISTRY.get_sample_value("http_request_duration_seconds_sum", duration_labels) == pytest.approx(0.3) 
\ No newline at end of file
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_sum", duration_labels) == pytest.approx(0.3) 
+
+
+def test_endpoint_label_uses_route_template():
+    """Test the endpoint label is the matched route template, not the raw path."""
+    from fastapi.routing import APIRoute
+    from app.core.metrics import get_endpoint_label
+
+    route = APIRoute("/api/v1/items/{item_id}", endpoint=lambda item_id: None)
+    scope = {"path": "/api/v1/items/42", "route": route}
+    assert get_endpoint_label(scope) == "/api/v1/items/{item_id}"
+
+
+def test_endpoint_label_unmatched_and_capped(monkeypatch):
+    """Test unmatched paths and templates beyond the cap share one label."""
+    from types import SimpleNamespace
+    from app.core import metrics as metrics_module
+    from app.core.metrics import UNMATCHED_ENDPOINT, get_endpoint_label
+
+    assert get_endpoint_label({"path": "/no/such/path"}) == UNMATCHED_ENDPOINT
+
+    monkeypatch.setattr(metrics_module, "MAX_ENDPOINT_LABELS", 2)
+    labels = [
+        get_endpoint_label({"route": SimpleNamespace(path=f"/route/{i}")})
+        for i in range(4)
+    ]
+    assert labels == ["/route/0", "/route/1", UNMATCHED_ENDPOINT, UNMATCHED_ENDPOINT]
+    # Templates seen before the cap was reached keep their own label
+    assert get_endpoint_label({"route": SimpleNamespace(path="/route/1")}) == "/route/1"
@@ -0,0 +1,76 @@
+"""Test login throttling."""
+from unittest.mock import MagicMock
+
+import pytest
+from redis.asyncio import Redis
+
+from app.core.config import Settings
+from app.core.login_throttle import LoginThrottle
+
+pytestmark = pytest.mark.asyncio
+
+EMAIL = "throttled@example.com"
+IP = "203.0.113.7"
+
+
+@pytest.fixture
+def throttle_settings(test_settings: Settings) -> Settings:
+    """Settings with small thresholds."""
+    return test_settings.model_copy(update={
+        "login_max_failures_per_account": 3,
+        "login_max_failures_per_ip": 5,
+        "login_lockout_base": 2,
+        "login_lockout_max": 5,
+    })
+
+
+async def test_lockout_grows_exponentially(redis: Redis, throttle_settings: Settings):
+    """Test the account is locked at the threshold and the lockout doubles up to the cap."""
+    throttle = LoginThrottle(redis, throttle_settings)
+
+    assert await throttle.register_failure(EMAIL, IP) == 0
+    assert await throttle.register_failure(EMAIL, IP) == 0
+    assert await throttle.check(EMAIL, IP) is None
+
+    assert await throttle.register_failure(EMAIL, IP) == 2
+    assert 0 < await throttle.check(EMAIL, IP) <= 2
+    assert await throttle.register_failure(EMAIL, IP) == 4
+    # Fifth failure also hits the per-IP threshold; both are capped
+    assert await throttle.register_failure(EMAIL, IP) == 5
+
+    # Other accounts from another IP are unaffected
+    assert await throttle.check("other@example.com", "198.51.100.1") is None
+
+
+async def test_ip_lockout_covers_all_accounts(redis: Redis, throttle_settings: Settings):
+    """Test one IP guessing many accounts is locked out for every account."""
+    throttle = LoginThrottle(redis, throttle_settings)
+    for i in range(5):
+        await throttle.register_failure(f"user{i}@example.com", IP)
+
+    assert await throttle.check("fresh@example.com", IP) > 0
+    assert await throttle.check("fresh@example.com", "198.51.100.1") is None
+
+
+async def test_success_resets_account_failures(redis: Redis, throttle_settings: Settings):
+    """Test a successful login clears the account counter only."""
+    throttle = LoginThrottle(redis, throttle_settings)
+    await throttle.register_failure(EMAIL, IP)
+    await throttle.register_failure(EMAIL, IP)
+    await throttle.register_success(EMAIL, IP)
+
+    # The account needs a full run of failures again before it is locked
+    assert await throttle.register_failure(EMAIL, IP) == 0
+    assert await throttle.register_failure(EMAIL, IP) == 0
+    assert await throttle.check(EMAIL, IP) is None
+
+
+async def test_check_fails_open_without_redis(throttle_settings: Settings):
+    """Test logins are not blocked when Redis is unavailable."""
+    broken_redis = MagicMock()
+    broken_redis.pipeline.side_effect = ConnectionError("redis down")
+    broken_redis.register_script.side_effect = ConnectionError("redis down")
+    throttle = LoginThrottle(broken_redis, throttle_settings)
+
+    assert await throttle.check(EMAIL, IP) is None
+    assert await throttle.register_failure(EMAIL, IP) == 0
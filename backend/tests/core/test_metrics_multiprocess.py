@@ -0,0 +1,92 @@
+"""Test multiprocess metrics collection."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from app.core import metrics as metrics_module
+from app.core.metrics import (
+    cleanup_dead_workers,
+    generate_metrics,
+    get_registry,
+    is_multiprocess_mode,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def single_process(monkeypatch):
+    """Make sure multiprocess mode is disabled."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.delenv("prometheus_multiproc_dir", raising=False)
+
+
+def test_single_process_uses_default_registry(single_process):
+    """Without a multiprocess directory the default registry is scraped."""
+    assert not is_multiprocess_mode()
+    assert get_registry() is REGISTRY
+    assert cleanup_dead_workers() == []
+
+
+def test_multiprocess_registry_is_built_per_scrape(monkeypatch, tmp_path):
+    """Each scrape merges the worker files into a fresh registry."""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    registry = get_registry()
+    assert isinstance(registry, CollectorRegistry)
+    assert registry is not REGISTRY
+    assert get_registry() is not registry
+
+
+def test_cleanup_dead_workers(monkeypatch, tmp_path):
+    """Files of workers that no longer exist are marked dead."""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    for name in ("counter_101.db", "gauge_livesum_101.db", "gauge_livesum_202.db", "notes.txt"):
+        (tmp_path / name).touch()
+
+    marked = []
+    monkeypatch.setattr(metrics_module.psutil, "pid_exists", lambda pid: pid == 202)
+    monkeypatch.setattr(
+        metrics_module.multiprocess,
+        "mark_process_dead",
+        lambda pid, path: marked.append((pid, path)),
+    )
+
+    assert cleanup_dead_workers() == [101]
+    assert marked == [(101, str(tmp_path))]
+
+
+def test_worker_values_are_merged(tmp_path):
+    """Counters incremented by separate processes are summed on scrape."""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from prometheus_client import Counter;"
+        "Counter('mp_test_total', 'test', ['worker']).labels(worker='a').inc(2)"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True, cwd=BACKEND_DIR)
+
+    scrape = (
+        "from app.core.metrics import generate_metrics;"
+        "print(generate_metrics().decode())"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", scrape],
+        env=env,
+        check=True,
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert 'mp_test_total{worker="a"} 4.0' in output
+
+
+def test_generate_metrics_single_process(single_process):
+    """Metrics render in the Prometheus text format."""
+    metrics_module.get_metrics()["http_requests"].labels(
+        method="GET", endpoint="/mp", status="200"
+    ).inc()
+    assert b"http_requests_total" in generate_metrics()
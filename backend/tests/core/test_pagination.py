@@ -0,0 +1,27 @@
+"""Test pagination cursors."""
+import pytest
+
+from app.core.config import Settings
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip(test_settings: Settings):
+    """Test a cursor decodes back to the key it was issued for."""
+    cursor = encode_cursor([42], "items:1", test_settings)
+    assert decode_cursor(cursor, "items:1", test_settings) == [42]
+
+
+def test_cursor_rejected_for_other_scope(test_settings: Settings):
+    """Test a cursor cannot be replayed against another listing."""
+    cursor = encode_cursor([42], "items:1", test_settings)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "items:2", test_settings)
+
+
+def test_cursor_rejects_tampering(test_settings: Settings):
+    """Test modified or malformed cursors are rejected."""
+    forged_payload = encode_cursor([1000], "users", test_settings).split(".")[0]
+    signature = encode_cursor([42], "users", test_settings).split(".")[1]
+    for cursor in (f"{forged_payload}.{signature}", "not-a-cursor", "a.b.c", ""):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, "users", test_settings)
@@ -15,8 +15,11 @@ from datetime import datetime, timedelta, UTC
 from jose import jwt
 from fastapi import HTTPException
 
+from app.core import security
 from app.core.security import (
+    clear_token_cache,
     create_access_token,
+    decode_access_token,
     get_current_user,
     oauth2_scheme,
 )
@@ -85,10 +88,10 @@ async def test_get_current_user_valid_token(test_settings: Settings):
     # Create a valid token
     token = create_access_token(subject=mock_user.id, settings=test_settings)
     
-    # Mock the database session and user_crud.get
+    # Mock the database session and user_crud.get_principal
     mock_db = AsyncMock()
     
-    with patch("app.core.security.user_crud.get") as mock_get:
+    with patch("app.core.security.user_crud.get_principal") as mock_get:
         # Configure mock to return our mock user
         mock_get.return_value = mock_user
         
@@ -98,8 +101,10 @@ async def test_get_current_user_valid_token(test_settings: Settings):
         # Verify the result
         assert user is mock_user
         
-        # Verify user_crud.get was called with correct arguments
-        mock_get.assert_called_once_with(mock_db, id=mock_user.id)
+        # Verify user_crud.get_principal was called with correct arguments
+        mock_get.assert_called_once_with(
+            mock_db, id=mock_user.id, ttl=test_settings.principal_cache_ttl
+        )
 
 
 @pytest.mark.asyncio
@@ -150,10 +155,10 @@ async def test_get_current_user_user_not_found(test_settings: Settings):
     # Create a valid token
     token = create_access_token(subject=123, settings=test_settings)
     
-    # Mock the database session and user_crud.get
+    # Mock the database session and user_crud.get_principal
     mock_db = AsyncMock()
     
-    with patch("app.core.security.user_crud.get") as mock_get:
+    with patch("app.core.security.user_crud.get_principal") as mock_get:
         # Configure mock to return None (user not found)
         mock_get.return_value = None
         
@@ -165,5 +170,62 @@ async def test_get_current_user_user_not_found(test_settings: Settings):
         assert excinfo.value.status_code == 404
         assert excinfo.value.detail == "User not found"
         
-        # Verify user_crud.get was called
-        mock_get.assert_called_once() 
\ No newline at end of file
+        # Verify user_crud.get_principal was called
+        mock_get.assert_called_once() 
+
+
+def test_decode_access_token_caches_verified_claims(test_settings: Settings):
+    """Test repeated tokens are verified once and served from the cache."""
+    clear_token_cache()
+    token = create_access_token(subject=42, settings=test_settings)
+
+    with patch("app.core.security.jwt.decode", wraps=jwt.decode) as mock_decode:
+        first = decode_access_token(token, test_settings)
+        second = decode_access_token(token, test_settings)
+
+    assert first == second
+    assert first["sub"] == "42"
+    assert mock_decode.call_count == 1
+
+
+def test_decode_access_token_respects_expiry(test_settings: Settings):
+    """Test cached claims are not returned once the token has expired."""
+    clear_token_cache()
+    token = create_access_token(subject=42, settings=test_settings)
+    decode_access_token(token, test_settings)
+
+    # Pretend the cached entry is past its expiry
+    key, (claims, _) = next(iter(security._token_cache.items()))
+    security._token_cache[key] = (claims, 0.0)
+    with patch("app.core.security.jwt.decode", side_effect=jwt.ExpiredSignatureError("expired")):
+        with pytest.raises(jwt.ExpiredSignatureError):
+            decode_access_token(token, test_settings)
+    assert key not in security._token_cache
+
+
+def test_decode_access_token_cache_is_bounded(test_settings: Settings):
+    """Test the least recently used tokens are evicted past the cache size."""
+    clear_token_cache()
+    settings = test_settings.model_copy(update={"jwt_cache_size": 2})
+    for subject in range(3):
+        decode_access_token(create_access_token(subject=subject, settings=settings), settings)
+    assert len(security._token_cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_reuses_request_claims(test_settings: Settings):
+    """Test claims verified earlier in the request are not decoded again."""
+    mock_user = MagicMock()
+    token = "already-verified-token"
+    request = MagicMock()
+    request.scope = {"state": {"access_token": token, "token_claims": {"sub": "7"}}}
+
+    with patch("app.core.security.user_crud.get_principal", return_value=mock_user) as mock_get, \
+            patch("app.core.security.decode_access_token") as mock_decode:
+        user = await get_current_user(
+            db=AsyncMock(), token=token, settings=test_settings, request=request
+        )
+
+    assert user is mock_user
+    mock_decode.assert_not_called()
+    mock_get.assert_called_once()
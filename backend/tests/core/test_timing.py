@@ -0,0 +1,19 @@
+"""Test request timing breakdown."""
+from app.core.timing import current_timings, record_timing, track_timings
+
+
+def test_record_timing_outside_request_is_ignored():
+    """Test timings are only collected inside a tracked context."""
+    record_timing("db", 1.0)
+    assert current_timings() is None
+
+    with track_timings() as timings:
+        record_timing("db", 0.002)
+        record_timing("db", 0.003)
+        record_timing("hash", 0.25)
+    assert current_timings() is None
+
+    assert timings.calls == {"db": 2, "redis": 0, "hash": 1, "render": 0}
+    header = timings.server_timing()
+    assert header.startswith('db;dur=5.0;desc="database (2)", hash;dur=250.0;desc="password hashing (1)", total;dur=')
+    assert timings.log_fields()["hash_ms"] == 250.0
@@ -127,6 +127,19 @@ async def test_get_multi(db: AsyncSession, crud: TestCRUD):
     assert len(result_paginated) == 5
     # Optionally, verify the specific items returned based on skip/limit
 
+
+async def test_get_multi_keyset(db: AsyncSession, crud: TestCRUD):
+    """Test keyset pagination returns the rows after the given ID, in ID order."""
+    for i in range(6):
+        await crud.create(db, obj_in=TestItemCreate(title=f"Keyset Item {i}", owner_id=1))
+
+    all_items = await crud.get_multi(db)
+    ids = [item.id for item in all_items]
+    assert ids == sorted(ids)
+
+    page = await crud.get_multi(db, limit=3, after=ids[1])
+    assert [item.id for item in page] == ids[2:5]
+
 async def test_get_multi_by_owner(db: AsyncSession, crud: TestCRUD):
     """Test getting items by owner."""
     # Initial item with owner_id=999 exists from fixture setup
@@ -198,6 +211,67 @@ async def test_delete(db: AsyncSession, crud: TestCRUD):
     retrieved = await crud.get(db, id=item.id)
     assert retrieved is None
 
+async def test_create_many(db: AsyncSession, crud: TestCRUD):
+    """Test bulk creation across chunks returns the created rows in order."""
+    items_in = [TestItemCreate(title=f"Bulk Item {i}", owner_id=3) for i in range(25)]
+    created = await crud.create_many(db, objs_in=items_in, chunk_size=10)
+
+    assert [item.title for item in created] == [item.title for item in items_in]
+    assert all(item.id is not None and item.created_at is not None for item in created)
+    assert len(await crud.get_multi_by_owner(db, owner_id=3)) == 25
+
+async def test_create_many_on_conflict(db: AsyncSession, crud: TestCRUD):
+    """Test upserts overwrite conflicting rows and ignores skip them."""
+    existing = await crud.create(db, obj_in=TestItemCreate(title="Original", owner_id=4))
+
+    ignored = await crud.create_many(
+        db,
+        objs_in=[{"id": existing.id, "title": "Ignored", "owner_id": 4}],
+        on_conflict="ignore",
+    )
+    assert ignored == []
+
+    upserted = await crud.create_many(
+        db,
+        objs_in=[
+            {"id": existing.id, "title": "Upserted", "owner_id": 4},
+            {"title": "Inserted", "owner_id": 4},
+        ],
+        on_conflict="update",
+    )
+    assert [item.title for item in upserted] == ["Upserted", "Inserted"]
+    assert (await crud.get(db, id=existing.id)).title == "Upserted"
+
+    # A row missing a column would silently reset it to the default
+    with pytest.raises(ValueError):
+        await crud.create_many(
+            db,
+            objs_in=[
+                {"id": existing.id, "title": "Partial"},
+                {"title": "Full", "owner_id": 4},
+            ],
+            on_conflict="update",
+        )
+
+async def test_update_many_and_remove_many(db: AsyncSession, crud: TestCRUD):
+    """Test bulk updates and deletes by ID."""
+    created = await crud.create_many(
+        db, objs_in=[TestItemCreate(title=f"Item {i}", owner_id=5) for i in range(6)]
+    )
+    ids = [item.id for item in created]
+
+    updated = await crud.update_many(
+        db, objs_in=[{"id": id, "title": "Renamed"} for id in ids[:4]], chunk_size=3
+    )
+    assert updated == 4
+    db.expunge_all()
+    titles = [item.title for item in await crud.get_multi_by_owner(db, owner_id=5)]
+    assert titles.count("Renamed") == 4
+
+    assert await crud.remove_many(db, ids=ids[:5], chunk_size=2) == 5
+    remaining = await crud.get_multi_by_owner(db, owner_id=5)
+    assert [item.id for item in remaining] == ids[5:]
+
 async def test_count(db: AsyncSession, crud: TestCRUD):
     """Test counting items."""
     # Initial item with owner_id=999 exists from fixture
@@ -0,0 +1,35 @@
+"""Test item CRUD operations."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.item import item as item_crud
+from app.models.item import Item
+from app.models.user import User
+from tests.factories import ItemFactory, UserFactory
+
+
+def test_default_profile_does_not_join_owner():
+    """Test item queries select from items only unless the owner is requested."""
+    default = str(item_crud.with_loader(select(Item)))
+    assert "JOIN users" not in default
+
+    with_owner = str(item_crud.with_loader(select(Item), "owner"))
+    assert "JOIN users" in with_owner
+    assert "users.hashed_password" not in with_owner
+
+
+async def test_get_multi_by_owner_loader_profiles(db: AsyncSession):
+    """Test the owner is only put in the identity map when asked for."""
+    owner = await UserFactory.create(session=db)
+    for _ in range(3):
+        await ItemFactory.create(session=db, owner_id=owner.id)
+    await db.commit()
+    db.expunge_all()
+
+    items = await item_crud.get_multi_by_owner(db, owner_id=owner.id)
+    assert len(items) == 3
+    assert not any(isinstance(obj, User) for obj in db.identity_map.values())
+
+    db.expunge_all()
+    items = await item_crud.get_multi_by_owner(db, owner_id=owner.id, load="owner")
+    assert {item.owner.email for item in items} == {owner.email}
@@ -1,11 +1,22 @@
 """Test user CRUD operations."""
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
+
 import pytest
+from unittest.mock import patch
+from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.user import user as user_crud
 from app.schemas.user import UserCreate
+from app.models.admin import Admin
+from app.models.item import Item
 from app.models.user import User
-from tests.factories import UserCreateFactory
+from tests.factories import AdminFactory, UserCreateFactory
+
+# app.crud re-exports the CRUDUser singleton as "user", shadowing the module
+user_crud_module = importlib.import_module("app.crud.user")
 
 
 async def test_get_by_email(db: AsyncSession):
@@ -119,4 +130,131 @@ def test_is_superuser():
         hashed_password="hash",
         is_superuser=False,
     )
-    assert user_crud.is_superuser(regular_user) is False 
\ No newline at end of file
+    assert user_crud.is_superuser(regular_user) is False 
+
+async def test_get_principal_cache_invalidated_on_update(db: AsyncSession):
+    """Test the cached principal is served without a query until the user changes."""
+    user = await user_crud.create(db, obj_in=UserCreateFactory())
+
+    principal = await user_crud.get_principal(db, id=user.id, ttl=30)
+    assert principal.id == user.id
+
+    with patch.object(db, "execute", side_effect=AssertionError("unexpected query")):
+        cached = await user_crud.get_principal(db, id=user.id, ttl=30)
+    assert cached.email == user.email
+
+    await user_crud.update(db, db_obj=cached, obj_in={"full_name": "Renamed User"})
+    db.expunge_all()
+    refreshed = await user_crud.get_principal(db, id=user.id, ttl=30)
+    assert refreshed.full_name == "Renamed User"
+
+    await user_crud.remove(db, id=user.id)
+    assert await user_crud.get_principal(db, id=user.id, ttl=30) is None
+
+
+async def test_principal_invalidated_after_commit(db: AsyncSession):
+    """Test a principal cached while an update or delete commits is dropped."""
+    user = await user_crud.create(db, obj_in=UserCreateFactory())
+    commit = db.commit
+
+    async def commit_during_concurrent_lookup():
+        # Another request caches the row as it was before this commit
+        await user_crud.get_principal(db, id=user.id, ttl=30)
+        await commit()
+
+    with patch.object(db, "commit", side_effect=commit_during_concurrent_lookup):
+        await user_crud.update(db, db_obj=user, obj_in={"full_name": "Renamed User"})
+        assert user.id not in user_crud_module._principal_cache
+
+        await user_crud.remove(db, id=user.id)
+        assert user.id not in user_crud_module._principal_cache
+
+    user = await user_crud.create(db, obj_in=UserCreateFactory())
+    with patch.object(db, "commit", side_effect=commit_during_concurrent_lookup):
+        await user_crud.update_many(db, objs_in=[{"id": user.id, "full_name": "Renamed User"}])
+        assert user.id not in user_crud_module._principal_cache
+
+        assert await user_crud.remove_many(db, ids=[user.id]) == 1
+        assert user.id not in user_crud_module._principal_cache
+
+
+async def test_loader_profiles(db: AsyncSession):
+    """Test items are loaded only when the "items" profile is requested."""
+    user = await user_crud.create(db, obj_in=UserCreateFactory())
+    db.add_all(Item(title=f"Item {i}", owner_id=user.id) for i in range(3))
+    await db.commit()
+    db.expunge_all()
+
+    fetched = await user_crud.get_by_email(db, email=user.email)
+    assert fetched.items == []
+
+    db.expunge_all()
+    (listed,) = await user_crud.get_multi(db, load="items")
+    assert len(listed.items) == 3
+
+    with pytest.raises(ValueError):
+        await user_crud.get(db, user.id, load="everything")
+
+
+async def test_create_many_hashes_passwords(db: AsyncSession):
+    """Test bulk user creation hashes each password."""
+    users_in = [UserCreateFactory() for _ in range(3)]
+    users = await user_crud.create_many(db, objs_in=users_in)
+
+    assert [user.email for user in users] == [user_in.email for user_in in users_in]
+    for user, user_in in zip(users, users_in):
+        assert await user_crud.authenticate(db, email=user.email, password=user_in.password)
+
+    assert await user_crud.remove_many(db, ids=[user.id for user in users]) == 3
+    assert await user_crud.get_by_email(db, email=users[0].email) is None
+
+
+async def test_authenticate_upgrades_outdated_hash(db: AsyncSession):
+    """Test a successful login re-hashes a password made with weaker parameters."""
+    user = await user_crud.create(db, obj_in=UserCreateFactory(password="testpassword", password_confirm="testpassword"))
+    weak_hash = CryptContext(schemes=["bcrypt"]).hash("testpassword", rounds=4)
+    user.hashed_password = weak_hash
+    await db.flush()
+
+    @asynccontextmanager
+    async def test_session():
+        yield db
+
+    with patch.object(user_crud_module, "AsyncSessionLocal", test_session):
+        assert await user_crud.authenticate(db, email=user.email, password="testpassword")
+        await asyncio.gather(*user_crud_module._rehash_tasks)
+
+    await db.refresh(user)
+    assert user.hashed_password != weak_hash
+    assert not user_crud_module.password_needs_rehash(user.hashed_password)
+
+
+async def test_rehash_password_keeps_changed_hash(db: AsyncSession):
+    """Test a rehash does nothing when the password changed after login."""
+    user = await user_crud.create(db, obj_in=UserCreateFactory(password="testpassword", password_confirm="testpassword"))
+    current_hash = user.hashed_password
+    await user_crud.get_principal(db, id=user.id, ttl=30)
+
+    @asynccontextmanager
+    async def test_session():
+        yield db
+
+    with patch.object(user_crud_module, "AsyncSessionLocal", test_session):
+        assert not await user_crud.rehash_password(
+            user_id=user.id, old_hash="outdated", password="testpassword"
+        )
+
+    await db.refresh(user)
+    assert user.hashed_password == current_hash
+    assert user.id in user_crud_module._principal_cache
+
+
+async def test_remove_user_deletes_admin(db: AsyncSession):
+    """Test deleting a user removes its admin row in the database."""
+    admin = await AdminFactory.create(session=db)
+    await db.commit()
+    user_id, admin_id = admin.user_id, admin.id
+    db.expunge_all()
+
+    await user_crud.remove(db, id=user_id)
+    assert await db.get(Admin, admin_id) is None
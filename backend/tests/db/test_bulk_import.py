@@ -0,0 +1,83 @@
+"""Test the bulk import pipeline."""
+import io
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_password_hash, verify_password
+from app.db.bulk_import import SPECS, import_rows, read_rows, validate_chunk
+from app.models.item import Item
+from app.models.user import User
+from tests.factories import UserFactory
+
+
+def test_read_rows_csv_and_ndjson():
+    """Test both formats stream rows with their source line numbers."""
+    csv_source = io.StringIO("email,full_name,description\na@example.com,A,\nb@example.com,B,x\n")
+    assert list(read_rows(csv_source, "csv")) == [
+        (2, {"email": "a@example.com", "full_name": "A"}),
+        (3, {"email": "b@example.com", "full_name": "B", "description": "x"}),
+    ]
+
+    ndjson_source = io.StringIO('{"title": "one"}\n\nnot json\n[1]\n')
+    rows = list(read_rows(ndjson_source, "ndjson"))
+    assert rows[0] == (1, {"title": "one"})
+    assert rows[1][0] == 3 and "Invalid JSON" in rows[1][1]["__error__"]
+    assert rows[2][0] == 4 and "__error__" in rows[2][1]
+
+
+def test_validate_user_chunk():
+    """Test user rows are validated and secrets are kept out of error reports."""
+    existing_hash = get_password_hash("migrated-password")
+    chunk = [
+        (2, {"email": "ok@example.com", "full_name": "Ok", "password": "secret123"}),
+        (3, {"email": "not-an-email", "full_name": "Bad", "password": "secret123"}),
+        (4, {"email": "hash@example.com", "full_name": "Hashed", "hashed_password": existing_hash}),
+        (5, {"email": "md5@example.com", "full_name": "Md5", "hashed_password": "5f4dcc3b5aa765d6"}),
+    ]
+    valid, errors = validate_chunk(SPECS["users"], chunk)
+
+    assert [line for line, _ in valid] == [2, 4]
+    assert valid[0][1]["password"] == "secret123"
+    assert valid[1][1]["hashed_password"] == existing_hash
+    assert [error.line for error in errors] == [3, 5]
+    assert all("password" not in error.row and "hashed_password" not in error.row for error in errors)
+
+
+@pytest.mark.asyncio
+async def test_import_rows(db: AsyncSession):
+    """Test users and items are merged through the staging tables."""
+    owner = await UserFactory.create(session=db)
+    await db.flush()
+    raw_connection = await (await db.connection()).get_raw_connection()
+    conn = raw_connection.driver_connection
+
+    users = [
+        (1, {"email": "import1@example.com", "full_name": "One", "password": "secret123"}),
+        (2, {"email": owner.email, "full_name": "Existing", "password": "secret123"}),
+        (3, {"email": "import2@example.com", "full_name": "Two", "password": "secret123"}),
+        (4, {"email": "import1@example.com", "full_name": "Repeat", "password": "secret123"}),
+    ]
+    rejected = []
+    report = await import_rows(conn, "users", users, chunk_size=2, on_rejected=rejected.extend)
+    assert (report.read, report.imported, report.rejected) == (4, 2, 2)
+    assert sorted((error.line, error.error) for error in rejected) == [
+        (2, "email already exists"),
+        (4, "email already exists"),
+    ]
+    imported = (await db.execute(select(User).where(User.email == "import1@example.com"))).scalar_one()
+    assert imported.full_name == "One"
+    assert verify_password("secret123", imported.hashed_password)
+
+    items = [
+        (1, {"title": "Imported", "owner_id": owner.id}),
+        (2, {"title": "Orphan", "owner_id": 2_000_000_000}),
+        (3, {"description": "no title", "owner_id": owner.id}),
+    ]
+    rejected = []
+    report = await import_rows(conn, "items", items, on_rejected=rejected.extend)
+    assert (report.read, report.imported) == (3, 1)
+    assert sorted(error.line for error in rejected) == [2, 3]
+    titles = (await db.execute(select(Item.title).where(Item.owner_id == owner.id))).scalars().all()
+    assert titles == ["Imported"]
@@ -0,0 +1,88 @@
+"""Test sampling of EXPLAIN plans for slow queries."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.db import query_monitor
+from app.db.explain import SKIP_MONITOR_OPTION, ExplainSampler, find_seq_scans
+from app.db.query_monitor import classify_statement
+
+pytestmark = pytest.mark.asyncio
+
+SELECT = "SELECT items.id FROM items WHERE items.title = $1::VARCHAR"
+
+
+def test_find_seq_scans_walks_nested_plans():
+    """Test sequential scans are found below joins, with their row counts."""
+    plan = {
+        "Node Type": "Hash Join",
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "items", "Actual Rows": 5, "Rows Removed by Filter": 9995},
+            {"Node Type": "Hash", "Plans": [
+                {"Node Type": "Index Scan", "Relation Name": "users", "Actual Rows": 1},
+            ]},
+        ],
+    }
+    assert find_seq_scans(plan) == [
+        {"relation": "items", "rows": 5, "rows_removed_by_filter": 9995},
+    ]
+
+
+async def test_maybe_capture_is_rate_limited_per_fingerprint(monkeypatch):
+    """Test each fingerprint is explained once per interval, and only SELECTs on PostgreSQL."""
+    sampler = ExplainSampler(None, enabled=True, interval=60, capacity=10)
+    captured = []
+
+    async def capture(statement, parameters, info, duration):
+        captured.append(statement)
+        sampler._in_flight = False
+
+    monkeypatch.setattr(sampler, "_capture", capture)
+    info = classify_statement(SELECT)
+
+    assert sampler.maybe_capture("postgresql", SELECT, ("a",), info, 0.5)
+    await asyncio.sleep(0)
+    assert not sampler.maybe_capture("postgresql", SELECT, ("b",), info, 0.5)
+
+    other = "SELECT users.id FROM users"
+    assert not sampler.maybe_capture("sqlite", other, (), classify_statement(other), 0.5)
+    update = "UPDATE users SET full_name=$1::VARCHAR"
+    assert not sampler.maybe_capture("postgresql", update, ("x",), classify_statement(update), 0.5)
+    assert sampler.maybe_capture("postgresql", other, (), classify_statement(other), 0.5)
+    await asyncio.sleep(0)
+    assert captured == [SELECT, other]
+
+
+async def test_maybe_capture_disabled():
+    """Test nothing is scheduled unless sampling is enabled."""
+    sampler = ExplainSampler(None, enabled=False, interval=60, capacity=10)
+    assert not sampler.maybe_capture("postgresql", SELECT, (), classify_statement(SELECT), 0.5)
+
+
+@pytest.mark.parametrize("statement", [
+    f"{SELECT} FOR UPDATE",
+    f"{SELECT} FOR NO KEY UPDATE OF items SKIP LOCKED",
+    f"{SELECT} FOR SHARE NOWAIT",
+    "SELECT nextval('items_id_seq')",
+    "SELECT pg_advisory_lock($1::BIGINT)",
+])
+async def test_maybe_capture_refuses_side_effects(statement):
+    """Test statements that lock rows or act outside the transaction are not re-run."""
+    sampler = ExplainSampler(None, enabled=True, interval=60, capacity=10)
+    assert not sampler.maybe_capture("postgresql", statement, (), classify_statement(statement), 0.5)
+
+
+def test_monitor_skips_explain_connection(monkeypatch):
+    """Test the sampler's own statements are not counted, timed or explained."""
+    monkeypatch.setattr(query_monitor, "record_query_metrics", pytest.fail)
+    monkeypatch.setattr(query_monitor.explain_sampler, "maybe_capture", pytest.fail)
+    query_monitor.query_stats.reset()
+    context = SimpleNamespace(execution_options={SKIP_MONITOR_OPTION: True})
+    statement = f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {SELECT}"
+
+    with query_monitor.count_queries() as counter:
+        query_monitor.before_cursor_execute(None, None, statement, ("a",), context, False)
+        query_monitor.after_cursor_execute(None, None, statement, ("a",), context, False)
+    assert counter.count == 0
+    assert query_monitor.query_stats.top() == []
@@ -134,4 +134,62 @@ async def test_pool_overflow_metric(db: AsyncSession) -> None:
     # Check if overflow was recorded
     # Note: This may not always increment if pool size wasn't exceeded
     overflow_count = metrics["db_pool_overflow"]._value.get()
-    assert overflow_count >= initial_overflow 
\ No newline at end of file
+    assert overflow_count >= initial_overflow 
+
+
+async def test_pool_hold_time_and_leaks(tmp_path, monkeypatch) -> None:
+    """Test hold time is attributed per endpoint and long-held connections are reported."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.core.config import get_settings
+    from app.db import metrics as db_metrics
+    from app.db.pool import InstrumentedQueuePool
+
+    settings = get_settings().model_copy(update={"database_pool_leak_seconds": 30.0})
+    monkeypatch.setattr(db_metrics, "get_settings", lambda: settings)
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool
+    )
+    engine.pool.label = "hold-test"
+    db_metrics.register_pool_events(engine)
+    try:
+        db_metrics.bind_request_scope({"type": "http", "path": "/unrouted"})
+
+        async def leaky_endpoint():
+            conn = await engine.connect()
+            await conn.execute(text("SELECT 1"))
+            return conn
+
+        conn = await leaky_endpoint()
+        try:
+            assert db_metrics.get_pool_stats("hold-test")["checked_out"] == 1
+            assert db_metrics.find_leaks(threshold=60) == []
+            leaks = db_metrics.find_leaks(threshold=0)
+            assert len(leaks) == 1
+            assert leaks[0]["pool"] == "hold-test"
+            assert "leaky_endpoint" in leaks[0]["stack"]
+            assert db_metrics.find_leaks(threshold=0) == []  # reported once
+        finally:
+            await conn.close()
+
+        assert db_metrics.get_pool_stats("hold-test")["checked_out"] == 0
+        assert REGISTRY.get_sample_value("db_pool_hold_seconds_count", {"pool": "hold-test"}) == 1
+        assert REGISTRY.get_sample_value("db_pool_waiting", {"pool": "hold-test"}) == 0
+        assert REGISTRY.get_sample_value(
+            "db_pool_endpoint_hold_seconds_total", {"endpoint": "other"}
+        ) > 0
+
+        # Sessions of streaming responses and detached connections are not leaks
+        db_metrics.bind_request_scope({"type": "http", "path": "/unrouted"}, streaming=True)
+        streamed = await engine.connect()
+        db_metrics.bind_request_scope({"type": "http", "path": "/unrouted"})
+        detached = await engine.connect()
+        (await detached.get_raw_connection()).detach()
+        try:
+            assert db_metrics.find_leaks(threshold=0) == []
+            assert db_metrics._checked_out == {}
+        finally:
+            await streamed.close()
+            await detached.close()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,128 @@
+"""Test query counting and statement normalization."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.query_monitor import (
+    QueryStats,
+    classify_statement,
+    count_queries,
+    normalize_statement,
+)
+from app.models.user import User
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_normalize_statement_ignores_values():
+    """Test statements differing only in parameters normalize to the same shape."""
+    asyncpg = normalize_statement("SELECT users.id FROM users\nWHERE users.id = $1::INTEGER")
+    assert asyncpg == "SELECT users.id FROM users WHERE users.id = ?::INTEGER"
+    assert (
+        normalize_statement("SELECT * FROM items WHERE id IN (?, ?, ?) AND title = 'a''b' LIMIT 10")
+        == normalize_statement("SELECT * FROM items WHERE id IN (%(id_1)s) AND title = :title LIMIT 5")
+    )
+    # asyncpg casts every placeholder of an IN list
+    assert (
+        normalize_statement("SELECT * FROM items WHERE id IN ($1::INTEGER, $2::INTEGER)")
+        == normalize_statement("SELECT * FROM items WHERE id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER)")
+        == "SELECT * FROM items WHERE id IN (?::INTEGER)"
+    )
+
+
+def test_normalize_statement_keeps_other_tuples():
+    """Test only IN lists collapse, not row comparisons or VALUES rows."""
+    assert (
+        normalize_statement("SELECT * FROM items WHERE (owner_id, id) > ($1::INTEGER, $2::INTEGER)")
+        == "SELECT * FROM items WHERE (owner_id, id) > (?::INTEGER, ?::INTEGER)"
+    )
+    assert (
+        normalize_statement("INSERT INTO items (title, owner_id) VALUES ($1::VARCHAR, $2::INTEGER)")
+        == "INSERT INTO items (title, owner_id) VALUES (?::VARCHAR, ?::INTEGER)"
+    )
+
+
+def test_normalize_statement_collapses_values_rows():
+    """Test multi-row inserts of any batch size share one fingerprint."""
+    two_rows = normalize_statement(
+        "INSERT INTO items (title, owner_id) VALUES "
+        "($1::VARCHAR, $2::INTEGER), ($3::VARCHAR, $4::INTEGER)"
+    )
+    three_rows = normalize_statement(
+        "INSERT INTO items (title, owner_id) VALUES "
+        "($1::VARCHAR, $2::INTEGER), ($3::VARCHAR, $4::INTEGER), ($5::VARCHAR, $6::INTEGER)"
+    )
+    assert two_rows == three_rows == "INSERT INTO items (title, owner_id) VALUES (?::VARCHAR, ?::INTEGER)"
+    # Rows of different shapes are left as they are
+    assert normalize_statement("INSERT INTO t (a) VALUES (?), (now())") == "INSERT INTO t (a) VALUES (?), (now())"
+
+
+def test_classify_statement_finds_main_table():
+    """Test the table label skips subqueries and ignores joined tables."""
+    subquery = classify_statement(
+        "SELECT count(*) AS count_1 FROM (SELECT admins.id AS id FROM admins) AS anon_1"
+    )
+    assert (subquery.query_type, subquery.table) == ("select", "admins")
+    joined = classify_statement(
+        "SELECT users.email FROM users JOIN admins ON admins.user_id = users.id"
+    )
+    assert (joined.query_type, joined.table) == ("select", "users")
+    insert = classify_statement("INSERT INTO items (title) VALUES ($1), ($2)")
+    assert (insert.query_type, insert.table) == ("insert", "items")
+
+
+def test_classify_statement_one_fingerprint_per_in_list():
+    """Test selectinload and chunked delete batches of any size share a fingerprint."""
+    batches = [
+        classify_statement(
+            "SELECT items.owner_id, items.id FROM items WHERE items.owner_id IN ("
+            + ", ".join(f"${i}::INTEGER" for i in range(1, size + 1))
+            + ")"
+        )
+        for size in (1, 2, 500)
+    ]
+    assert len({info.fingerprint for info in batches}) == 1
+    assert (batches[0].query_type, batches[0].table) == ("select", "items")
+
+    deletes = {
+        classify_statement(f"DELETE FROM users WHERE users.id IN ({ids})").fingerprint
+        for ids in ("$1::INTEGER", "$1::INTEGER, $2::INTEGER, $3::INTEGER")
+    }
+    assert deletes == {"DELETE FROM users WHERE users.id IN (?::INTEGER)"}
+
+
+def test_query_stats_top_by_total_time():
+    """Test fingerprints are ranked by total time with percentiles, and bounded."""
+    stats = QueryStats(max_fingerprints=2, samples=100)
+    fast = classify_statement("SELECT users.id FROM users WHERE users.id = $1")
+    slow = classify_statement("SELECT items.id FROM items WHERE items.owner_id = $1")
+    for i in range(1, 101):
+        stats.record(fast, i / 1000)
+    stats.record(slow, 10.0)
+
+    top = stats.top(1)
+    assert [row["fingerprint"] for row in top] == [slow.fingerprint]
+    fast_row = stats.top(2)[1]
+    assert fast_row["count"] == 100
+    assert fast_row["p50_seconds"] == 0.05
+    assert fast_row["p95_seconds"] == 0.095
+    assert fast_row["max_seconds"] == 0.1
+
+    # The least recently executed fingerprint is dropped for a new one
+    stats.record(classify_statement("DELETE FROM items WHERE items.id = $1"), 0.001)
+    assert {row["table"] for row in stats.top(10)} == {"items"}
+
+
+async def test_count_queries_nests(db: AsyncSession):
+    """Test every enclosing counter records the statements run inside it."""
+    with count_queries() as outer:
+        await db.execute(select(User).where(User.id == 1))
+        with count_queries() as inner:
+            for user_id in range(2, 5):
+                await db.execute(select(User).where(User.id == user_id))
+
+    assert outer.count == 4
+    assert inner.count == 3
+    ((statement, executions),) = outer.repeated(threshold=3)
+    assert executions == 4
+    assert inner.repeated(threshold=3) == []
@@ -2,6 +2,7 @@
 import pytest
 import asyncio
 import logging # Import logging
+from types import SimpleNamespace
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
@@ -10,11 +11,21 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine
 )
 from sqlalchemy.pool import NullPool, QueuePool
-from sqlalchemy import text, select
+from sqlalchemy import column, insert, table, text, select
 from sqlalchemy.exc import SQLAlchemyError
+from prometheus_client import REGISTRY
 
 from app.core.config import Settings
-from app.db.session import get_db, AsyncSessionLocal
+from app.db import session as session_module
+from app.db.pool import InstrumentedQueuePool
+from app.db.session import (
+    get_db,
+    get_engine_args,
+    replica_lag,
+    AsyncSessionLocal,
+    ReplicaRouter,
+    ReplicaSession,
+)
 from app.db.base import Base
 from app.models.user import User
 from tests.factories import UserFactory # Import UserFactory
@@ -222,4 +233,129 @@ async def test_async_session_local(db: AsyncSession):
 
     # Test query execution
     result = await session.execute(text("SELECT 1"))
-    assert result.scalar() == 1 
\ No newline at end of file
+    assert result.scalar() == 1 
+
+
+async def test_replica_router_round_robin_skips_unhealthy():
+    """Test replicas that fail their check or lag too much are not chosen."""
+    first = create_async_engine("sqlite+aiosqlite://")
+    second = create_async_engine("sqlite+aiosqlite://")
+    broken = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/replica.db")
+    router = ReplicaRouter([first, broken, second], max_lag=5, check_interval=60)
+
+    assert router.choose() is None  # nothing checked yet: use the primary
+    await router.check()
+    assert router.lag[broken] is None
+    assert [router.choose() for _ in range(4)] == [first, second, first, second]
+
+    router.max_lag = -1
+    await router.check()
+    assert router.choose() is None
+    await router.stop()
+
+
+def test_replica_lag_requires_streaming_receiver():
+    """Test a replica is only caught up while its WAL receiver is streaming."""
+    def state(**overrides):
+        values = dict(
+            in_recovery=True, has_receiver=True, receiver_status="streaming",
+            replayed_all=True, replay_age=120.0,
+        )
+        return SimpleNamespace(**{**values, **overrides})
+
+    assert replica_lag(state()) == 0
+    assert replica_lag(state(replayed_all=False)) == 120
+    assert replica_lag(state(in_recovery=False, has_receiver=False, receiver_status=None)) == 0
+    # Received == replayed means nothing once replication has stopped
+    assert replica_lag(state(has_receiver=False, receiver_status=None)) is None
+    assert replica_lag(state(receiver_status="waiting")) is None
+    # Without pg_read_all_stats the status is hidden; fall back to replay age
+    assert replica_lag(state(receiver_status=None)) == 120
+
+
+async def test_replica_router_skips_replica_without_wal_receiver(monkeypatch):
+    """Test a caught-up replica whose WAL receiver is gone is unhealthy."""
+    replica = create_async_engine("sqlite+aiosqlite://")
+    monkeypatch.setattr(replica.dialect, "name", "postgresql")
+    monkeypatch.setattr(session_module, "REPLICA_STATE_QUERY", text(
+        "SELECT 1 AS in_recovery, 0 AS has_receiver, NULL AS receiver_status, "
+        "1 AS replayed_all, 3600.0 AS replay_age"
+    ))
+    router = ReplicaRouter([replica], max_lag=5, check_interval=60)
+
+    await router.check()
+    assert router.lag[replica] is None
+    assert router.choose() is None
+    await router.stop()
+
+
+async def test_replica_session_routes_reads_to_replica(monkeypatch):
+    """Test reads use the replica, and writes pin the session to the primary."""
+    marker = table("marker", column("name"))
+    primary = create_async_engine("sqlite+aiosqlite://")
+    replica = create_async_engine("sqlite+aiosqlite://")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+            await conn.execute(insert(marker).values(name=name))
+
+    router = ReplicaRouter([replica], max_lag=5, check_interval=60)
+    await router.check()
+    monkeypatch.setattr(session_module, "replica_router", router)
+    read_session = async_sessionmaker(primary, sync_session_class=ReplicaSession)
+
+    async with read_session() as session:
+        assert await session.scalar(select(marker.c.name)) == "replica"
+
+    async with read_session() as session:
+        session.info["use_primary"] = True
+        assert await session.scalar(select(marker.c.name)) == "primary"
+
+    async with read_session() as session:
+        await session.execute(insert(marker).values(name="written"))
+        names = (await session.scalars(select(marker.c.name))).all()
+        assert names == ["primary", "written"]
+
+    await router.stop()
+    await primary.dispose()
+
+
+def test_engine_args_pool_profiles(test_settings: Settings):
+    """Test pool profiles, single-value overrides and the PgBouncer mode."""
+    settings = test_settings.model_copy(update={
+        "testing": False,
+        "database_pool_profile": "small",
+        "database_pool_size": 8,
+    })
+    args = get_engine_args(settings)
+    assert (args["pool_size"], args["max_overflow"], args["pool_timeout"]) == (8, 5, 10)
+    assert args["connect_args"]["statement_cache_size"] == 1000
+    assert "prepared_statement_name_func" not in args["connect_args"]
+
+    connect_args = get_engine_args(
+        settings.model_copy(update={"database_pgbouncer": True})
+    )["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert set(connect_args["server_settings"]) == {"timezone", "application_name"}
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+async def test_instrumented_pool_records_checkout_wait(tmp_path):
+    """Test every checkout is observed in the wait histogram of its pool."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    engine.pool.label = "checkout-test"
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    labels = {"pool": "checkout-test"}
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", labels) == 3
+    await engine.dispose()
+    assert engine.pool.label == "checkout-test"
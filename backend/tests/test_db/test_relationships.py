@@ -8,6 +8,7 @@ including foreign keys, cascading deletes, and relationship loading.
 import pytest
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.user import user as user_crud
 from app.models import User, Item
 from tests.factories import UserFactory, ItemFactory
 
@@ -33,8 +34,9 @@ async def test_user_items_relationship(db: AsyncSession):
     # Commit changes if factories don't auto-commit within the session
     await db.commit()
 
-    # Refresh user to potentially load items relationship (if needed)
-    await db.refresh(user, attribute_names=["items"])
+    # Items are only loaded when the "items" loader profile asks for them
+    db.expunge_all()
+    user = await user_crud.get(db, user.id, load="items")
     assert len(user.items) == 3
 
     # Query the items for the user directly